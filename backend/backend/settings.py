@@ -337,9 +337,10 @@ REDIS_USE_SSL = os.getenv("REDIS_USE_SSL", "false").lower() == "true"
 
 _redis_scheme = "rediss" if REDIS_USE_SSL else "redis"
 if REDIS_PASSWORD:
-    _redis_host = f"{_redis_scheme}://:{REDIS_PASSWORD}@{REDIS_HOST}:{REDIS_PORT}/0"
+    _redis_base = f"{_redis_scheme}://:{REDIS_PASSWORD}@{REDIS_HOST}:{REDIS_PORT}"
 else:
-    _redis_host = f"{_redis_scheme}://{REDIS_HOST}:{REDIS_PORT}/0"
+    _redis_base = f"{_redis_scheme}://{REDIS_HOST}:{REDIS_PORT}"
+_redis_host = f"{_redis_base}/0"
 
 CHANNEL_LAYERS = {
     "default": {
@@ -350,6 +351,21 @@ CHANNEL_LAYERS = {
     },
 }
 
+# Shared cache (profile cards, etc.) - same Redis server, separate DB from channels
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": f"{_redis_base}/1",
+    },
+}
+
+# Public profile cards served by /users/profiles/ (seconds)
+USER_PROFILE_CACHE_TTL = int(os.getenv("USER_PROFILE_CACHE_TTL", "300"))
+
+# Homepage category facet counts (seconds). Tag counts are updated with each plan write; plans that
+# expire with the clock are only dropped by the next `refresh_tag_counts` run (see README, Scheduled jobs)
+HOMEPAGE_FACET_CACHE_TTL = int(os.getenv("HOMEPAGE_FACET_CACHE_TTL", "60"))
+
 # ==================== FORCE CLOUDINARY STORAGE MONKEY PATCH ====================
 
 if USE_CLOUDINARY:
@@ -374,4 +390,39 @@ if USE_CLOUDINARY:
             django.core.files.storage.default_storage.__class__.__name__,
         )
 
-# ==================== END FORCE CLOUDINARY STORAGE MONKEY PATCH ====================
\ No newline at end of file
+# ==================== END FORCE CLOUDINARY STORAGE MONKEY PATCH ====================
+# Notification retention (`purge_notifications`); the table is bounded by chunked purges, not partitions
+NOTIFICATION_DELETED_RETENTION_DAYS = int(os.getenv("NOTIFICATION_DELETED_RETENTION_DAYS", "7"))
+NOTIFICATION_READ_RETENTION_DAYS = int(os.getenv("NOTIFICATION_READ_RETENTION_DAYS", "90"))
+NOTIFICATION_PURGE_CHUNK_SIZE = int(os.getenv("NOTIFICATION_PURGE_CHUNK_SIZE", "1000"))
+
+# Realtime notification batching window (ms) for sockets that connect with ?batch=1; 0 disables
+NOTIFICATION_PUSH_BATCH_MS = int(os.getenv("NOTIFICATION_PUSH_BATCH_MS", "250"))
+
+# Chat presence: a viewer counts as active for this many seconds after connect / last heartbeat
+CHAT_PRESENCE_TTL = int(os.getenv("CHAT_PRESENCE_TTL", "60"))
+
+# Chat history: messages sent on connect / per load_history page, and the largest page a client may ask for
+CHAT_HISTORY_PAGE_SIZE = int(os.getenv("CHAT_HISTORY_PAGE_SIZE", "50"))
+CHAT_HISTORY_MAX_PAGE_SIZE = int(os.getenv("CHAT_HISTORY_MAX_PAGE_SIZE", "100"))
+# Readers listed per message for sockets that connect with ?receipts=compact
+CHAT_RECEIPT_PREVIEW_SIZE = int(os.getenv("CHAT_RECEIPT_PREVIEW_SIZE", "3"))
+# Read watermarks are buffered per worker and written every CHAT_READ_FLUSH_MS (0 writes through)
+# or once CHAT_READ_FLUSH_SIZE members are pending
+CHAT_READ_FLUSH_MS = int(os.getenv("CHAT_READ_FLUSH_MS", "300"))
+CHAT_READ_FLUSH_SIZE = int(os.getenv("CHAT_READ_FLUSH_SIZE", "200"))
+# NEW_MESSAGE fan-out runs in the background this long after a send, batching messages per thread and sender
+CHAT_FANOUT_BATCH_MS = int(os.getenv("CHAT_FANOUT_BATCH_MS", "200"))
+# Each send also writes an outbox row in its own transaction; rows still there after this many seconds
+# (the worker died before its fan-out) are fanned out by the next flush or `drain_chat_fanout`
+CHAT_FANOUT_RECOVER_AFTER_S = int(os.getenv("CHAT_FANOUT_RECOVER_AFTER_S", "30"))
+# Per-user chat unread counts are cached this long; sends, deletes and reads invalidate them sooner
+CHAT_UNREAD_CACHE_TTL = int(os.getenv("CHAT_UNREAD_CACHE_TTL", "300"))
+# Chat socket access per (plan, user) is cached this long; joining / leaving the plan clears it
+CHAT_MEMBERSHIP_CACHE_TTL = int(os.getenv("CHAT_MEMBERSHIP_CACHE_TTL", "60"))
+# Newest messages kept per thread for connects (chat.recent); should be >= CHAT_HISTORY_PAGE_SIZE, 0 disables
+CHAT_RECENT_BUFFER_SIZE = int(os.getenv("CHAT_RECENT_BUFFER_SIZE", "50"))
+CHAT_RECENT_BUFFER_TTL = int(os.getenv("CHAT_RECENT_BUFFER_TTL", "86400"))
+
+# Plan reminders (`send_plan_reminders`): remind participants this many minutes before event_time
+PLAN_REMINDER_LEAD_MINUTES = int(os.getenv("PLAN_REMINDER_LEAD_MINUTES", "60"))
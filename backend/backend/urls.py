@@ -33,6 +33,7 @@ urlpatterns = [
     path('plans/', include('plans.urls.saved_plan_urls')),   # save/unsave plans
     path('plans/', include('plans.urls.pinned_plan_urls')),   # pin/unpin plans
     path('homepage/', include('plans.urls.homepage')),      # homepage plans
+    path('tags/', include('tags.urls')),                    # tag catalogue / autocomplete
 
     path('plans/', include('plans.urls.plan_history')),     # history of plan that user have join
     # Notifications
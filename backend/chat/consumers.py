@@ -1,9 +1,13 @@
 """WebSocket consumer for chat functionality."""
 
 import json
+from urllib.parse import parse_qs
+from asgiref.sync import sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
+from chat import presence
 from chat.database import ChatDatabase
 from chat.handlers import MessageHandler
+from chat.read_buffer import read_buffer
 
 
 class ChatConsumer(AsyncWebsocketConsumer):
@@ -13,6 +17,8 @@ class ChatConsumer(AsyncWebsocketConsumer):
         super().__init__(*args, **kwargs)
         self.db = ChatDatabase()
         self.message_handler = None
+        self.is_present = False
+        self.compact_receipts = False
     
     async def connect(self):
         """Handle WebSocket connection."""
@@ -38,29 +44,23 @@ class ChatConsumer(AsyncWebsocketConsumer):
 
             print(f"[WebSocket] User authenticated: {user.username} (ID: {user.id})")
 
-            # Ensure user has access to this plan's chat
-            has_access = await self.db.user_has_plan_access(self.plan_id, user)
-            if not has_access:
-                print(f"[WebSocket] Access denied for user {user.username} to plan {self.plan_id}")
-                await self._reject_connection('Please join this plan before accessing its chat.')
-                return
+            # ?receipts=compact: reader count plus the latest few readers instead of every reader
+            query = parse_qs(self.scope.get("query_string", b"").decode())
+            self.compact_receipts = query.get("receipts", [""])[0] == "compact"
 
-            # Get or create chat thread
-            thread = await self.db.get_or_create_thread(self.plan_id, user)
+            # Access check, thread and membership in one call (cached per plan and user)
+            thread, error = await self.db.join_chat(self.plan_id, user)
             if not thread:
-                print(f"[WebSocket] Thread not found for plan {self.plan_id}")
-                await self._reject_connection('Plan not found or access denied.')
+                print(f"[WebSocket] Access denied for user {user.username} to plan {self.plan_id}")
+                await self._reject_connection(error)
                 return
-            
-            print(f"[WebSocket] Thread found/created: {thread.id}")
+
+            print(f"[WebSocket] Joined thread {thread.id}")
             self.thread_id = thread.id
+            # May be the cached reference from join_chat: only .id / .title / .plan_id are loaded
             self.thread = thread
             self.message_handler = MessageHandler(self)
 
-            # Add user as chat member
-            await self.db.add_chat_member(thread, user)
-            print("[WebSocket] User added as chat member")
-
             # Join the chat room
             await self.channel_layer.group_add(
                 self.room_group_name,
@@ -71,6 +71,9 @@ class ChatConsumer(AsyncWebsocketConsumer):
             await self.accept()
             print(f"[WebSocket] Connection accepted for plan {self.plan_id}")
 
+            # Viewers with an open chat don't need NEW_MESSAGE notifications
+            await self._set_presence(True)
+
             # Send connection confirmation
             await self.send(json.dumps({
                 "status": "connected",
@@ -79,13 +82,14 @@ class ChatConsumer(AsyncWebsocketConsumer):
             }))
             print("[WebSocket] Sent connection confirmation")
 
-            # Send chat history
-            history = await self.db.get_chat_history(thread)
+            # Send the latest page of chat history; older pages come from load_history
+            history = await self.db.load_history(thread, compact_receipts=self.compact_receipts)
             await self.send(json.dumps({
                 "type": "chat_history",
-                "messages": history or []
+                "messages": history["messages"],
+                "has_more": history["has_more_before"],
             }))
-            print(f"[WebSocket] Sent chat history ({len(history) if history else 0} messages)")
+            print(f"[WebSocket] Sent chat history ({len(history['messages'])} messages)")
 
         except Exception as e:
             import traceback
@@ -95,6 +99,16 @@ class ChatConsumer(AsyncWebsocketConsumer):
 
     async def disconnect(self, close_code):  # pylint: disable=unused-argument
         """Handle WebSocket disconnection."""
+        try:
+            await self._set_presence(False)
+        except Exception as e:  # pragma: no cover - presence expires on its own
+            print(f"[WebSocket] Error clearing presence: {e}")
+        try:
+            user = self.scope.get('user')
+            if getattr(self, 'thread_id', None) is not None and user:
+                await read_buffer.flush()
+        except Exception as e:  # pragma: no cover - retried by the next flush / at exit
+            print(f"[WebSocket] Error flushing read receipts: {e}")
         try:
             await self.channel_layer.group_discard(
                 self.room_group_name,
@@ -121,6 +135,11 @@ class ChatConsumer(AsyncWebsocketConsumer):
                 await self.message_handler.handle_edit_message(text_data_json, user)
             elif action == 'mark_read':
                 await self.message_handler.handle_mark_read(text_data_json, user)
+            elif action == 'load_history':
+                await self.message_handler.handle_load_history(text_data_json, user)
+            elif action == 'heartbeat':
+                # Sent periodically by the client; active=false when the tab is hidden
+                await self._set_presence(text_data_json.get('active', True) is not False, heartbeat=True)
             else:  # Default to send_message
                 await self.message_handler.handle_send_message(text_data_json, user)
 
@@ -148,13 +167,15 @@ class ChatConsumer(AsyncWebsocketConsumer):
                 'error': f'Display message error: {str(e)}'
             }))
 
-    async def read_receipt(self, event):
-        """Handle read receipt broadcast."""
+    async def read_receipts(self, event):
+        """Handle aggregated read receipt broadcast."""
         try:
             await self.send(json.dumps({
-                'type': 'read_receipt',
-                'message_id': event.get('message_id'),
-                'receipts': event.get('receipts', []),
+                'type': 'read_receipts',
+                'reader': event.get('reader'),
+                'message_ids': event.get('message_ids', []),
+                'after_message_id': event.get('after_message_id'),
+                'last_read_message_id': event.get('last_read_message_id'),
             }))
         except Exception as e:
             await self.send(json.dumps({
@@ -187,6 +208,22 @@ class ChatConsumer(AsyncWebsocketConsumer):
                 'error': f'Edit message error: {str(e)}'
             }))
     
+    async def _set_presence(self, active, heartbeat=False):
+        """Register / refresh / drop this connection in the thread's presence registry."""
+        thread_id = getattr(self, 'thread_id', None)
+        user = self.scope.get('user')
+        if thread_id is None or not user:
+            return
+        if active and self.is_present:
+            if heartbeat:
+                await sync_to_async(presence.heartbeat)(thread_id, user.id)
+        elif active:
+            await sync_to_async(presence.join)(thread_id, user.id)
+            self.is_present = True
+        elif self.is_present:
+            await sync_to_async(presence.leave)(thread_id, user.id)
+            self.is_present = False
+
     async def _reject_connection(self, error_message):
         """Helper to reject connection with error message."""
         print(f"[WebSocket] Rejecting connection: {error_message}")
@@ -5,6 +5,7 @@ from channels.db import database_sync_to_async
 from django.utils import timezone
 
 BANGKOK_TZ = pytz.timezone("Asia/Bangkok")
+RECEIPT_KEYS = ("read_receipts", "read_count")
 
 
 class ChatDatabase:
@@ -12,84 +13,198 @@ class ChatDatabase:
     
     @staticmethod
     @database_sync_to_async
-    def get_or_create_thread(plan_id, user):
-        """Get or create a chat thread for the plan."""
-        from chat.models import chat_threads
+    def join_chat(plan_id, user):
+        """
+        Resolve a chat connection in one call: check the user may access the plan's chat,
+        get or create its thread and make sure the user is a member.
+        Returns (thread, None) or (None, error message). Granted access is cached per
+        (plan, user) in chat.membership, so a reconnect doesn't touch the database.
+        On a cache hit the thread is an unsaved chat_threads carrying only id, plan_id and
+        title: use it as a reference (.id, or a `thread=` filter value), never save it or
+        read its other fields.
+        """
+        from chat import membership, unread
+        from chat.models import chat_member, chat_threads
+        from participants.models import Participants
         from plans.models import Plans
-        
+
         try:
-            # Ensure plan_id is int
             plan_id_int = int(plan_id) if not isinstance(plan_id, int) else plan_id
-            plan = Plans.objects.get(id=plan_id_int)
+        except (TypeError, ValueError):
+            return None, 'Invalid plan ID.'
+
+        cached = membership.get(plan_id_int, user.id)
+        if cached:
+            # Reference only, see above; plan deletion drops these entries (PlansCreate.delete)
+            return chat_threads(id=cached["thread_id"], plan_id=plan_id_int, title=cached["title"]), None
+
+        try:
+            plan = Plans.objects.only("id", "title", "leader_id").get(id=plan_id_int)
+        except Plans.DoesNotExist:
+            print(f"[ChatDatabase] Plan {plan_id} does not exist")
+            return None, 'Please join this plan before accessing its chat.'
+
+        if plan.leader_id_id != user.id and not Participants.objects.filter(plan=plan, user=user).exists():
+            return None, 'Please join this plan before accessing its chat.'
+
+        try:
             thread, _ = chat_threads.objects.get_or_create(
                 plan=plan,
                 defaults={
                     'title': f'Chat for {plan.title}',
-                    'created_by': plan.leader_id
+                    'created_by_id': plan.leader_id_id
                 }
             )
-            return thread
-        except Plans.DoesNotExist:
-            print(f"[ChatDatabase] Plan {plan_id} does not exist")
-            return None
+            # A new member starts caught up; only messages after they join count as unread
+            _, created = chat_member.objects.get_or_create(
+                thread=thread, user=user, defaults={'last_read_message_id': thread.last_message_id}
+            )
         except Exception as e:
             print(f"[ChatDatabase] Error getting/creating thread: {e}")
-            return None
+            return None, 'Plan not found or access denied.'
+
+        if created:
+            unread.invalidate([user.id])
+        membership.remember(plan.id, user.id, thread)
+        return thread, None
 
     @staticmethod
     @database_sync_to_async
-    def add_chat_member(thread, user):
-        """Add user as a chat member if not already added."""
-        from chat.models import chat_member
-        chat_member.objects.get_or_create(thread=thread, user=user)
+    def get_chat_history(thread, limit=None, compact_receipts=False):
+        """Retrieve the latest page of messages for this thread with Bangkok timestamps."""
+        return ChatDatabase._history_page(thread, limit=limit, compact_receipts=compact_receipts)["messages"]
 
     @staticmethod
     @database_sync_to_async
-    def user_has_plan_access(plan_id, user):
-        """Check whether the user is allowed to access the plan's chat."""
-        from plans.models import Plans
-        from participants.models import Participants
+    def load_history(thread, before=None, after=None, around=None, limit=None, compact_receipts=False):
+        """
+        Fetch one page of history by message-ID cursor.
+        `before` / `after` page older / newer messages, `around` returns a window centred on the
+        message (jump-to-message); with no cursor the latest page is returned. None if the cursor
+        message isn't in this thread.
+        """
+        return ChatDatabase._history_page(
+            thread, before=before, after=after, around=around, limit=limit, compact_receipts=compact_receipts
+        )
+
+    @staticmethod
+    def _history_page(thread, before=None, after=None, around=None, limit=None, compact_receipts=False):
+        """
+        Keyset page over (create_at, id), served by the (thread, create_at) index.
+        The latest page (no cursor) comes from the chat.recent ring when it can answer; only the
+        receipts are then read from the database.
+        """
+        from chat import recent
+        from chat.models import chat_messages
+        from django.conf import settings
+        from django.db.models import Q
 
+        default_limit = getattr(settings, "CHAT_HISTORY_PAGE_SIZE", 50)
         try:
-            plan_id_int = int(plan_id) if not isinstance(plan_id, int) else plan_id
-            plan = Plans.objects.get(id=plan_id_int)
-        except Plans.DoesNotExist:
-            return False
+            limit = int(limit) if limit is not None else default_limit
+        except (TypeError, ValueError):
+            limit = default_limit
+        limit = max(1, min(limit, getattr(settings, "CHAT_HISTORY_MAX_PAGE_SIZE", 100)))
+
+        messages = chat_messages.objects.filter(thread=thread).select_related("sender")
+        newest_first = ("-create_at", "-id")
+        oldest_first = ("create_at", "id")
+
+        anchor = None
+        anchor_id = next((value for value in (around, before, after) if value is not None), None)
+        if anchor_id is None:
+            cached = recent.latest(thread.id, limit)
+            if cached is not None:
+                page, has_more_before = cached
+                receipts = ChatDatabase._receipts_by_message(
+                    thread, [(entry["id"], entry["user_id"]) for entry in page], compact=compact_receipts
+                )
+                for entry in page:
+                    entry.update(receipts.get(entry["id"], {"read_receipts": []}))
+                return {"messages": page, "has_more_before": has_more_before, "has_more_after": False}
+            ring_seq = recent.sequence(thread.id)
+        else:
+            try:
+                anchor = messages.filter(id=int(anchor_id)).first()
+            except (TypeError, ValueError):
+                anchor = None
+            if anchor is None:
+                return None
+            older = messages.filter(
+                Q(create_at__lt=anchor.create_at) | Q(create_at=anchor.create_at, id__lt=anchor.id)
+            ).order_by(*newest_first)
+            newer = messages.filter(
+                Q(create_at__gt=anchor.create_at) | Q(create_at=anchor.create_at, id__gt=anchor.id)
+            ).order_by(*oldest_first)
+
+        # Each side fetches one extra row to learn whether there is more beyond the page
+        if around is not None:
+            before_count = (limit - 1) // 2
+            after_count = limit - 1 - before_count
+            older_rows = list(older[:before_count + 1])
+            newer_rows = list(newer[:after_count + 1])
+            rows = older_rows[:before_count][::-1] + [anchor] + newer_rows[:after_count]
+            has_more_before = len(older_rows) > before_count
+            has_more_after = len(newer_rows) > after_count
+        elif after is not None:
+            newer_rows = list(newer[:limit + 1])
+            rows = newer_rows[:limit]
+            has_more_before = True
+            has_more_after = len(newer_rows) > limit
+        else:
+            source = older if before is not None else messages.order_by(*newest_first)
+            older_rows = list(source[:limit + 1])
+            rows = older_rows[:limit][::-1]
+            has_more_before = len(older_rows) > limit
+            has_more_after = before is not None
+
+        if anchor_id is None:
+            recent.store(
+                thread.id, [ChatDatabase._ring_entry(msg) for msg in rows], not has_more_before, ring_seq
+            )
 
-        if plan.leader_id_id == user.id:
-            return True
+        receipts = ChatDatabase._receipts_by_message(
+            thread, [(msg.id, msg.sender_id) for msg in rows], compact=compact_receipts
+        )
+        return {
+            "messages": [ChatDatabase._serialize_message(msg, receipts.get(msg.id)) for msg in rows],
+            "has_more_before": has_more_before,
+            "has_more_after": has_more_after,
+        }
 
-        return Participants.objects.filter(plan=plan, user=user).exists()
+    @staticmethod
+    def _ring_entry(msg):
+        """A message as cached in chat.recent: serialized without receipts, which change too often."""
+        entry = ChatDatabase._serialize_message(msg)
+        for key in RECEIPT_KEYS:
+            entry.pop(key, None)
+        return entry
 
     @staticmethod
-    @database_sync_to_async
-    def get_chat_history(thread):
-        """Retrieve all messages for this thread with Bangkok timestamps."""
-        from chat.models import chat_messages
-        
-        messages = chat_messages.objects.filter(
-            thread=thread
-        ).select_related('sender').prefetch_related('read_receipts__user').order_by('create_at')
-        
-        return [
-            {
-                'id': msg.id,
-                'user': ChatDatabase._get_display_name(msg.sender),
-                'user_id': msg.sender.id,
-                'username': getattr(msg.sender, "username", None),
-                'profile_picture': getattr(msg.sender, "profile_picture", None) or None,
-                'read_receipts': ChatDatabase._serialize_read_receipts(msg),
-                'message': msg.body,
-                'timestamp': timezone.localtime(msg.create_at, BANGKOK_TZ).strftime("%Y-%m-%d %H:%M:%S")
-            }
-            for msg in messages
-        ]
+    def _serialize_message(msg, receipts=None):
+        """Serialize a message for the chat socket; `receipts` comes from _receipts_by_message."""
+        receipts = receipts or {"read_receipts": []}
+        return {
+            'id': msg.id,
+            'user': ChatDatabase._get_display_name(msg.sender),
+            'user_id': msg.sender.id,
+            'username': getattr(msg.sender, "username", None),
+            'profile_picture': getattr(msg.sender, "profile_picture", None) or None,
+            **receipts,
+            'message': msg.body,
+            'timestamp': timezone.localtime(msg.create_at, BANGKOK_TZ).strftime("%Y-%m-%d %H:%M:%S")
+        }
 
     @staticmethod
     @database_sync_to_async
     def save_message(thread_id, user, message_body):
-        """Save a new message to the database with Bangkok timestamp."""
-        from chat.models import chat_messages, chat_threads
+        """
+        Save a new message to the database with Bangkok timestamp.
+        Notifications are not created here; callers hand the message to chat.fanout after broadcasting it,
+        and an outbox row written with the message makes sure the fan-out survives a worker crash.
+        """
+        from chat import recent, unread
+        from chat.models import chat_fanout_outbox, chat_messages, chat_threads
         from django.db import transaction
         
         try:
@@ -100,7 +215,20 @@ class ChatDatabase:
                     sender=user,
                     body=message_body
                 )
-                ChatDatabase._create_chat_notifications(thread, message)
+                ChatDatabase._record_new_message(thread.id, message)
+                chat_fanout_outbox.objects.create(thread=thread, sender=user, message=message)
+                # Sending doesn't mean the sender saw earlier messages, so their watermark only
+                # follows their own message when nothing from anyone else is left unread
+                previous = (
+                    chat_messages.objects.filter(thread=thread, id__lt=message.id)
+                    .exclude(sender=user)
+                    .order_by("-id")
+                    .values_list("id", flat=True)
+                    .first()
+                )
+                ChatDatabase._advance_read_watermark(thread.id, user.id, message.id, caught_up_to=previous)
+                transaction.on_commit(lambda: unread.invalidate_thread(thread.id))
+                transaction.on_commit(lambda: recent.append(thread.id, ChatDatabase._ring_entry(message)))
 
             bangkok_time = timezone.localtime(message.create_at, BANGKOK_TZ)
             formatted_time = bangkok_time.strftime("%Y-%m-%d %H:%M:%S")
@@ -114,41 +242,217 @@ class ChatDatabase:
             return None
 
     @staticmethod
-    def _create_chat_notifications(thread, chat_message):
-        """Create notification records for new chat messages."""
-        try:
-            from chat.models import chat_member
-            from notifications.models import Notification
-            from participants.models import Participants
+    def _message_preview(body):
+        """Short single-line preview of a message body, as shown in thread lists and notifications."""
+        preview = (body or "").strip()
+        if len(preview) > 140:
+            preview = preview[:137].rstrip() + "..."
+        return preview
 
-            recipients_qs = chat_member.objects.filter(thread=thread).select_related("user")
-            recipient_users = {member.user_id: member.user for member in recipients_qs}
+    @staticmethod
+    def _record_new_message(thread_id, message):
+        """Bump the thread's message_count and, unless a newer message got there first, its last-message summary."""
+        from chat.models import chat_threads
+        from django.db.models import Case, F, Q, Value, When
+
+        is_newest = Q(last_message_id__isnull=True) | Q(last_message_id__lt=message.id)
 
-            plan = getattr(thread, "plan", None)
-            if plan:
-                participant_qs = Participants.objects.filter(plan=plan).select_related("user")
-                for participant in participant_qs:
-                    recipient_users.setdefault(participant.user_id, participant.user)
+        def newest(value, field):
+            return Case(
+                When(is_newest, then=Value(value)),
+                default=F(field),
+                output_field=chat_threads._meta.get_field(field),
+            )
 
-                leader = getattr(plan, "leader_id", None)
-                if leader:
-                    recipient_users.setdefault(leader.id, leader)
+        chat_threads.objects.filter(pk=thread_id).update(
+            message_count=F("message_count") + 1,
+            last_message_id=newest(message.id, "last_message_id"),
+            last_message_at=newest(message.create_at, "last_message_at"),
+            last_message_preview=newest(ChatDatabase._message_preview(message.body), "last_message_preview"),
+            last_message_sender_id=newest(message.sender_id, "last_message_sender_id"),
+        )
 
-            sender = chat_message.sender
-            sender_name = getattr(sender, "display_name", None) or getattr(sender, "username", "") or "Someone"
-            preview = chat_message.body.strip()
-            if len(preview) > 140:
-                preview = preview[:137].rstrip() + "..."
+    @staticmethod
+    def _refresh_last_message(thread_id):
+        """Point the thread summary at its newest remaining message (after the last one was deleted)."""
+        from chat.models import chat_messages, chat_threads
+
+        latest = chat_messages.objects.filter(thread_id=thread_id).order_by("-create_at", "-id").first()
+        if latest is None:
+            # last_message_at is left alone so the thread keeps its place in the list
+            chat_threads.objects.filter(pk=thread_id).update(
+                last_message_id=None, last_message_preview="", last_message_sender=None
+            )
+            return
+        chat_threads.objects.filter(pk=thread_id).update(
+            last_message_id=latest.id,
+            last_message_at=latest.create_at,
+            last_message_preview=ChatDatabase._message_preview(latest.body),
+            last_message_sender_id=latest.sender_id,
+        )
 
-            action_url = None
-            if plan:
-                action_url = f"/messages?planId={plan.id}"
+    @staticmethod
+    def _fan_out_messages(thread_id, sender_id, message_ids):
+        """
+        Notify recipients about a batch of messages one sender posted to a thread.
+        The batch is folded into a single fan-out for its newest message, counting every message
+        that still exists, so a burst of N messages costs one pass over the recipients, not N.
+        Only messages still in the outbox are notified, and their outbox rows go in the same
+        transaction, so a worker and the recovery drain never notify the same message twice.
+        Returns the number of messages claimed.
+        """
+        from chat.models import chat_fanout_outbox, chat_messages
+        from django.db import transaction
 
-            for user_id, recipient in recipient_users.items():
-                if user_id == sender.id:
-                    continue
+        with transaction.atomic():
+            claimed = list(
+                chat_fanout_outbox.objects.select_for_update(skip_locked=True)
+                .filter(thread_id=thread_id, sender_id=sender_id, message_id__in=message_ids)
+                .values_list("id", "message_id")
+            )
+            if not claimed:
+                return 0  # deleted, or already fanned out elsewhere
+            messages = chat_messages.objects.filter(id__in=[message_id for _, message_id in claimed])
+            count = messages.count()
+            latest = messages.select_related("sender", "thread__plan__leader_id").order_by("-id").first()
+            if latest is not None:
+                ChatDatabase._create_chat_notifications(latest.thread, latest, count=count)
+            chat_fanout_outbox.objects.filter(id__in=[outbox_id for outbox_id, _ in claimed]).delete()
+        return len(claimed)
 
-                Notification.objects.create(
+    @staticmethod
+    def _drain_fanout_outbox(older_than=None, limit=500):
+        """
+        Fan out outbox rows older than `older_than` seconds, i.e. sends whose worker never got to
+        their fan-out. Returns the number of messages fanned out.
+        """
+        from datetime import timedelta
+
+        from chat.models import chat_fanout_outbox
+        from django.conf import settings
+
+        older_than = settings.CHAT_FANOUT_RECOVER_AFTER_S if older_than is None else older_than
+        stale = (
+            chat_fanout_outbox.objects.filter(created_at__lte=timezone.now() - timedelta(seconds=older_than))
+            .order_by("id")
+            .values_list("thread_id", "sender_id", "message_id")[:limit]
+        )
+        batches = {}
+        for thread_id, sender_id, message_id in stale:
+            batches.setdefault((thread_id, sender_id), []).append(message_id)
+        handled = 0
+        for (thread_id, sender_id), message_ids in batches.items():
+            try:
+                handled += ChatDatabase._fan_out_messages(thread_id, sender_id, message_ids)
+            except Exception as exc:  # pragma: no cover - rolled back, so the rows stay for the next drain
+                print(f"[ChatDatabase] Failed to fan out thread {thread_id}: {exc}")
+        return handled
+
+    @staticmethod
+    def _create_chat_notifications(thread, chat_message, count=1):
+        """
+        Create or update chat notifications for `count` new messages ending with chat_message.
+        Each recipient keeps at most one unread NEW_MESSAGE row per thread; further messages
+        bump its group_count and replace the preview instead of inserting another row.
+        Errors propagate so the caller's transaction (and its outbox claim) rolls back.
+        """
+        from chat import presence
+        from chat.models import chat_member, chat_threads
+        from django.db.models import F
+        from notifications.models import Notification
+        from notifications.payloads import actor_summary, plan_summary
+        from notifications.preferences import recipient_modes
+        from notifications.utils import bulk_create_notifications, push_notification_to_user
+        from participants.models import Participants
+
+        # Serialise fan-out per thread so two messages can't both insert a fresh row for the same recipient
+        chat_threads.objects.select_for_update().filter(pk=thread.pk).first()
+
+        recipients_qs = chat_member.objects.filter(thread=thread).select_related("user")
+        recipient_users = {member.user_id: member.user for member in recipients_qs}
+
+        plan = getattr(thread, "plan", None)
+        if plan:
+            participant_qs = Participants.objects.filter(plan=plan).select_related("user")
+            for participant in participant_qs:
+                recipient_users.setdefault(participant.user_id, participant.user)
+
+            leader = getattr(plan, "leader_id", None)
+            if leader:
+                recipient_users.setdefault(leader.id, leader)
+
+        sender = chat_message.sender
+        recipient_users.pop(sender.id, None)
+        # Members reading the thread live see the message in the chat itself
+        for user_id in presence.active_viewers(thread.id, recipient_users):
+            recipient_users.pop(user_id, None)
+        # Mute / digest rules for every recipient in one query; muted users get nothing written
+        modes = recipient_modes(
+            recipient_users,
+            "NEW_MESSAGE",
+            plan_id=plan.id if plan else None,
+            chat_thread_id=thread.id,
+        )
+        for user_id, mode in modes.items():
+            if mode == "MUTE":
+                recipient_users.pop(user_id, None)
+        quiet = {user_id for user_id, mode in modes.items() if mode == "DIGEST"}
+        if not recipient_users:
+            return
+
+        sender_name = getattr(sender, "display_name", None) or getattr(sender, "username", "") or "Someone"
+        preview = ChatDatabase._message_preview(chat_message.body)
+
+        action_url = None
+        if plan:
+            action_url = f"/messages?planId={plan.id}"
+
+        message_text = f"{sender_name}: {preview}"
+        metadata = {
+            "thread_id": thread.id,
+            "plan_id": plan.id if plan else None,
+            "plan_title": plan.title if plan else None,
+            "sender_id": sender.id,
+            "message_id": chat_message.id,
+        }
+        # Rendered once for the whole fan-out instead of once per recipient
+        plan_fields = plan_summary(plan)
+        payload = {
+            "title": Notification.DEFAULT_TITLES["NEW_MESSAGE"],
+            **plan_fields,
+            "actor": actor_summary(sender),
+        }
+
+        unread_rows = Notification.objects.filter(
+            chat_thread=thread,
+            notification_type="NEW_MESSAGE",
+            is_read=False,
+            is_deleted=False,
+            user_id__in=list(recipient_users),
+        )
+        coalesced_ids = list(unread_rows.values_list("id", flat=True))
+        if coalesced_ids:
+            now = timezone.now()
+            # last_activity_at follows the latest message and moves the row back to the top of the list
+            Notification.objects.filter(id__in=coalesced_ids).update(
+                group_count=F("group_count") + count,
+                actor=sender,
+                chat_message=chat_message,
+                message=message_text,
+                metadata=metadata,
+                payload=payload,
+                last_activity_at=now,
+                updated_at=now,
+            )
+            # update() skips post_save, so push the refreshed rows here; unread counters are unchanged
+            for notification in Notification.objects.filter(id__in=coalesced_ids):
+                recipient_users.pop(notification.user_id, None)
+                if notification.user_id not in quiet:
+                    push_notification_to_user(notification)
+
+        bulk_create_notifications(
+            [
+                Notification(
                     user=recipient,
                     actor=sender,
                     notification_type="NEW_MESSAGE",
@@ -156,24 +460,66 @@ class ChatDatabase:
                     plan=plan,
                     chat_thread=thread,
                     chat_message=chat_message,
-                    message=f"{sender_name}: {preview}",
+                    group_count=count,
+                    message=message_text,
                     action_url=action_url,
-                    metadata={
-                        "thread_id": thread.id,
-                        "plan_id": plan.id if plan else None,
-                        "plan_title": plan.title if plan else None,
-                        "sender_id": sender.id,
-                        "message_id": chat_message.id,
-                    },
+                    metadata=metadata,
+                    payload=payload,
                 )
-        except Exception as exc:  # pragma: no cover - notification failures shouldn't block chat
-            print(f"[ChatDatabase] Failed to create chat notifications: {exc}")
+                for recipient in recipient_users.values()
+            ],
+            plan_fields_by_id={plan.id: plan_fields} if plan else {},
+            quiet_user_ids=quiet,
+        )
+
+    @staticmethod
+    def _retract_chat_notifications(message):
+        """
+        Take a message about to be deleted out of the unread NEW_MESSAGE rows that end with it:
+        a coalesced row is pointed back at the recipient's previous message from others and its
+        group_count drops by one; a row standing for this message alone is deleted.
+        """
+        from chat.models import chat_messages
+        from notifications.models import Notification
+        from notifications.payloads import actor_summary
+
+        rows = Notification.objects.select_for_update().filter(
+            chat_message=message,
+            notification_type="NEW_MESSAGE",
+            is_read=False,
+            is_deleted=False,
+        )
+        for row in rows:
+            previous = None
+            if row.group_count > 1:
+                previous = (
+                    chat_messages.objects.filter(thread_id=message.thread_id, id__lt=message.id)
+                    .exclude(sender_id=row.user_id)
+                    .select_related("sender")
+                    .order_by("-id")
+                    .first()
+                )
+            if previous is None:
+                row.delete()  # post_delete releases its counters
+                continue
+            sender = previous.sender
+            sender_name = getattr(sender, "display_name", None) or getattr(sender, "username", "") or "Someone"
+            row.group_count -= 1
+            row.chat_message = previous
+            row.actor = sender
+            row.message = f"{sender_name}: {ChatDatabase._message_preview(previous.body)}"
+            row.metadata = {**row.metadata, "sender_id": sender.id, "message_id": previous.id}
+            row.payload = {**row.payload, "actor": actor_summary(sender)}
+            row.save(update_fields=["group_count", "chat_message", "actor", "message", "metadata", "payload", "updated_at"])
 
     @staticmethod
     @database_sync_to_async
     def delete_message(message_id, thread_id, user):
         """Delete a message if the user is the sender."""
-        from chat.models import chat_messages
+        from chat import recent, unread
+        from chat.models import chat_messages, chat_threads
+        from django.db import transaction
+        from django.db.models import F
         
         try:
             message = chat_messages.objects.get(id=message_id, thread_id=thread_id)
@@ -185,8 +531,18 @@ class ChatDatabase:
                     'error': 'You can only delete your own messages.'
                 }
             
-            # Delete the message
-            message.delete()
+            # Delete the message and keep the thread summary in step
+            deleted_id = message.id
+            with transaction.atomic():
+                ChatDatabase._retract_chat_notifications(message)
+                message.delete()
+                chat_threads.objects.filter(pk=thread_id, message_count__gt=0).update(
+                    message_count=F("message_count") - 1
+                )
+                if chat_threads.objects.filter(pk=thread_id, last_message_id=deleted_id).exists():
+                    ChatDatabase._refresh_last_message(thread_id)
+                transaction.on_commit(lambda: unread.invalidate_thread(thread_id))
+                transaction.on_commit(lambda: recent.remove(message.thread_id, deleted_id))
             return {'success': True}
             
         except chat_messages.DoesNotExist:
@@ -204,61 +560,220 @@ class ChatDatabase:
     @staticmethod
     @database_sync_to_async
     def mark_messages_read(thread, user, message_ids):
-        """Mark messages as read by the given user."""
-        from chat.models import chat_messages, chat_message_reads
+        """
+        Mark messages as read by the given user, writing straight to the database.
+        Reading is tracked as a per-member watermark, so this advances the member's
+        last_read_message_id to the newest of the given messages. Returns the aggregated
+        receipt for the broadcast (see _read_receipt_event), or None if the watermark didn't move.
+        The socket path goes through chat.read_buffer instead, which batches these writes.
+        """
+        messages, is_member, previous = ChatDatabase._read_state(thread, user, message_ids)
+        if not messages or not is_member:
+            return None
 
-        if not message_ids:
-            return []
+        read_at = timezone.now()
+        if not ChatDatabase._advance_read_watermark(thread.id, user.id, messages[-1][0], read_at):
+            return None
+        return ChatDatabase._read_receipt_event(user, read_at, messages, previous)
+
+    @staticmethod
+    @database_sync_to_async
+    def get_read_state(thread, user, message_ids):
+        """Async wrapper around _read_state."""
+        return ChatDatabase._read_state(thread, user, message_ids)
+
+    @staticmethod
+    def _read_state(thread, user, message_ids):
+        """
+        Resolve a mark_read request: the named messages of this thread as sorted
+        (message_id, sender_id) pairs, whether the user is a member, and their current watermark.
+        """
+        from chat.models import chat_member, chat_messages
 
         normalized_ids = []
-        for mid in message_ids:
+        for mid in message_ids or []:
             try:
                 normalized_ids.append(int(mid))
             except (TypeError, ValueError):
                 continue
 
         if not normalized_ids:
-            return []
+            return [], False, None
 
-        messages = chat_messages.objects.filter(thread=thread, id__in=normalized_ids).select_related(
-            "sender"
-        ).prefetch_related("read_receipts__user")
+        messages = sorted(chat_messages.objects.filter(thread=thread, id__in=normalized_ids).values_list("id", "sender_id"))
+        if not messages:
+            return messages, False, None
 
-        results = []
-        for message in messages:
-            # Skip creating receipt for own messages but still return current receipts
-            if message.sender_id != user.id:
-                chat_message_reads.objects.get_or_create(message=message, user=user)
+        rows = list(
+            chat_member.objects.filter(thread=thread, user=user).values_list("last_read_message_id", flat=True)[:1]
+        )
+        return messages, bool(rows), rows[0] if rows else None
 
-            receipts = ChatDatabase._serialize_read_receipts(message)
-            results.append({
-                "message_id": message.id,
-                "receipts": receipts,
-            })
+    @staticmethod
+    def _read_receipt_event(user, read_at, messages, previous):
+        """
+        Aggregated receipt for one watermark move: the reader, the named messages that became
+        read, and the (after_message_id, last_read_message_id] range of every other message it covers.
+        """
+        return {
+            "reader": ChatDatabase._serialize_receipt(user, read_at),
+            "message_ids": [
+                mid for mid, sender_id in messages
+                if sender_id != user.id and (previous is None or mid > previous)
+            ],
+            "after_message_id": previous,
+            "last_read_message_id": messages[-1][0],
+        }
+
+    @staticmethod
+    def _advance_read_watermark(thread_id, user_id, message_id, read_at=None, caught_up_to=None):
+        """
+        Move the member's read watermark forward to message_id; never moves it back. With `caught_up_to`,
+        only moves it if the member had already read up to that message. Returns True if it moved.
+        """
+        from chat.models import chat_member
+        from django.db.models import Q
 
-        return results
+        from chat import unread
+
+        members = chat_member.objects.filter(thread_id=thread_id, user_id=user_id)
+        if caught_up_to is not None:
+            members = members.filter(last_read_message_id__gte=caught_up_to)
+        moved = bool(
+            members.filter(Q(last_read_message_id__isnull=True) | Q(last_read_message_id__lt=message_id))
+            .update(last_read_message_id=message_id, last_read_at=read_at or timezone.now())
+        )
+        if moved:
+            unread.invalidate([user_id])
+        return moved
 
     @staticmethod
-    def _serialize_read_receipts(message):
-        """Serialize read receipts for a message, ordered by latest read time."""
-        from chat.models import chat_message_reads
-
-        receipts_qs = chat_message_reads.objects.filter(message=message).select_related("user").order_by("-read_at")
-        return [
-            {
-                "username": getattr(receipt.user, "username", None),
-                "display_name": ChatDatabase._get_display_name(receipt.user),
-                "profile_picture": getattr(receipt.user, "profile_picture", None) or None,
-                "read_at": timezone.localtime(receipt.read_at, BANGKOK_TZ).isoformat(),
-            }
-            for receipt in receipts_qs
-        ]
+    def _flush_read_watermarks(entries):
+        """
+        Write buffered watermarks, {(thread_id, user_id): (message_id, read_at)}, in one UPDATE.
+        The per-row WHERE keeps it monotonic, so concurrent flushes from several workers can't
+        move a watermark backwards. Returns the number of members updated.
+        """
+        from chat.models import chat_member
+        from django.db.models import BigIntegerField, Case, DateTimeField, Q, Value, When
+
+        if not entries:
+            return 0
+
+        advancing = Q()
+        watermark_cases = []
+        read_at_cases = []
+        for (thread_id, user_id), (message_id, read_at) in entries.items():
+            member = Q(thread_id=thread_id, user_id=user_id)
+            advancing |= member & (Q(last_read_message_id__isnull=True) | Q(last_read_message_id__lt=message_id))
+            watermark_cases.append(When(member, then=Value(message_id)))
+            read_at_cases.append(When(member, then=Value(read_at)))
+
+        from chat import unread
+
+        updated = chat_member.objects.filter(advancing).update(
+            last_read_message_id=Case(*watermark_cases, output_field=BigIntegerField()),
+            last_read_at=Case(*read_at_cases, output_field=DateTimeField()),
+        )
+        unread.invalidate({user_id for _, user_id in entries})
+        return updated
+
+    @staticmethod
+    def _receipts_by_message(thread, messages, compact=False):
+        """
+        Derive read receipts for a page of (message_id, sender_id) pairs from member watermarks in
+        one query, newest read first. A member has read every message at or below their watermark;
+        senders don't get a receipt for their own message.
+        Returns {message_id: {"read_receipts": [...]}}; in compact mode only the latest
+        CHAT_RECEIPT_PREVIEW_SIZE readers are listed, alongside a "read_count" total.
+        """
+        from chat.models import chat_member
+        from django.conf import settings
+
+        if not messages:
+            return {}
+
+        preview_size = getattr(settings, "CHAT_RECEIPT_PREVIEW_SIZE", 3)
+        readers = list(
+            chat_member.objects.filter(
+                thread=thread, last_read_message_id__gte=min(mid for mid, _ in messages)
+            ).select_related("user").order_by("-last_read_at", "-id")
+        )
+
+        grouped = {}
+        for message_id, sender_id in messages:
+            message_readers = [
+                member for member in readers
+                if member.last_read_message_id >= message_id and member.user_id != sender_id
+            ]
+            if compact:
+                entry = {"read_count": len(message_readers)}
+                message_readers = message_readers[:preview_size]
+            elif not message_readers:
+                continue
+            else:
+                entry = {}
+            entry["read_receipts"] = [
+                ChatDatabase._serialize_receipt(member.user, member.last_read_at) for member in message_readers
+            ]
+            grouped[message_id] = entry
+        return grouped
+
+    @staticmethod
+    def _unread_counts(user, thread_ids=None):
+        """
+        Unread messages per thread for the user, derived from their read watermarks in one
+        grouped query. Returns {thread_id: count}; threads with nothing unread are omitted.
+        Cached per user in chat.unread.
+        """
+        return {thread_id: count for thread_id, _, count in ChatDatabase._unread_rows(user, thread_ids)}
+
+    @staticmethod
+    def _unread_rows(user, thread_ids=None):
+        """(thread_id, plan_id, unread_count) for the user's threads with unread messages."""
+        from chat.models import chat_member, chat_messages
+        from django.db.models import BigIntegerField, Count, OuterRef, Subquery
+        from django.db.models.functions import Coalesce
+
+        memberships = chat_member.objects.filter(user=user)
+        if thread_ids is not None:
+            memberships = memberships.filter(thread_id__in=thread_ids)
+
+        # Driven from the memberships: each one probes the (thread, id) index for the range past
+        # its watermark, instead of filtering every message of every thread against it
+        past_watermark = (
+            chat_messages.objects.filter(
+                thread_id=OuterRef("thread_id"),
+                id__gt=Coalesce(OuterRef("last_read_message_id"), 0, output_field=BigIntegerField()),
+            )
+            .exclude(sender=user)
+            .order_by()
+            .values("thread_id")
+            .annotate(unread=Count("id"))
+            .values("unread")
+        )
+        rows = memberships.annotate(unread=Subquery(past_watermark)).values_list(
+            "thread_id", "thread__plan_id", "unread"
+        )
+        # Filtered here rather than in SQL, which would run the count a second time
+        return [row for row in rows if row[2]]
+
+    @staticmethod
+    def _serialize_receipt(user, read_at):
+        """Serialize one reader of a message."""
+        return {
+            "username": getattr(user, "username", None),
+            "display_name": ChatDatabase._get_display_name(user),
+            "profile_picture": getattr(user, "profile_picture", None) or None,
+            "read_at": timezone.localtime(read_at, BANGKOK_TZ).isoformat(),
+        }
     
     @staticmethod
     @database_sync_to_async
     def edit_message(message_id, thread_id, user, new_content):
         """Edit a message if the user is the sender."""
-        from chat.models import chat_messages
+        from chat import recent
+        from chat.models import chat_messages, chat_threads
         from django.utils import timezone
         
         try:
@@ -271,9 +786,13 @@ class ChatDatabase:
                     'error': 'You can only edit your own messages.'
                 }
             
-            # Update the message content
+            # Update the message content; the thread preview follows if this is its newest message
             message.body = new_content
             message.save()
+            chat_threads.objects.filter(pk=thread_id, last_message_id=message.id).update(
+                last_message_preview=ChatDatabase._message_preview(new_content)
+            )
+            recent.update(message.thread_id, message.id, message=new_content)
             
             # Get updated timestamp
             bangkok_time = timezone.localtime(message.create_at, BANGKOK_TZ)
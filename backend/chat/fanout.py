@@ -0,0 +1,80 @@
+"""
+Background stage for chat notification fan-out.
+
+Sending a message only saves and broadcasts it; the NEW_MESSAGE notifications for everyone else
+are queued here per (thread, sender) and written after CHAT_FANOUT_BATCH_MS, so a burst of
+messages becomes one fan-out and send latency no longer grows with the size of the thread.
+Anything still queued is written at interpreter exit; recovery is left to the running workers
+and the drain command.
+
+The queue itself is only a fast path. Each send also writes a chat_fanout_outbox row in the
+message's transaction, so a fan-out lost with its worker (crash, OOM or SIGKILL) is picked up
+CHAT_FANOUT_RECOVER_AFTER_S later by any worker's flush or by the `drain_chat_fanout` command.
+"""
+
+import asyncio
+import atexit
+import threading
+import time
+
+from channels.db import database_sync_to_async
+from django.conf import settings
+
+from chat.database import ChatDatabase
+
+
+class ChatFanout:
+    """Per-process queue of sent messages waiting for their notification fan-out."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}  # (thread_id, sender_id) -> [message_id, ...]
+        self._flush_handle = None
+        self._last_recovery = 0.0
+
+    def enqueue(self, thread_id, sender_id, message_id):
+        """Queue a committed message; must be called from the event loop."""
+        with self._lock:
+            self._pending.setdefault((thread_id, sender_id), []).append(message_id)
+            if self._flush_handle is not None:
+                return
+            loop = asyncio.get_running_loop()
+            self._flush_handle = loop.call_later(
+                max(settings.CHAT_FANOUT_BATCH_MS, 0) / 1000, lambda: asyncio.ensure_future(self.flush())
+            )
+
+    async def flush(self):
+        await database_sync_to_async(self.flush_sync)()
+
+    def flush_sync(self, recover=True):
+        """
+        Run the fan-out for everything queued so far and, with `recover`, any stale outbox rows.
+        Returns the number of (thread, sender) batches.
+        """
+        with self._lock:
+            batches, self._pending = self._pending, {}
+            self._flush_handle = None
+        for (thread_id, sender_id), message_ids in batches.items():
+            try:
+                ChatDatabase._fan_out_messages(thread_id, sender_id, message_ids)
+            except Exception as exc:  # pragma: no cover - the outbox row keeps it for the next drain
+                print(f"[ChatFanout] Failed to notify thread {thread_id}: {exc}")
+        if recover:
+            self._recover_stale()
+        return len(batches)
+
+    def _recover_stale(self):
+        """At most once per recovery window, fan out outbox rows other (dead) workers left behind."""
+        now = time.monotonic()
+        if now - self._last_recovery < settings.CHAT_FANOUT_RECOVER_AFTER_S:
+            return
+        self._last_recovery = now
+        try:
+            ChatDatabase._drain_fanout_outbox()
+        except Exception as exc:  # pragma: no cover - retried on the next window
+            print(f"[ChatFanout] Failed to recover stale fan-outs: {exc}")
+
+
+chat_fanout = ChatFanout()
+# Only what this process queued: an exiting process (or a test run) must not drain the shared outbox
+atexit.register(chat_fanout.flush_sync, recover=False)
@@ -2,6 +2,8 @@
 
 import json
 from chat.database import ChatDatabase
+from chat.fanout import chat_fanout
+from chat.read_buffer import read_buffer
 from chat.utils import get_display_name
 
 
@@ -44,6 +46,9 @@ class MessageHandler:
             }
         )
 
+        # Notifications for everyone else are written in the background, batched per thread
+        chat_fanout.enqueue(self.consumer.thread_id, user.id, saved_message['id'])
+
     async def handle_mark_read(self, text_data_json, user):
         """Handle marking messages as read."""
         message_ids = text_data_json.get('message_ids') or text_data_json.get('messages')
@@ -52,18 +57,47 @@ class MessageHandler:
             await self.consumer.send(json.dumps({'error': 'Message IDs are required.'}))
             return
 
-        receipts = await self.db.mark_messages_read(self.consumer.thread, user, message_ids)
+        # Buffered: the watermark is written by the next flush, the receipt goes out now
+        receipt = await read_buffer.mark_read(self.consumer.thread, user, message_ids)
+        if not receipt:
+            return
+
+        # One event for the whole batch; clients apply it to every message in the range
+        await self.consumer.channel_layer.group_send(
+            self.consumer.room_group_name,
+            {
+                'type': 'read_receipts',
+                **receipt,
+            }
+        )
+
+    async def handle_load_history(self, text_data_json, user):  # pylint: disable=unused-argument
+        """Handle fetching an older / newer page of history, or a window around a message."""
+        cursors = {key: text_data_json.get(key) for key in ('before', 'after', 'around')}
+        if sum(value is not None for value in cursors.values()) > 1:
+            await self.consumer.send(json.dumps({'error': 'Use only one of before, after or around.'}))
+            return
+
+        page = await self.db.load_history(
+            self.consumer.thread,
+            limit=text_data_json.get('limit'),
+            compact_receipts=getattr(self.consumer, 'compact_receipts', False),
+            **cursors,
+        )
+        if page is None:
+            await self.consumer.send(json.dumps({'error': 'Message not found.'}))
+            return
+
+        direction = next((key for key, value in cursors.items() if value is not None), 'latest')
+        await self.consumer.send(json.dumps({
+            'type': 'chat_history_page',
+            'direction': direction,
+            'cursor': cursors.get(direction),
+            'messages': page['messages'],
+            'has_more_before': page['has_more_before'],
+            'has_more_after': page['has_more_after'],
+        }))
 
-        for entry in receipts:
-            await self.consumer.channel_layer.group_send(
-                self.consumer.room_group_name,
-                {
-                    'type': 'read_receipt',
-                    'message_id': entry.get('message_id'),
-                    'receipts': entry.get('receipts', []),
-                }
-            )
-    
     async def handle_delete_message(self, text_data_json, user):
         """Handle deleting a message."""
         message_id = text_data_json.get('message_id')
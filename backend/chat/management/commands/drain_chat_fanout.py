@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from chat.database import ChatDatabase
+
+
+class Command(BaseCommand):
+    help = (
+        "Send the NEW_MESSAGE notifications for chat messages whose worker never fanned them out. "
+        "Run after deploys and periodically (e.g. every minute) from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--older-than", type=int, help="Only messages queued at least this many seconds ago")
+        parser.add_argument("--limit", type=int, default=500, help="Outbox rows handled per pass")
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            handled = ChatDatabase._drain_fanout_outbox(options["older_than"], options["limit"])
+            if not handled:
+                break
+            total += handled
+        self.stdout.write(self.style.SUCCESS(f"Fanned out {total} messages."))
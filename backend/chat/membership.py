@@ -0,0 +1,38 @@
+"""
+Short-lived cache of chat access per (plan, user), kept in the shared Redis cache.
+
+ChatConsumer.connect resolves access, the thread and the membership row in one database call
+(ChatDatabase.join_chat) and remembers the outcome here for CHAT_MEMBERSHIP_CACHE_TTL seconds,
+so reconnect storms skip Postgres. PlanJoinView invalidates the entry on join and leave, and
+deleting a plan invalidates it for every member of the plan's chat.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+def _key(plan_id, user_id):
+    return f"chat_membership:{plan_id}:{user_id}"
+
+
+def get(plan_id, user_id):
+    """The cached {"thread_id", "title"} for a member, or None."""
+    return cache.get(_key(plan_id, user_id))
+
+
+def remember(plan_id, user_id, thread):
+    cache.set(
+        _key(plan_id, user_id),
+        {"thread_id": thread.id, "title": thread.title},
+        settings.CHAT_MEMBERSHIP_CACHE_TTL,
+    )
+
+
+def invalidate(plan_id, user_id):
+    cache.delete(_key(plan_id, user_id))
+
+
+def invalidate_plan(plan_id, user_ids):
+    keys = [_key(plan_id, user_id) for user_id in user_ids]
+    if keys:
+        cache.delete_many(keys)
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0002_chat_message_reads'),
+        ('chat', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='chat_messages',
+            index=models.Index(fields=['thread', 'create_at'], name='chat_msg_thread_created_idx'),
+        ),
+    ]
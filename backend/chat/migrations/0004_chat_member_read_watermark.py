@@ -0,0 +1,52 @@
+from django.db import migrations, models
+from django.db.models import Max, OuterRef, Subquery
+
+
+def collapse_receipts(apps, schema_editor):
+    """Fold per-message receipt rows into one watermark per member: the newest message they read."""
+    chat_member = apps.get_model("chat", "chat_member")
+    chat_message_reads = apps.get_model("chat", "chat_message_reads")
+
+    latest_read = (
+        chat_message_reads.objects.filter(user_id=OuterRef("user_id"), message__thread_id=OuterRef("thread_id"))
+        .values("user_id")
+        .annotate(message_id=Max("message_id"), read_at=Max("read_at"))
+    )
+    chat_member.objects.update(
+        last_read_message_id=Subquery(latest_read.values("message_id")[:1]),
+        last_read_at=Subquery(latest_read.values("read_at")[:1]),
+    )
+    # No receipts at all: start the member at the thread's newest message rather than counting
+    # the whole history as unread
+    chat_messages = apps.get_model("chat", "chat_messages")
+    newest = (
+        chat_messages.objects.filter(thread_id=OuterRef("thread_id"))
+        .values("thread_id")
+        .annotate(message_id=Max("id"))
+        .values("message_id")
+    )
+    chat_member.objects.filter(last_read_message_id__isnull=True).update(last_read_message_id=Subquery(newest[:1]))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0003_chat_messages_thread_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chat_member',
+            name='last_read_message_id',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='chat_member',
+            name='last_read_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(collapse_receipts, migrations.RunPython.noop),
+        migrations.DeleteModel(
+            name='chat_message_reads',
+        ),
+    ]
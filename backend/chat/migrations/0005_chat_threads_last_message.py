@@ -0,0 +1,68 @@
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Left
+
+
+def backfill_summaries(apps, schema_editor):
+    chat_threads = apps.get_model("chat", "chat_threads")
+    chat_messages = apps.get_model("chat", "chat_messages")
+
+    latest = chat_messages.objects.filter(thread_id=OuterRef("pk")).order_by("-create_at", "-id")
+    counts = (
+        chat_messages.objects.filter(thread_id=OuterRef("pk"))
+        .order_by()
+        .values("thread_id")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    chat_threads.objects.update(
+        last_message_id=Subquery(latest.values("id")[:1]),
+        last_message_at=Coalesce(Subquery(latest.values("create_at")[:1]), "create_at"),
+        last_message_preview=Coalesce(Left(Subquery(latest.values("body")[:1]), 140), Value("")),
+        last_message_sender_id=Subquery(latest.values("sender_id")[:1]),
+        message_count=Coalesce(Subquery(counts), Value(0)),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('chat', '0004_chat_member_read_watermark'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chat_threads',
+            name='last_message_id',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='chat_threads',
+            name='last_message_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='chat_threads',
+            name='last_message_preview',
+            field=models.CharField(blank=True, default='', max_length=140),
+        ),
+        migrations.AddField(
+            model_name='chat_threads',
+            name='last_message_sender',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='chat_threads',
+            name='message_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_summaries, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='chat_threads',
+            index=models.Index(fields=['-last_message_at', '-id'], name='chat_thread_last_msg_idx'),
+        ),
+    ]
@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0005_chat_threads_last_message'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='chat_messages',
+            index=models.Index(fields=['thread', 'id'], name='chat_msg_thread_id_idx'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 from plans.models import Plans
 from users.models import Users
 
@@ -9,11 +10,28 @@ class chat_threads(models.Model):
     plan = models.ForeignKey(Plans, on_delete=models.CASCADE,related_name="chat_thread")
     created_by = models.ForeignKey(Users, on_delete=models.CASCADE,related_name="thread_created")
     create_at = models.DateTimeField(auto_now_add=True)
+    # Summary of the newest message, kept up to date by send / edit / delete (chat.database)
+    last_message_id = models.BigIntegerField(null=True, blank=True)
+    last_message_at = models.DateTimeField(default=timezone.now)  # thread creation until the first message
+    last_message_preview = models.CharField(max_length=140, blank=True, default="")
+    last_message_sender = models.ForeignKey(
+        Users, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    message_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            # Thread list, newest activity first (UserChatThreadsView)
+            models.Index(fields=['-last_message_at', '-id'], name='chat_thread_last_msg_idx'),
+        ]
 
 # Model for chat_member
 class chat_member(models.Model):
     thread = models.ForeignKey(chat_threads, on_delete=models.CASCADE, related_name="member")
     user = models.ForeignKey(Users, on_delete=models.CASCADE,related_name="chat_member")
+    # Read watermark: every message in the thread with id <= last_read_message_id has been read
+    last_read_message_id = models.BigIntegerField(null=True, blank=True)
+    last_read_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         unique_together = ("thread", "user")
@@ -27,13 +45,17 @@ class chat_messages(models.Model):
 
     class Meta:
         ordering = ['create_at']  # Default ordering
-
-
-class chat_message_reads(models.Model):
-    message = models.ForeignKey(chat_messages, on_delete=models.CASCADE, related_name="read_receipts")
-    user = models.ForeignKey(Users, on_delete=models.CASCADE, related_name="message_reads")
-    read_at = models.DateTimeField(auto_now_add=True, db_index=True)
-
-    class Meta:
-        unique_together = ("message", "user")
-        ordering = ["-read_at"]
+        indexes = [
+            # Keyset pagination of a thread's history (load_history)
+            models.Index(fields=['thread', 'create_at'], name='chat_msg_thread_created_idx'),
+            # Unread counts: messages past a member's watermark (chat.unread)
+            models.Index(fields=['thread', 'id'], name='chat_msg_thread_id_idx'),
+        ]
+
+# Model for the notification fan-out outbox: written with each message, removed once its
+# NEW_MESSAGE notifications exist, so a fan-out lost with a worker is picked up again (chat.fanout)
+class chat_fanout_outbox(models.Model):
+    thread = models.ForeignKey(chat_threads, on_delete=models.CASCADE, related_name="+")
+    sender = models.ForeignKey(Users, on_delete=models.CASCADE, related_name="+")
+    message = models.OneToOneField(chat_messages, on_delete=models.CASCADE, related_name="+")
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
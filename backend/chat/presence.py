@@ -0,0 +1,49 @@
+"""
+Presence registry for chat threads, kept in the shared Redis cache.
+
+Each (thread, user) pair has a connection counter that expires CHAT_PRESENCE_TTL seconds after
+the last connect / heartbeat, so a crashed worker can't leave a user "present" forever.
+Notification fan-out uses it to skip members who are reading the thread live.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+def _key(thread_id, user_id):
+    return f"chat_presence:{thread_id}:{user_id}"
+
+
+def join(thread_id, user_id):
+    key = _key(thread_id, user_id)
+    cache.add(key, 0, settings.CHAT_PRESENCE_TTL)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Expired between add and incr
+        cache.set(key, 1, settings.CHAT_PRESENCE_TTL)
+    cache.touch(key, settings.CHAT_PRESENCE_TTL)
+
+
+def leave(thread_id, user_id):
+    key = _key(thread_id, user_id)
+    try:
+        if cache.decr(key) <= 0:
+            cache.delete(key)
+    except ValueError:
+        pass  # already expired
+
+
+def heartbeat(thread_id, user_id):
+    """Extend presence; re-registers the connection if its key already expired."""
+    if not cache.touch(_key(thread_id, user_id), settings.CHAT_PRESENCE_TTL):
+        join(thread_id, user_id)
+
+
+def active_viewers(thread_id, user_ids):
+    """Return the subset of `user_ids` with a live connection to the thread, in one round trip."""
+    keys = {_key(thread_id, user_id): user_id for user_id in user_ids}
+    if not keys:
+        return set()
+    found = cache.get_many(list(keys))
+    return {keys[key] for key, count in found.items() if count and count > 0}
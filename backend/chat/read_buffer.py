@@ -0,0 +1,93 @@
+"""
+Write-behind buffer for chat read watermarks.
+
+mark_read is the chattiest socket action, so instead of an UPDATE per action each worker keeps
+the newest pending watermark per (thread, user) and writes them all in one UPDATE every
+CHAT_READ_FLUSH_MS, or as soon as CHAT_READ_FLUSH_SIZE members are pending. Live receipts are
+broadcast straight from the buffer. Workers keep no watermark of their own: each mark_read reads
+the stored one (plus this worker's pending entry), and flushes are monotonic in SQL, so several
+workers can buffer the same member safely. Pending entries are flushed on disconnect and at exit.
+"""
+
+import asyncio
+import atexit
+import threading
+
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.utils import timezone
+
+from chat.database import ChatDatabase
+
+
+class ReadReceiptBuffer:
+    """Per-process buffer of read watermarks waiting to be written."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}  # (thread_id, user_id) -> (message_id, read_at)
+        self._flush_handle = None
+
+    async def mark_read(self, thread, user, message_ids):
+        """Buffer a watermark move; returns the aggregated receipt to broadcast, or None if nothing moved."""
+        key = (thread.id, user.id)
+        messages, is_member, previous = await ChatDatabase.get_read_state(thread, user, message_ids)
+        if not messages or not is_member:
+            return None
+        # The stored watermark may trail what this worker still has to write
+        with self._lock:
+            pending = self._pending.get(key)
+        if pending is not None and (previous is None or pending[0] > previous):
+            previous = pending[0]
+
+        message_id = messages[-1][0]
+        if previous is not None and message_id <= previous:
+            return None
+
+        read_at = timezone.now()
+        with self._lock:
+            current = self._pending.get(key)
+            if current is None or current[0] < message_id:
+                self._pending[key] = (message_id, read_at)
+            pending = len(self._pending)
+
+        if settings.CHAT_READ_FLUSH_MS <= 0 or pending >= settings.CHAT_READ_FLUSH_SIZE:
+            await self.flush()
+        else:
+            self._schedule_flush()
+        return ChatDatabase._read_receipt_event(user, read_at, messages, previous)
+
+    async def flush(self):
+        await database_sync_to_async(self.flush_sync)()
+
+    def flush_sync(self):
+        """Write every pending watermark in one UPDATE. Failed entries are put back for the next flush."""
+        with self._lock:
+            # A timer that still fires later just finds less (or nothing) to write
+            entries, self._pending = self._pending, {}
+            self._flush_handle = None
+        if not entries:
+            return 0
+        try:
+            return ChatDatabase._flush_read_watermarks(entries)
+        except Exception as exc:  # pragma: no cover - retried on the next flush
+            print(f"[ReadReceiptBuffer] Failed to flush {len(entries)} watermarks: {exc}")
+            with self._lock:
+                for key, entry in entries.items():
+                    current = self._pending.get(key)
+                    if current is None or current[0] < entry[0]:
+                        self._pending[key] = entry
+            return 0
+
+    def _schedule_flush(self):
+        with self._lock:
+            if self._flush_handle is not None:
+                return
+            loop = asyncio.get_running_loop()
+            self._flush_handle = loop.call_later(
+                settings.CHAT_READ_FLUSH_MS / 1000, lambda: asyncio.ensure_future(self.flush())
+            )
+
+
+read_buffer = ReadReceiptBuffer()
+atexit.register(read_buffer.flush_sync)
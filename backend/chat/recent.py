@@ -0,0 +1,135 @@
+"""
+Ring buffer of each thread's most recent messages, kept in the shared Redis cache.
+
+Connects and reconnects only need the latest page of history, so ChatDatabase serves it from
+here: up to CHAT_RECENT_BUFFER_SIZE serialized messages per thread, oldest first, plus whether
+they are the thread's whole history. Send / edit / delete update the ring after commit; a ring
+that is missing, or holds fewer messages than asked for without being the whole history, is
+rebuilt from the database by the next connect.
+
+Writers take a short cache lock and give up by dropping the ring, so several workers can
+update it safely. Every write bumps a sequence number; a rebuild is only stored if no write
+happened while it was reading the database, so it can't save a page that misses a new message.
+"""
+
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+from django.core.cache import cache
+
+LOCK_TIMEOUT = 5  # seconds; a crashed writer can't block the ring for longer
+LOCK_ATTEMPTS = 20
+LOCK_WAIT = 0.005
+
+
+def _key(thread_id):
+    return f"chat_recent:{thread_id}"
+
+
+def _seq_key(thread_id):
+    return f"chat_recent:{thread_id}:seq"
+
+
+def _lock_key(thread_id):
+    return f"chat_recent:{thread_id}:lock"
+
+
+def _acquire(thread_id):
+    for _ in range(LOCK_ATTEMPTS):
+        if cache.add(_lock_key(thread_id), 1, LOCK_TIMEOUT):
+            return True
+        time.sleep(LOCK_WAIT)
+    return False
+
+
+def _bump(thread_id):
+    key = _seq_key(thread_id)
+    cache.add(key, 0, settings.CHAT_RECENT_BUFFER_TTL)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, settings.CHAT_RECENT_BUFFER_TTL)
+
+
+def _mutate(thread_id, change):
+    """Apply change(ring) under the lock; a ring that can't be locked is dropped instead."""
+    _bump(thread_id)
+    if not _acquire(thread_id):
+        cache.delete(_key(thread_id))
+        return
+    try:
+        ring = cache.get(_key(thread_id))
+        if ring is None:
+            return  # nothing cached; the next connect rebuilds it
+        change(ring)
+        cache.set(_key(thread_id), ring, settings.CHAT_RECENT_BUFFER_TTL)
+    finally:
+        cache.delete(_lock_key(thread_id))
+
+
+def sequence(thread_id):
+    """Current write sequence; pass it to store() after reading the database."""
+    return cache.get(_seq_key(thread_id))
+
+
+def latest(thread_id, limit):
+    """(messages, has_more_before) for the newest `limit` messages, or None if the ring can't answer."""
+    ring = cache.get(_key(thread_id))
+    if ring is None:
+        return None
+    messages = ring["messages"]
+    if len(messages) < limit and not ring["complete"]:
+        return None
+    page = messages[-limit:]
+    return [dict(message) for message in page], len(messages) > limit or not ring["complete"]
+
+
+def store(thread_id, messages, complete, seq):
+    """Cache the newest messages read from the database, unless a write happened since `seq` was read."""
+    size = settings.CHAT_RECENT_BUFFER_SIZE
+    if size <= 0 or not _acquire(thread_id):
+        return False
+    try:
+        if sequence(thread_id) != seq:
+            return False
+        cache.set(
+            _key(thread_id),
+            {"messages": list(messages[-size:]), "complete": complete and len(messages) <= size},
+            settings.CHAT_RECENT_BUFFER_TTL,
+        )
+        return True
+    finally:
+        cache.delete(_lock_key(thread_id))
+
+
+def append(thread_id, message):
+    def change(ring):
+        messages = ring["messages"]
+        ids = [entry["id"] for entry in messages]
+        index = bisect_left(ids, message["id"])
+        if index < len(ids) and ids[index] == message["id"]:
+            return
+        messages.insert(index, message)
+        overflow = len(messages) - settings.CHAT_RECENT_BUFFER_SIZE
+        if overflow > 0:
+            del messages[:overflow]
+            ring["complete"] = False
+
+    _mutate(thread_id, change)
+
+
+def update(thread_id, message_id, **fields):
+    def change(ring):
+        for entry in ring["messages"]:
+            if entry["id"] == message_id:
+                entry.update(fields)
+
+    _mutate(thread_id, change)
+
+
+def remove(thread_id, message_id):
+    def change(ring):
+        ring["messages"] = [entry for entry in ring["messages"] if entry["id"] != message_id]
+
+    _mutate(thread_id, change)
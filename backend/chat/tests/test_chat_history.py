@@ -0,0 +1,153 @@
+import json
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from unittest.mock import AsyncMock
+
+from chat.database import ChatDatabase
+from chat.handlers import MessageHandler
+from chat.models import chat_messages, chat_threads
+from plans.models import Plans
+from users.models import Users
+
+
+@override_settings(CHAT_HISTORY_PAGE_SIZE=4, CHAT_HISTORY_MAX_PAGE_SIZE=10)
+class ChatHistoryPaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()  # recent-message rings and unread counts are keyed by ids reused across tests
+        self.user = Users.objects.create_user(username="alice", password="pass1234")
+        self.plan = Plans.objects.create(
+            title="Test Plan",
+            description="desc",
+            location="here",
+            leader_id=self.user,
+            event_time=timezone.now(),
+            max_people=5,
+        )
+        self.thread = chat_threads.objects.create(title="Chat", plan=self.plan, created_by=self.user)
+        base = timezone.now() - timedelta(hours=1)
+        self.messages = []
+        for index in range(10):
+            message = chat_messages.objects.create(thread=self.thread, sender=self.user, body=f"m{index}")
+            chat_messages.objects.filter(pk=message.pk).update(create_at=base + timedelta(minutes=index))
+            self.messages.append(message)
+        self.db = ChatDatabase()
+
+    def bodies(self, page):
+        return [entry["message"] for entry in page["messages"]]
+
+    def test_history_returns_latest_page_oldest_first(self):
+        history = async_to_sync(self.db.get_chat_history)(self.thread)
+        self.assertEqual([entry["message"] for entry in history], ["m6", "m7", "m8", "m9"])
+
+        page = async_to_sync(self.db.load_history)(self.thread)
+        self.assertTrue(page["has_more_before"])
+        self.assertFalse(page["has_more_after"])
+
+    def test_before_and_after_cursors(self):
+        older = async_to_sync(self.db.load_history)(self.thread, before=self.messages[6].id)
+        self.assertEqual(self.bodies(older), ["m2", "m3", "m4", "m5"])
+        self.assertTrue(older["has_more_before"])
+
+        oldest = async_to_sync(self.db.load_history)(self.thread, before=self.messages[2].id)
+        self.assertEqual(self.bodies(oldest), ["m0", "m1"])
+        self.assertFalse(oldest["has_more_before"])
+
+        newer = async_to_sync(self.db.load_history)(self.thread, after=self.messages[6].id, limit=2)
+        self.assertEqual(self.bodies(newer), ["m7", "m8"])
+        self.assertTrue(newer["has_more_after"])
+
+    def test_around_returns_context_window(self):
+        page = async_to_sync(self.db.load_history)(self.thread, around=self.messages[1].id, limit=5)
+        self.assertEqual(self.bodies(page), ["m0", "m1", "m2", "m3"])
+        self.assertFalse(page["has_more_before"])
+        self.assertTrue(page["has_more_after"])
+
+    def test_unknown_cursor_returns_none(self):
+        other = chat_threads.objects.create(title="Other", plan=self.plan, created_by=self.user)
+        stranger = chat_messages.objects.create(thread=other, sender=self.user, body="elsewhere")
+        self.assertIsNone(async_to_sync(self.db.load_history)(self.thread, before=stranger.id))
+
+    def test_handler_sends_history_page(self):
+        consumer = type("Consumer", (), {})()
+        consumer.thread = self.thread
+        consumer.thread_id = self.thread.id
+        consumer.channel_layer = type("layer", (), {"group_send": AsyncMock()})()
+        consumer.sent = []
+
+        async def send(payload):
+            consumer.sent.append(payload)
+
+        consumer.send = send
+        handler = MessageHandler(consumer)
+
+        async_to_sync(handler.handle_load_history)({"before": self.messages[4].id, "limit": 2}, self.user)
+        frame = json.loads(consumer.sent[-1])
+        self.assertEqual(frame["type"], "chat_history_page")
+        self.assertEqual(frame["direction"], "before")
+        self.assertEqual([entry["message"] for entry in frame["messages"]], ["m2", "m3"])
+
+        async_to_sync(handler.handle_load_history)({"before": 1, "after": 2}, self.user)
+        self.assertIn("error", json.loads(consumer.sent[-1]))
+
+
+@override_settings(CHAT_HISTORY_PAGE_SIZE=3, CHAT_RECENT_BUFFER_SIZE=4)
+class RecentMessageRingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = Users.objects.create_user(username="alice", password="pass1234")
+        self.plan = Plans.objects.create(
+            title="Test Plan",
+            description="desc",
+            location="here",
+            leader_id=self.user,
+            event_time=timezone.now(),
+            max_people=5,
+        )
+        self.thread = chat_threads.objects.create(title="Chat", plan=self.plan, created_by=self.user)
+        self.db = ChatDatabase()
+
+    def send(self, body):
+        with self.captureOnCommitCallbacks(execute=True):
+            return async_to_sync(self.db.save_message)(self.thread.id, self.user, body)
+
+    def latest(self):
+        return [entry["message"] for entry in async_to_sync(self.db.get_chat_history)(self.thread)]
+
+    def test_connect_page_is_served_from_the_ring(self):
+        for body in ("a", "b", "c", "d"):
+            self.send(body)
+        self.assertEqual(self.latest(), ["b", "c", "d"])  # rebuilds the ring from the database
+
+        # Only the receipts are read from the database now
+        with self.assertNumQueries(1):
+            page = async_to_sync(self.db.load_history)(self.thread)
+        self.assertEqual([entry["message"] for entry in page["messages"]], ["b", "c", "d"])
+        self.assertTrue(page["has_more_before"])
+
+    def test_send_edit_delete_update_the_ring(self):
+        first = self.send("a")
+        self.latest()
+        second = self.send("b")
+        async_to_sync(self.db.edit_message)(first["id"], self.thread.id, self.user, "a (edited)")
+        with self.assertNumQueries(1):
+            self.assertEqual(self.latest(), ["a (edited)", "b"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            async_to_sync(self.db.delete_message)(second["id"], self.thread.id, self.user)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.latest(), ["a (edited)"])
+
+    def test_incomplete_ring_falls_back_to_database(self):
+        for body in ("a", "b", "c", "d", "e"):
+            self.send(body)
+        self.latest()
+        for message_id in [entry["id"] for entry in async_to_sync(self.db.get_chat_history)(self.thread)][:2]:
+            with self.captureOnCommitCallbacks(execute=True):
+                async_to_sync(self.db.delete_message)(message_id, self.thread.id, self.user)
+
+        # One message left in a ring that isn't the whole thread: served from the database instead
+        self.assertEqual(self.latest(), ["a", "b", "e"])
@@ -0,0 +1,114 @@
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from chat import membership, unread
+from chat.database import ChatDatabase
+from chat.models import chat_member, chat_threads
+from plans.models import Plans
+from users.models import Users
+
+
+class ChatJoinTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.leader = Users.objects.create_user(username="alice", password="pass1234")
+        self.member = Users.objects.create_user(username="bob", password="pass1234")
+        self.plan = Plans.objects.create(
+            title="Test Plan",
+            description="desc",
+            location="here",
+            leader_id=self.leader,
+            event_time=timezone.now() + timezone.timedelta(days=1),
+            max_people=5,
+        )
+
+    def _join_chat(self, user):
+        return async_to_sync(ChatDatabase.join_chat)(self.plan.id, user)
+
+    def test_leader_gets_thread_and_membership_in_one_call(self):
+        thread, error = self._join_chat(self.leader)
+        self.assertIsNone(error)
+        self.assertEqual(thread.plan_id, self.plan.id)
+        self.assertTrue(chat_member.objects.filter(thread=thread, user=self.leader).exists())
+
+        # A reconnect is served from the membership cache
+        with self.assertNumQueries(0):
+            cached, error = self._join_chat(self.leader)
+        self.assertEqual(cached.id, thread.id)
+
+    def test_non_participant_is_refused(self):
+        thread, error = self._join_chat(self.member)
+        self.assertIsNone(thread)
+        self.assertIn("join this plan", error)
+        self.assertFalse(chat_threads.objects.exists())
+
+    def _unread_after_message(self):
+        thread, _ = self._join_chat(self.member)
+        with self.captureOnCommitCallbacks(execute=True):
+            async_to_sync(ChatDatabase.save_message)(thread.id, self.leader, "hello")
+        self.assertIn(thread.id, unread.thread_counts(self.member))  # now cached
+
+    def test_leave_and_plan_delete_invalidate_cached_unread_counts(self):
+        url = reverse("plan-join", args=[self.plan.id])
+        self.client.force_authenticate(self.member)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(url)
+        self._join_chat(self.leader)
+        self._unread_after_message()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(url)
+        self.assertEqual(unread.thread_counts(self.member), {})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(url)
+        self._unread_after_message()
+        self.client.force_authenticate(self.leader)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(reverse("plan-detail", kwargs={"pk": self.plan.id}))
+        self.assertEqual(unread.thread_counts(self.member), {})
+
+    def test_new_member_starts_with_nothing_unread(self):
+        thread, _ = self._join_chat(self.leader)
+        for body in ("one", "two"):
+            async_to_sync(ChatDatabase.save_message)(thread.id, self.leader, body)
+
+        self.client.force_authenticate(self.member)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("plan-join", args=[self.plan.id]))
+        self.assertEqual(unread.thread_counts(self.member), {})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            async_to_sync(ChatDatabase.save_message)(thread.id, self.leader, "three")
+        self.assertEqual(unread.thread_counts(self.member), {thread.id: 1})
+
+    def test_plan_delete_invalidates_cached_access(self):
+        self._join_chat(self.leader)
+        self.assertIsNotNone(membership.get(self.plan.id, self.leader.id))
+
+        plan_id = self.plan.id
+        self.client.force_authenticate(self.leader)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(reverse("plan-detail", kwargs={"pk": plan_id}))
+        self.assertIsNone(membership.get(plan_id, self.leader.id))
+        thread, error = async_to_sync(ChatDatabase.join_chat)(plan_id, self.leader)
+        self.assertIsNone(thread)
+        self.assertIsNotNone(error)
+
+    def test_join_and_leave_invalidate_cached_access(self):
+        url = reverse("plan-join", args=[self.plan.id])
+        self.client.force_authenticate(self.member)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(url)
+        thread, error = self._join_chat(self.member)
+        self.assertIsNotNone(thread)
+        self.assertIsNotNone(membership.get(self.plan.id, self.member.id))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(url)
+        self.assertIsNone(membership.get(self.plan.id, self.member.id))
+        thread, error = self._join_chat(self.member)
+        self.assertIsNone(thread)
@@ -0,0 +1,153 @@
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from chat.database import ChatDatabase
+from chat.fanout import ChatFanout
+from chat.models import chat_fanout_outbox, chat_threads
+from notifications.counters import unread_counters
+from notifications.models import Notification
+from plans.models import Plans
+from users.models import Users
+
+
+class ChatNotificationCoalescingTests(TestCase):
+    def setUp(self):
+        self.leader = Users.objects.create_user(username="alice", password="pass1234")
+        self.member = Users.objects.create_user(username="bob", password="pass1234")
+        self.plan = Plans.objects.create(
+            title="Test Plan",
+            description="desc",
+            location="here",
+            leader_id=self.leader,
+            event_time=timezone.now() + timezone.timedelta(days=1),
+            max_people=5,
+        )
+        self.thread = chat_threads.objects.create(title="Chat", plan=self.plan, created_by=self.leader)
+
+    def _send(self, body):
+        saved = async_to_sync(ChatDatabase.save_message)(self.thread.id, self.member, body)
+        ChatDatabase._fan_out_messages(self.thread.id, self.member.id, [saved["id"]])
+        return saved
+
+    def test_fan_out_runs_after_the_send_and_batches_a_burst(self):
+        fanout = ChatFanout()
+        saved = [async_to_sync(ChatDatabase.save_message)(self.thread.id, self.member, body) for body in "abc"]
+        self.assertFalse(Notification.objects.filter(user=self.leader).exists())
+
+        async def queue():
+            for entry in saved:
+                fanout.enqueue(self.thread.id, self.member.id, entry["id"])
+
+        async_to_sync(queue)()
+        self.assertEqual(fanout.flush_sync(), 1)
+        notification = Notification.objects.get(user=self.leader, chat_thread=self.thread)
+        self.assertEqual(notification.group_count, 3)
+        self.assertEqual(notification.chat_message_id, saved[-1]["id"])
+
+    def test_outbox_makes_a_lost_fan_out_recoverable(self):
+        # The worker died after the send: nothing was queued in memory
+        saved = async_to_sync(ChatDatabase.save_message)(self.thread.id, self.member, "lost")
+        self.assertTrue(chat_fanout_outbox.objects.filter(message_id=saved["id"]).exists())
+
+        self.assertEqual(ChatDatabase._drain_fanout_outbox(older_than=0), 1)
+        self.assertEqual(Notification.objects.get(user=self.leader, chat_thread=self.thread).group_count, 1)
+        self.assertFalse(chat_fanout_outbox.objects.exists())
+
+        # A late in-memory flush of the same message finds nothing left to claim
+        self.assertEqual(ChatDatabase._fan_out_messages(self.thread.id, self.member.id, [saved["id"]]), 0)
+        self.assertEqual(Notification.objects.get(user=self.leader, chat_thread=self.thread).group_count, 1)
+
+    def test_exit_flush_leaves_other_workers_outbox_rows_alone(self):
+        saved = async_to_sync(ChatDatabase.save_message)(self.thread.id, self.member, "elsewhere")
+        with override_settings(CHAT_FANOUT_RECOVER_AFTER_S=0):
+            ChatFanout().flush_sync(recover=False)
+        self.assertTrue(chat_fanout_outbox.objects.filter(message_id=saved["id"]).exists())
+
+    def test_failed_fan_out_stays_in_the_outbox(self):
+        saved = async_to_sync(ChatDatabase.save_message)(self.thread.id, self.member, "retry me")
+        with mock.patch("notifications.preferences.recipient_modes", side_effect=RuntimeError("db down")):
+            with self.assertRaises(RuntimeError):
+                ChatDatabase._fan_out_messages(self.thread.id, self.member.id, [saved["id"]])
+        self.assertTrue(chat_fanout_outbox.objects.filter(message_id=saved["id"]).exists())
+
+        self.assertEqual(ChatDatabase._drain_fanout_outbox(older_than=0), 1)
+        self.assertTrue(Notification.objects.filter(user=self.leader, chat_thread=self.thread).exists())
+
+    def test_messages_collapse_into_one_unread_row_per_thread(self):
+        self._send("first")
+        last = self._send("second")
+
+        rows = Notification.objects.filter(user=self.leader, chat_thread=self.thread)
+        self.assertEqual(rows.count(), 1)
+        notification = rows.get()
+        self.assertEqual(notification.group_count, 2)
+        self.assertEqual(notification.chat_message_id, last["id"])
+        self.assertTrue(notification.message.endswith("second"))
+        self.assertEqual(unread_counters(self.leader.id), (1, {"CHAT": 1}))
+
+        # Once read, the next message opens a fresh row
+        notification.mark_as_read()
+        self._send("third")
+        self.assertEqual(Notification.objects.filter(user=self.leader, chat_thread=self.thread).count(), 2)
+
+    def test_deleting_the_newest_message_shrinks_the_coalesced_row(self):
+        first = self._send("first")
+        last = self._send("second")
+
+        async_to_sync(ChatDatabase.delete_message)(last["id"], self.thread.id, self.member)
+        notification = Notification.objects.get(user=self.leader, chat_thread=self.thread)
+        self.assertEqual(notification.group_count, 1)
+        self.assertEqual(notification.chat_message_id, first["id"])
+        self.assertTrue(notification.message.endswith("first"))
+        self.assertEqual(unread_counters(self.leader.id), (1, {"CHAT": 1}))
+
+        async_to_sync(ChatDatabase.delete_message)(first["id"], self.thread.id, self.member)
+        self.assertFalse(Notification.objects.filter(user=self.leader, chat_thread=self.thread).exists())
+        self.assertEqual(unread_counters(self.leader.id)[0], 0)
+
+    def test_coalesced_row_returns_to_the_top_of_the_list(self):
+        self._send("first")
+        notification = Notification.objects.get(user=self.leader, chat_thread=self.thread)
+        newer = Notification.objects.create(
+            user=self.leader, notification_type="PLAN_UPDATED", topic="PLAN", message="Updated", plan=self.plan
+        )
+        self._send("second")
+
+        coalesced = Notification.objects.get(id=notification.id)
+        self.assertEqual(coalesced.group_count, 2)
+        self.assertGreater(coalesced.last_activity_at, newer.last_activity_at)
+
+        client = APIClient()
+        client.force_authenticate(self.leader)
+        response = client.get(reverse("notifications-list"), {"page_size": 1, "include_total": "false"})
+        self.assertEqual([row["id"] for row in response.data["notifications"]], [notification.id])
+        response = client.get(
+            reverse("notifications-list"), {"cursor": response.data["next_cursor"], "include_total": "false"}
+        )
+        self.assertEqual([row["id"] for row in response.data["notifications"]], [newer.id])
+
+    def test_active_viewers_are_skipped(self):
+        from chat import presence
+
+        presence.join(self.thread.id, self.leader.id)
+        presence.join(self.thread.id, self.leader.id)  # second tab
+        self._send("live")
+        self.assertFalse(Notification.objects.filter(user=self.leader).exists())
+
+        presence.leave(self.thread.id, self.leader.id)
+        self.assertEqual(presence.active_viewers(self.thread.id, [self.leader.id]), {self.leader.id})
+        presence.leave(self.thread.id, self.leader.id)
+        self._send("away")
+        self.assertTrue(Notification.objects.filter(user=self.leader).exists())
+
+    def test_muted_thread_gets_no_rows(self):
+        from notifications.models import NotificationPreference
+
+        NotificationPreference.objects.create(user=self.leader, chat_thread=self.thread, mode="MUTE")
+        self._send("quiet please")
+        self.assertFalse(Notification.objects.filter(user=self.leader).exists())
@@ -0,0 +1,104 @@
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from chat.database import ChatDatabase
+from chat.models import chat_member, chat_threads
+from plans.models import Plans
+from users.models import Users
+
+
+class ChatThreadSummaryTests(APITestCase):
+    def setUp(self):
+        self.alice = Users.objects.create_user(username="alice", password="pass1234")
+        self.bob = Users.objects.create_user(username="bob", password="pass1234")
+        cache.clear()  # cached unread counts are keyed by user id
+        self.threads = []
+        for index in range(3):
+            plan = Plans.objects.create(
+                title=f"Plan {index}",
+                description="desc",
+                location="here",
+                leader_id=self.alice,
+                event_time=timezone.now(),
+                max_people=5,
+            )
+            thread = chat_threads.objects.create(title=f"Chat {index}", plan=plan, created_by=self.alice)
+            chat_member.objects.create(thread=thread, user=self.alice)
+            chat_member.objects.create(thread=thread, user=self.bob)
+            self.threads.append(thread)
+        self.thread = self.threads[0]
+
+    def _send(self, thread, user, body):
+        return async_to_sync(ChatDatabase.save_message)(thread.id, user, body)
+
+    def test_send_edit_delete_keep_summary(self):
+        first = self._send(self.thread, self.alice, "first")
+        second = self._send(self.thread, self.bob, "x" * 200)
+        self.thread.refresh_from_db()
+        self.assertEqual(self.thread.message_count, 2)
+        self.assertEqual(self.thread.last_message_id, second["id"])
+        self.assertEqual(self.thread.last_message_sender_id, self.bob.id)
+        self.assertEqual(len(self.thread.last_message_preview), 140)
+
+        async_to_sync(ChatDatabase.edit_message)(second["id"], self.thread.id, self.bob, "edited")
+        self.thread.refresh_from_db()
+        self.assertEqual(self.thread.last_message_preview, "edited")
+
+        async_to_sync(ChatDatabase.delete_message)(second["id"], self.thread.id, self.bob)
+        self.thread.refresh_from_db()
+        self.assertEqual(self.thread.message_count, 1)
+        self.assertEqual(self.thread.last_message_id, first["id"])
+        self.assertEqual(self.thread.last_message_preview, "first")
+
+        async_to_sync(ChatDatabase.delete_message)(first["id"], self.thread.id, self.alice)
+        self.thread.refresh_from_db()
+        self.assertEqual(self.thread.message_count, 0)
+        self.assertIsNone(self.thread.last_message_id)
+
+    def test_thread_list_is_sorted_and_paginated(self):
+        self._send(self.threads[1], self.bob, "older")
+        self._send(self.threads[0], self.bob, "newest")
+        self.client.force_authenticate(self.alice)
+        url = reverse("chat-threads")
+
+        response = self.client.get(url, {"page_size": 2})
+        self.assertEqual(response.status_code, 200)
+        page = response.json()
+        self.assertEqual([entry["thread_id"] for entry in page["threads"]], [self.threads[0].id, self.threads[1].id])
+        self.assertEqual(page["threads"][0]["last_message"], "newest")
+        self.assertEqual(page["threads"][0]["unread_count"], 1)
+        self.assertTrue(page["has_next"])
+
+        response = self.client.get(url, {"page_size": 2, "cursor": page["next_cursor"]})
+        rest = response.json()
+        self.assertEqual([entry["thread_id"] for entry in rest["threads"]], [self.threads[2].id])
+        self.assertIsNone(rest["threads"][0]["last_message"])
+        self.assertFalse(rest["has_next"])
+
+        self.assertEqual(self.client.get(url, {"cursor": "bogus"}).status_code, 400)
+
+    def test_unread_endpoint_is_cached_and_invalidated(self):
+        first = self._send(self.threads[0], self.bob, "one")
+        self._send(self.threads[1], self.bob, "two")
+        self.client.force_authenticate(self.alice)
+        url = reverse("chat-unread")
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["unread_count"], 2)
+        with self.assertNumQueries(0):
+            cached = self.client.get(url).json()
+        self.assertEqual(
+            {row["thread_id"]: row["plan_id"] for row in cached["threads"]},
+            {self.threads[0].id: self.threads[0].plan_id, self.threads[1].id: self.threads[1].plan_id},
+        )
+
+        # Reading invalidates the reader, sending invalidates every member
+        ChatDatabase._advance_read_watermark(self.threads[0].id, self.alice.id, first["id"])
+        self.assertEqual(self.client.get(url).json()["unread_count"], 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self._send(self.threads[2], self.bob, "three")
+        self.assertEqual(self.client.get(url).json()["unread_count"], 2)
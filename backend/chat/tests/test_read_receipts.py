@@ -1,17 +1,20 @@
 from asgiref.sync import async_to_sync
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 from django.utils import timezone
 from unittest.mock import AsyncMock
 
 from chat.database import ChatDatabase
 from chat.handlers import MessageHandler
-from chat.models import chat_message_reads, chat_messages, chat_threads
+from chat.models import chat_member, chat_messages, chat_threads
+from chat.read_buffer import ReadReceiptBuffer, read_buffer
 from plans.models import Plans
 from users.models import Users
 
 
 class ChatReadReceiptTests(TestCase):
     def setUp(self):
+        cache.clear()  # recent-message rings and unread counts are keyed by ids reused across tests
         self.user1 = Users.objects.create_user(username="alice", password="pass1234")
         self.user2 = Users.objects.create_user(username="bob", password="pass1234")
         self.user3 = Users.objects.create_user(username="carol", password="pass1234")
@@ -33,16 +36,48 @@ class ChatReadReceiptTests(TestCase):
             sender=self.user1,
             body="Hello world",
         )
+        for user in (self.user1, self.user2, self.user3):
+            chat_member.objects.create(thread=self.thread, user=user)
         self.db = ChatDatabase()
 
-    def test_mark_messages_read_creates_receipt(self):
+    def read_up_to(self, user, message):
+        chat_member.objects.filter(thread=self.thread, user=user).update(
+            last_read_message_id=message.id, last_read_at=timezone.now()
+        )
+
+    def test_mark_messages_read_advances_watermark(self):
+        async_to_sync(self.db.mark_messages_read)(self.thread, self.user2, [self.message.id])
+        member = chat_member.objects.get(thread=self.thread, user=self.user2)
+        self.assertEqual(member.last_read_message_id, self.message.id)
+
+    def test_watermark_never_moves_back(self):
+        later = chat_messages.objects.create(thread=self.thread, sender=self.user1, body="Later")
+        async_to_sync(self.db.mark_messages_read)(self.thread, self.user2, [later.id])
         async_to_sync(self.db.mark_messages_read)(self.thread, self.user2, [self.message.id])
-        exists = chat_message_reads.objects.filter(message=self.message, user=self.user2).exists()
-        self.assertTrue(exists)
+        member = chat_member.objects.get(thread=self.thread, user=self.user2)
+        self.assertEqual(member.last_read_message_id, later.id)
+
+    def test_unread_counts_follow_watermark(self):
+        chat_messages.objects.create(thread=self.thread, sender=self.user1, body="Second")
+        chat_messages.objects.create(thread=self.thread, sender=self.user2, body="Own message")
+        self.assertEqual(ChatDatabase._unread_counts(self.user2), {self.thread.id: 2})
+
+        self.read_up_to(self.user2, self.message)
+        self.assertEqual(ChatDatabase._unread_counts(self.user2), {self.thread.id: 1})
+
+    def test_sending_only_advances_a_caught_up_watermark(self):
+        member = chat_member.objects.filter(thread=self.thread, user=self.user2)
+        async_to_sync(self.db.save_message)(self.thread.id, self.user2, "Without reading")
+        self.assertIsNone(member.get().last_read_message_id)
+        self.assertEqual(ChatDatabase._unread_counts(self.user2), {self.thread.id: 1})
+
+        self.read_up_to(self.user2, self.message)
+        saved = async_to_sync(self.db.save_message)(self.thread.id, self.user2, "After reading")
+        self.assertEqual(member.get().last_read_message_id, saved["id"])
 
     def test_get_chat_history_includes_receipts(self):
-        chat_message_reads.objects.create(message=self.message, user=self.user2)
-        chat_message_reads.objects.create(message=self.message, user=self.user3)
+        self.read_up_to(self.user2, self.message)
+        self.read_up_to(self.user3, self.message)
 
         history = async_to_sync(self.db.get_chat_history)(self.thread)
         self.assertEqual(len(history), 1)
@@ -51,9 +86,35 @@ class ChatReadReceiptTests(TestCase):
         self.assertIn("bob", usernames)
         self.assertIn("carol", usernames)
 
+    def test_history_receipts_use_one_query_per_page(self):
+        for index in range(5):
+            message = chat_messages.objects.create(thread=self.thread, sender=self.user1, body=f"m{index}")
+        self.read_up_to(self.user2, message)
+        self.read_up_to(self.user3, message)
 
+        # One for the page of messages, one for the watermarks behind every receipt on it
+        with self.assertNumQueries(2):
+            history = async_to_sync(self.db.get_chat_history)(self.thread)
+        self.assertEqual(len(history), 6)
+        self.assertEqual(len(history[-1]["read_receipts"]), 2)
+
+    @override_settings(CHAT_RECEIPT_PREVIEW_SIZE=1)
+    def test_compact_receipts_report_count_and_latest_readers(self):
+        self.read_up_to(self.user2, self.message)
+        self.read_up_to(self.user3, self.message)
+        silent = chat_messages.objects.create(thread=self.thread, sender=self.user1, body="Nobody saw this")
+
+        history = async_to_sync(self.db.get_chat_history)(self.thread, compact_receipts=True)
+        by_id = {entry["id"]: entry for entry in history}
+        self.assertEqual(by_id[self.message.id]["read_count"], 2)
+        self.assertEqual(len(by_id[self.message.id]["read_receipts"]), 1)
+        self.assertEqual(by_id[silent.id]["read_count"], 0)
+
+
+@override_settings(CHAT_READ_FLUSH_MS=0)
 class MessageHandlerMarkReadTests(TestCase):
     def setUp(self):
+        cache.clear()
         self.user1 = Users.objects.create_user(username="alice", password="pass1234")
         self.user2 = Users.objects.create_user(username="bob", password="pass1234")
         self.plan = Plans.objects.create(
@@ -74,6 +135,7 @@ class MessageHandlerMarkReadTests(TestCase):
             sender=self.user1,
             body="Hello",
         )
+        chat_member.objects.create(thread=self.thread, user=self.user2)
 
         class DummyConsumer:
             def __init__(self, thread):
@@ -88,15 +150,87 @@ class MessageHandlerMarkReadTests(TestCase):
 
         self.consumer = DummyConsumer(self.thread)
         self.handler = MessageHandler(self.consumer)
+        self.addCleanup(read_buffer.flush_sync)
+
+    def test_handle_mark_read_broadcasts_one_aggregated_event(self):
+        second = chat_messages.objects.create(thread=self.thread, sender=self.user1, body="Again")
+        own = chat_messages.objects.create(thread=self.thread, sender=self.user2, body="Mine")
 
-    def test_handle_mark_read_broadcasts_event(self):
         async_to_sync(self.handler.handle_mark_read)(
-            {"message_ids": [self.message.id]},
+            {"message_ids": [self.message.id, second.id, own.id]},
             self.user2,
         )
-        self.consumer.channel_layer.group_send.assert_awaited()
+        self.assertEqual(self.consumer.channel_layer.group_send.await_count, 1)
         args, kwargs = self.consumer.channel_layer.group_send.await_args
         self.assertEqual(args[0], self.consumer.room_group_name)
         event = args[1]
-        self.assertEqual(event.get("type"), "read_receipt")
-        self.assertEqual(event.get("message_id"), self.message.id)
+        self.assertEqual(event.get("type"), "read_receipts")
+        self.assertEqual(event.get("message_ids"), [self.message.id, second.id])
+        self.assertIsNone(event.get("after_message_id"))
+        self.assertEqual(event.get("last_read_message_id"), own.id)
+        self.assertEqual(event["reader"]["username"], "bob")
+
+    def test_handle_mark_read_skips_broadcast_when_already_read(self):
+        async_to_sync(self.handler.handle_mark_read)({"message_ids": [self.message.id]}, self.user2)
+        async_to_sync(self.handler.handle_mark_read)({"message_ids": [self.message.id]}, self.user2)
+        self.assertEqual(self.consumer.channel_layer.group_send.await_count, 1)
+
+
+@override_settings(CHAT_READ_FLUSH_MS=60_000, CHAT_READ_FLUSH_SIZE=2)
+class ReadReceiptBufferTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.alice = Users.objects.create_user(username="alice", password="pass1234")
+        self.bob = Users.objects.create_user(username="bob", password="pass1234")
+        self.carol = Users.objects.create_user(username="carol", password="pass1234")
+        self.plan = Plans.objects.create(
+            title="Test Plan",
+            description="desc",
+            location="here",
+            leader_id=self.alice,
+            event_time=timezone.now(),
+            max_people=5,
+        )
+        self.thread = chat_threads.objects.create(title="Chat Thread", plan=self.plan, created_by=self.alice)
+        self.first = chat_messages.objects.create(thread=self.thread, sender=self.alice, body="one")
+        self.second = chat_messages.objects.create(thread=self.thread, sender=self.alice, body="two")
+        for user in (self.bob, self.carol):
+            chat_member.objects.create(thread=self.thread, user=user)
+        self.buffer = ReadReceiptBuffer()
+
+    def watermark(self, user):
+        return chat_member.objects.get(thread=self.thread, user=user).last_read_message_id
+
+    def test_receipt_is_broadcast_before_the_write(self):
+        receipt = async_to_sync(self.buffer.mark_read)(self.thread, self.bob, [self.first.id])
+        self.assertEqual(receipt["message_ids"], [self.first.id])
+        self.assertIsNone(self.watermark(self.bob))
+
+        # Later reads of the same member coalesce into one pending entry
+        receipt = async_to_sync(self.buffer.mark_read)(self.thread, self.bob, [self.second.id])
+        self.assertEqual(receipt["after_message_id"], self.first.id)
+        self.assertIsNone(async_to_sync(self.buffer.mark_read)(self.thread, self.bob, [self.first.id]))
+
+        self.assertEqual(self.buffer.flush_sync(), 1)
+        self.assertEqual(self.watermark(self.bob), self.second.id)
+
+    def test_flushes_when_size_reached(self):
+        async_to_sync(self.buffer.mark_read)(self.thread, self.bob, [self.first.id])
+        async_to_sync(self.buffer.mark_read)(self.thread, self.carol, [self.second.id])
+        self.assertEqual(self.watermark(self.bob), self.first.id)
+        self.assertEqual(self.watermark(self.carol), self.second.id)
+
+    def test_flush_never_moves_watermark_back(self):
+        async_to_sync(self.buffer.mark_read)(self.thread, self.bob, [self.first.id])
+        # Another worker already wrote a newer watermark
+        chat_member.objects.filter(thread=self.thread, user=self.bob).update(last_read_message_id=self.second.id)
+        self.assertEqual(self.buffer.flush_sync(), 0)
+        self.assertEqual(self.watermark(self.bob), self.second.id)
+
+    def test_watermark_written_by_another_worker_is_seen(self):
+        async_to_sync(self.buffer.mark_read)(self.thread, self.bob, [self.first.id])
+        self.buffer.flush_sync()
+        chat_member.objects.filter(thread=self.thread, user=self.bob).update(last_read_message_id=self.second.id)
+
+        # Already read elsewhere: no stale receipt is broadcast from this worker
+        self.assertIsNone(async_to_sync(self.buffer.mark_read)(self.thread, self.bob, [self.second.id]))
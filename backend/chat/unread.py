@@ -0,0 +1,48 @@
+"""
+Per-user chat unread counts, cached in the shared Redis cache.
+
+Counts are derived from each member's read watermark (ChatDatabase._unread_rows) and cached per
+user for CHAT_UNREAD_CACHE_TTL seconds. Sending or deleting a message invalidates every member of
+the thread; a watermark write invalidates the reader; leaving a plan or deleting it invalidates the
+members who lose the thread.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+def _key(user_id):
+    return f"chat_unread:{user_id}"
+
+
+def unread_rows(user):
+    """[{"thread_id", "plan_id", "unread_count"}] for every thread of the user with unread messages."""
+    from chat.database import ChatDatabase
+
+    key = _key(user.id)
+    rows = cache.get(key)
+    if rows is None:
+        rows = [
+            {"thread_id": thread_id, "plan_id": plan_id, "unread_count": count}
+            for thread_id, plan_id, count in ChatDatabase._unread_rows(user)
+        ]
+        cache.set(key, rows, settings.CHAT_UNREAD_CACHE_TTL)
+    return rows
+
+
+def thread_counts(user):
+    """{thread_id: unread_count} for the user; threads with nothing unread are omitted."""
+    return {row["thread_id"]: row["unread_count"] for row in unread_rows(user)}
+
+
+def invalidate(user_ids):
+    keys = [_key(user_id) for user_id in user_ids]
+    if keys:
+        cache.delete_many(keys)
+
+
+def invalidate_thread(thread_id):
+    """Drop the cached counts of every member of the thread."""
+    from chat.models import chat_member
+
+    invalidate(chat_member.objects.filter(thread_id=thread_id).values_list("user_id", flat=True))
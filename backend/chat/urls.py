@@ -1,8 +1,9 @@
 from django.urls import path
 
-from chat.views import UserChatThreadsView
+from chat.views import ChatUnreadCountsView, UserChatThreadsView
 
 urlpatterns = [
     path("threads/", UserChatThreadsView.as_view(), name="chat-threads"),
+    path("unread/", ChatUnreadCountsView.as_view(), name="chat-unread"),
 ]
 
@@ -1,12 +1,17 @@
+import base64
+import binascii
 from datetime import datetime
 
-from django.db.models import Prefetch
+from django.db.models import Prefetch, Q
 from django.utils import timezone
+from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from chat.models import chat_threads, chat_messages
+from chat import unread
+from chat.database import ChatDatabase
+from chat.models import chat_threads
 from plans.models import PlanImage
 
 import pytz
@@ -16,82 +21,124 @@ BANGKOK_TZ = pytz.timezone("Asia/Bangkok")
 
 
 class UserChatThreadsView(APIView):
-    """Return all chat threads the current user participates in."""
+    """Return the chat threads the current user participates in, newest activity first."""
 
     permission_classes = [IsAuthenticated]
 
+    @staticmethod
+    def _page_size(value, default=20, max_value=50):
+        try:
+            parsed = int(value)
+            if parsed < 1:
+                raise ValueError
+            return min(parsed, max_value)
+        except (TypeError, ValueError):
+            return default
+
+    @staticmethod
+    def _encode_cursor(thread):
+        raw = f"{thread.last_message_at.isoformat()}|{thread.id}"
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    @staticmethod
+    def _decode_cursor(value):
+        try:
+            last_message_at, thread_id = base64.urlsafe_b64decode(value.encode()).decode().rsplit("|", 1)
+            return datetime.fromisoformat(last_message_at), int(thread_id)
+        except (TypeError, ValueError, UnicodeDecodeError, binascii.Error):
+            return None
+
     def get(self, request):
+        """
+        List threads by the last-message summary stored on chat_threads, so no message rows are scanned.
+        Paginated by an opaque `cursor` on (last_message_at, id); pass `next_cursor` back to get the next page.
+        """
         user = request.user
+        params = request.query_params
+        page_size = self._page_size(params.get("page_size") or params.get("limit"))
+
+        threads_qs = chat_threads.objects.filter(member__user=user)
+
+        cursor_param = params.get("cursor")
+        if cursor_param:
+            cursor = self._decode_cursor(cursor_param)
+            if cursor is None:
+                return Response(
+                    {
+                        "message": "Invalid cursor parameter.",
+                        "status_code": status.HTTP_400_BAD_REQUEST,
+                    },
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            last_message_at, thread_id = cursor
+            threads_qs = threads_qs.filter(
+                Q(last_message_at__lt=last_message_at) | Q(last_message_at=last_message_at, id__lt=thread_id)
+            )
 
         plan_images_prefetch = Prefetch(
             "plan__images",
             queryset=PlanImage.objects.order_by("uploaded_at"),
         )
-
-        threads_qs = (
-            chat_threads.objects.filter(member__user=user)
-            .select_related("plan", "plan__leader_id")
-            .prefetch_related("member", plan_images_prefetch)
-            .distinct()
-        )
-
-        threads = list(threads_qs)
-
-        # Fetch latest message per thread
-        latest_messages = (
-            chat_messages.objects.filter(thread__in=threads)
-            .select_related("thread", "sender")
-            .order_by("thread_id", "-create_at")
+        threads = list(
+            threads_qs.select_related("plan", "last_message_sender")
+            .prefetch_related(plan_images_prefetch)
+            .order_by("-last_message_at", "-id")[: page_size + 1]
         )
+        has_next = len(threads) > page_size
+        threads = threads[:page_size]
 
-        latest_message_map = {}
-        for message in latest_messages:
-            if message.thread_id not in latest_message_map:
-                latest_message_map[message.thread_id] = message
+        unread_counts = unread.thread_counts(user)
 
-        payloads = []
+        results = []
         for thread in threads:
             plan = thread.plan
-            last_message = latest_message_map.get(thread.id)
             cover_image = None
             if plan and hasattr(plan, "images"):
                 images_qs = plan.images.all()
                 first_image = images_qs[0] if images_qs else None
                 cover_image = getattr(first_image, "image_url", None)
 
-            if last_message:
-                timestamp = timezone.localtime(last_message.create_at, BANGKOK_TZ).isoformat()
-                sender_name = (
-                    getattr(last_message.sender, "display_name", None)
-                    or last_message.sender.get_full_name()
-                    or last_message.sender.username
-                )
-                sort_key = last_message.create_at
-            else:
-                timestamp = None
-                sender_name = None
-                sort_key = plan.event_time if plan and plan.event_time else thread.create_at
-
-            payloads.append(
-                (
-                    sort_key,
-                    {
-                        "thread_id": thread.id,
-                        "plan_id": plan.id if plan else None,
-                        "plan_title": plan.title if plan else None,
-                        "plan_event_time": plan.event_time if plan else None,
-                        "plan_cover_image": cover_image,
-                        "is_owner": plan.leader_id_id == user.id if plan else False,
-                        "last_message": last_message.body if last_message else None,
-                        "last_message_timestamp": timestamp,
-                        "last_message_sender": sender_name,
-                    },
-                )
+            has_message = thread.last_message_id is not None
+            sender = thread.last_message_sender
+            results.append(
+                {
+                    "thread_id": thread.id,
+                    "plan_id": plan.id if plan else None,
+                    "plan_title": plan.title if plan else None,
+                    "plan_event_time": plan.event_time if plan else None,
+                    "plan_cover_image": cover_image,
+                    "is_owner": plan.leader_id_id == user.id if plan else False,
+                    "last_message_id": thread.last_message_id,
+                    "last_message": thread.last_message_preview if has_message else None,
+                    "last_message_timestamp": (
+                        timezone.localtime(thread.last_message_at, BANGKOK_TZ).isoformat() if has_message else None
+                    ),
+                    "last_message_sender": ChatDatabase._get_display_name(sender) if has_message and sender else None,
+                    "message_count": thread.message_count,
+                    "unread_count": unread_counts.get(thread.id, 0),
+                }
             )
 
-        payloads.sort(
-            key=lambda item: item[0] or datetime(1970, 1, 1, tzinfo=timezone.utc),
-            reverse=True,
+        return Response(
+            {
+                "page_size": page_size,
+                "has_next": has_next,
+                "next_cursor": self._encode_cursor(threads[-1]) if has_next else None,
+                "threads": results,
+            }
         )
 
-        return Response([item[1] for item in payloads])
+
+class ChatUnreadCountsView(APIView):
+    """Unread message counts per chat thread, for badges; served from the per-user cache."""
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        rows = unread.unread_rows(request.user)
+        return Response(
+            {
+                "unread_count": sum(row["unread_count"] for row in rows),
+                "threads": rows,
+            }
+        )
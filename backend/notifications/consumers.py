@@ -1,10 +1,30 @@
+import asyncio
+import time
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from django.conf import settings
+from django.db.models import Q
+
+from notifications.counters import unread_counters
+from notifications.metrics import batch_metrics
+from notifications.models import Notification
+from notifications.serializers import NotificationSerializer
+
+REPLAY_LIMIT = 100
 
 
 class NotificationConsumer(AsyncJsonWebsocketConsumer):
     """
     WebSocket consumer for per-user notifications.
     Group name format: user_<user_id>
+
+    Connect with ?since=<last seen notification id> to get the missed notifications and
+    current unread counters in one `replay` frame before live pushes, instead of refetching the list.
+
+    Connect with ?batch=1 to have pushes arriving within NOTIFICATION_PUSH_BATCH_MS delivered
+    together as one `notifications` frame carrying the merged unread counters.
     """
 
     async def connect(self):
@@ -17,13 +37,62 @@ class NotificationConsumer(AsyncJsonWebsocketConsumer):
 
         self.user = user
         self.group_name = f"user_{user.id}"
+        self.batch_window = settings.NOTIFICATION_PUSH_BATCH_MS / 1000 if self._query_param("batch") == "1" else 0
+        self.pending = {}
+        self.pending_since = None
+        self.flush_task = None
 
         # Join the user-specific group
         await self.channel_layer.group_add(self.group_name, self.channel_name)
 
         await self.accept()
 
+        since = self._since_param()
+        if since is not None:
+            # Joined the group first, so anything pushed while replaying is not lost (the client de-dupes by id)
+            await self.send_json(await self._replay(since))
+
+    def _query_param(self, name):
+        query = parse_qs(self.scope.get("query_string", b"").decode())
+        return query.get(name, [""])[0]
+
+    def _since_param(self):
+        try:
+            since = int(self._query_param("since"))
+        except ValueError:
+            return None
+        return since if since >= 0 else None
+
+    @database_sync_to_async
+    def _replay(self, since):
+        qs = Notification.objects.filter(user_id=self.user.id, is_deleted=False)
+        anchor = qs.filter(id=since).values_list("created_at", flat=True).first()
+        missed = Q(id__gt=since)
+        if anchor is not None:
+            # Coalesced chat rows keep their id but move last_activity_at forward; catch those too
+            missed |= Q(last_activity_at__gt=anchor)
+        rows = list(qs.filter(missed).order_by("-last_activity_at", "-id")[: REPLAY_LIMIT + 1])
+        unread_count, unread_counts_by_topic = unread_counters(self.user.id)
+        return {
+            "type": "replay",
+            "notifications": NotificationSerializer(rows[:REPLAY_LIMIT], many=True).data,
+            # Too much was missed to replay; the client should reload the list
+            "has_more": len(rows) > REPLAY_LIMIT,
+            "unread_count": unread_count,
+            "unread_counts_by_topic": unread_counts_by_topic,
+        }
+
     async def disconnect(self, close_code):
+        if getattr(self, "flush_task", None):
+            self.flush_task.cancel()
+            self.flush_task = None
+        if getattr(self, "pending", None):
+            # Flush what the window was holding; if the transport is already gone the rows
+            # still reach the client through the `since` replay on reconnect
+            try:
+                await self._flush()
+            except Exception as exc:  # pragma: no cover - closed transport
+                print(f"[NotificationConsumer] Failed to flush pending pushes on disconnect: {exc}")
         if hasattr(self, "group_name"):
             await self.channel_layer.group_discard(self.group_name, self.channel_name)
 
@@ -37,8 +106,48 @@ class NotificationConsumer(AsyncJsonWebsocketConsumer):
         """
         Called when group_send uses type="notification".
         """
-        notification_data = event.get("notification")
+        await self._deliver([event.get("notification")])
+
+    async def notification_batch(self, event):
+        """
+        Called when group_send uses type="notification.batch" (several rows from one fan-out).
+        """
+        await self._deliver(event.get("notifications") or [])
+
+    async def _deliver(self, notifications):
+        if not self.batch_window:
+            for notification_data in notifications:
+                await self.send_json({
+                    "type": "notification",
+                    "notification": notification_data,
+                })
+            return
+
+        # Later pushes of the same (coalesced) notification replace the earlier one
+        for notification_data in notifications:
+            self.pending[notification_data.get("id")] = notification_data
+        if self.flush_task is None and self.pending:
+            self.pending_since = time.monotonic()
+            self.flush_task = asyncio.ensure_future(self._flush_after_window())
+
+    async def _flush_after_window(self):
+        await asyncio.sleep(self.batch_window)
+        # Cleared first so a disconnect during the flush doesn't cancel it halfway
+        self.flush_task = None
+        await self._flush()
+
+    async def _flush(self):
+        if not self.pending:
+            return
+        batch = list(self.pending.values())
+        delay_ms = (time.monotonic() - self.pending_since) * 1000
+        self.pending = {}
+
+        unread_count, unread_counts_by_topic = await database_sync_to_async(unread_counters)(self.user.id)
         await self.send_json({
-            "type": "notification",
-            "notification": notification_data,
+            "type": "notifications",
+            "notifications": batch,
+            "unread_count": unread_count,
+            "unread_counts_by_topic": unread_counts_by_topic,
         })
+        batch_metrics.record(len(batch), delay_ms)
@@ -0,0 +1,136 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, F, IntegerField, Q, Value, When
+from django.db.models.functions import Greatest
+
+from notifications.models import Notification, NotificationCounter
+
+
+def adjust_counter(user_id, topic, unread=0, total=0):
+    """
+    Add `unread` / `total` to the user's counter row for `topic` in a single UPDATE,
+    creating the row on first use. Counts never go below zero.
+    """
+    if not unread and not total:
+        return
+    updated = NotificationCounter.objects.filter(user_id=user_id, topic=topic).update(
+        unread_count=Greatest(F("unread_count") + unread, 0),
+        total_count=Greatest(F("total_count") + total, 0),
+    )
+    if updated or (unread <= 0 and total <= 0):
+        return
+    try:
+        with transaction.atomic():
+            NotificationCounter.objects.create(
+                user_id=user_id, topic=topic, unread_count=max(unread, 0), total_count=max(total, 0)
+            )
+    except IntegrityError:
+        # Another request created the row first
+        NotificationCounter.objects.filter(user_id=user_id, topic=topic).update(
+            unread_count=Greatest(F("unread_count") + unread, 0),
+            total_count=Greatest(F("total_count") + total, 0),
+        )
+
+
+def bulk_adjust_counters(deltas):
+    """
+    Apply many counter changes at once; `deltas` maps (user_id, topic) -> (unread, total).
+    Missing rows are created first, then each topic is one UPDATE with a CASE per user.
+    """
+    by_topic = {}
+    for (user_id, topic), change in deltas.items():
+        by_topic.setdefault(topic, {})[user_id] = change
+
+    for topic, changes in by_topic.items():
+        NotificationCounter.objects.bulk_create(
+            [NotificationCounter(user_id=user_id, topic=topic) for user_id in changes],
+            batch_size=500,
+            ignore_conflicts=True,
+        )
+        unread_case = Case(
+            *[When(user_id=user_id, then=Value(unread)) for user_id, (unread, _) in changes.items()],
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+        total_case = Case(
+            *[When(user_id=user_id, then=Value(total)) for user_id, (_, total) in changes.items()],
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+        NotificationCounter.objects.filter(topic=topic, user_id__in=list(changes)).update(
+            unread_count=Greatest(F("unread_count") + unread_case, 0),
+            total_count=Greatest(F("total_count") + total_case, 0),
+        )
+
+
+def adjust_unread(user_id, topic, delta):
+    adjust_counter(user_id, topic, unread=delta)
+
+
+def reset_unread(user_id, topic=None, *, cleared=False):
+    """
+    Zero the unread counters after a bulk mark-all-read, or both counters
+    after a clear (`cleared=True`).
+    """
+    qs = NotificationCounter.objects.filter(user_id=user_id)
+    if topic:
+        qs = qs.filter(topic=topic)
+    if cleared:
+        qs.update(unread_count=0, total_count=0)
+    else:
+        qs.update(unread_count=0)
+
+
+def unread_counters(user_id):
+    """
+    Return (unread_count, unread_counts_by_topic) from the counter rows,
+    one indexed lookup instead of aggregating the notification table.
+    """
+    rows = NotificationCounter.objects.filter(user_id=user_id, unread_count__gt=0).values_list(
+        "topic", "unread_count"
+    )
+    by_topic = dict(rows)
+    return sum(by_topic.values()), by_topic
+
+
+def notification_total(user_id, topic=None, unread_only=False):
+    """Number of non-deleted notifications matching the list filters, read from the counters."""
+    qs = NotificationCounter.objects.filter(user_id=user_id)
+    if topic:
+        qs = qs.filter(topic=topic)
+    field = "unread_count" if unread_only else "total_count"
+    return sum(qs.values_list(field, flat=True))
+
+
+def reconcile_counters(user_ids=None):
+    """
+    Recompute counters from the Notification table to repair drift.
+    Returns the number of counter rows written.
+    """
+    notifications = Notification.objects.filter(is_deleted=False)
+    counters = NotificationCounter.objects.all()
+    if user_ids is not None:
+        notifications = notifications.filter(user_id__in=user_ids)
+        counters = counters.filter(user_id__in=user_ids)
+
+    actual = {
+        (row["user_id"], row["topic"]): (row["unread"], row["total"])
+        for row in notifications.values("user_id", "topic")
+        .annotate(unread=Count("id", filter=Q(is_read=False)), total=Count("id"))
+        .order_by()
+    }
+    for user_id, topic in counters.values_list("user_id", "topic"):
+        actual.setdefault((user_id, topic), (0, 0))
+
+    rows = [
+        NotificationCounter(user_id=user_id, topic=topic, unread_count=unread, total_count=total)
+        for (user_id, topic), (unread, total) in actual.items()
+    ]
+    with transaction.atomic():
+        NotificationCounter.objects.bulk_create(
+            rows,
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=["user", "topic"],
+            update_fields=["unread_count", "total_count", "updated_at"],
+        )
+    return len(rows)
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from notifications.retention import purge_expired
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete soft-deleted and old read notifications in small chunks. "
+        "Run periodically (e.g. hourly) from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--deleted-days", type=int, help="Keep soft-deleted rows this many days")
+        parser.add_argument("--read-days", type=int, help="Keep read rows this many days")
+        parser.add_argument("--chunk-size", type=int, help="Rows deleted per transaction")
+        parser.add_argument("--pause", type=float, default=0.0, help="Seconds to sleep between chunks")
+
+    def handle(self, *args, **options):
+        removed = purge_expired(
+            deleted_days=options["deleted_days"],
+            read_days=options["read_days"],
+            chunk_size=options["chunk_size"],
+            pause=options["pause"],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Purged {removed} notifications."))
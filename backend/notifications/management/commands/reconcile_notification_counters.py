@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from notifications.counters import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute unread notification counters from the notification table. "
+        "Run periodically (e.g. nightly) to repair any drift."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", type=int, action="append", dest="user_ids", help="Only reconcile these user ids")
+
+    def handle(self, *args, **options):
+        written = reconcile_counters(options.get("user_ids"))
+        self.stdout.write(self.style.SUCCESS(f"Reconciled {written} notification counters."))
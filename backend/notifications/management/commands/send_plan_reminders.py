@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from notifications.reminders import send_plan_reminders
+
+
+class Command(BaseCommand):
+    help = (
+        "Send PLAN_REMINDER notifications for plans starting soon. Safe to re-run: "
+        "reminders already sent are skipped. Run from cron, or with --loop as a worker."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lead-minutes", type=int, help="Remind this many minutes before event_time")
+        parser.add_argument("--chunk-size", type=int, default=200, help="Plans processed per transaction")
+        parser.add_argument("--loop", action="store_true", help="Keep running, scanning every --interval seconds")
+        parser.add_argument("--interval", type=int, default=60, help="Seconds between scans with --loop")
+
+    def handle(self, *args, **options):
+        while True:
+            sent = send_plan_reminders(lead_minutes=options["lead_minutes"], chunk_size=options["chunk_size"])
+            self.stdout.write(self.style.SUCCESS(f"Sent {sent} plan reminders."))
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
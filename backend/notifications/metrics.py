@@ -0,0 +1,46 @@
+"""In-process metrics for batched realtime notification pushes."""
+
+import logging
+import threading
+
+logger = logging.getLogger("notifications.batching")
+
+
+class BatchMetrics:
+    """Counts batches, their sizes and the latency batching added to the oldest push in each batch."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.batches = 0
+            self.notifications = 0
+            self.max_batch_size = 0
+            self.total_delay_ms = 0.0
+            self.max_delay_ms = 0.0
+
+    def record(self, size, delay_ms):
+        with self._lock:
+            self.batches += 1
+            self.notifications += size
+            self.max_batch_size = max(self.max_batch_size, size)
+            self.total_delay_ms += delay_ms
+            self.max_delay_ms = max(self.max_delay_ms, delay_ms)
+        logger.debug("notification batch size=%d added_latency_ms=%.1f", size, delay_ms)
+
+    def snapshot(self):
+        with self._lock:
+            batches = self.batches or 1
+            return {
+                "batches": self.batches,
+                "notifications": self.notifications,
+                "avg_batch_size": self.notifications / batches,
+                "max_batch_size": self.max_batch_size,
+                "avg_delay_ms": self.total_delay_ms / batches,
+                "max_delay_ms": self.max_delay_ms,
+            }
+
+
+batch_metrics = BatchMetrics()
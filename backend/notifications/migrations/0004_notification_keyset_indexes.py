@@ -0,0 +1,64 @@
+# Generated by Django 5.2.5 on 2026-10-19 14:45
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_totals(apps, schema_editor):
+    Notification = apps.get_model("notifications", "Notification")
+    NotificationCounter = apps.get_model("notifications", "NotificationCounter")
+
+    rows = (
+        Notification.objects.filter(is_deleted=False)
+        .values("user_id", "topic")
+        .annotate(total=Count("id"))
+        .order_by()
+    )
+    for row in rows:
+        updated = NotificationCounter.objects.filter(user_id=row["user_id"], topic=row["topic"]).update(
+            total_count=row["total"]
+        )
+        if not updated:
+            NotificationCounter.objects.create(
+                user_id=row["user_id"], topic=row["topic"], unread_count=0, total_count=row["total"]
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0003_notificationcounter"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notificationcounter",
+            name="total_count",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(populate_totals, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["user", "-created_at", "-id"],
+                name="notif_user_live_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["user", "topic", "-created_at", "-id"],
+                name="notif_user_topic_live_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False), ("is_read", False)),
+                fields=["user", "-created_at", "-id"],
+                name="notif_user_unread_created_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-19 15:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0004_notification_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notification",
+            name="group_count",
+            field=models.PositiveIntegerField(
+                default=1, help_text="จำนวนข้อความที่รวมอยู่ใน notification นี้"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False), ("is_read", False), ("notification_type", "NEW_MESSAGE")),
+                fields=["chat_thread", "user"],
+                name="notif_chat_unread_thread_idx",
+            ),
+        ),
+    ]
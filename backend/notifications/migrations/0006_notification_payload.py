@@ -0,0 +1,53 @@
+# Generated by Django 5.2.5 on 2026-10-19 15:40
+
+from django.db import migrations, models
+
+
+def backfill_payloads(apps, schema_editor):
+    Notification = apps.get_model("notifications", "Notification")
+    PlanImage = apps.get_model("plans", "PlanImage")
+
+    covers = {}
+    for plan_id, image_url in PlanImage.objects.order_by("-uploaded_at").values_list("plan_id", "image_url"):
+        covers[plan_id] = image_url  # oldest upload wins
+
+    batch = []
+    queryset = Notification.objects.select_related("plan", "actor").order_by("id")
+    for notification in queryset.iterator(chunk_size=500):
+        actor = notification.actor
+        notification.payload = {
+            "title": notification.title,
+            "plan_title": notification.plan.title if notification.plan else None,
+            "plan_cover_image": covers.get(notification.plan_id),
+            "actor": {
+                "id": actor.id,
+                "username": actor.username,
+                "display_name": actor.display_name,
+                "profile_picture": actor.profile_picture or None,
+            } if actor else None,
+        }
+        batch.append(notification)
+        if len(batch) >= 500:
+            Notification.objects.bulk_update(batch, ["payload"])
+            batch = []
+    if batch:
+        Notification.objects.bulk_update(batch, ["payload"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0005_notification_group_count"),
+        ("plans", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notification",
+            name="payload",
+            field=models.JSONField(
+                blank=True, default=dict, help_text="ข้อมูลสำหรับแสดงผลที่เตรียมไว้ตอนสร้าง"
+            ),
+        ),
+        migrations.RunPython(backfill_payloads, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 5.2.5 on 2026-10-19 17:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("chat", "0002_initial"),
+        ("notifications", "0007_planreminderlog"),
+        ("plans", "0003_plans_event_time_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NotificationPreference",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "notification_type",
+                    models.CharField(
+                        blank=True,
+                        choices=[
+                            ("PLAN_JOIN_REQUEST", "Plan Join Request"),
+                            ("PLAN_JOINED", "Plan Joined"),
+                            ("PLAN_CANCELLED", "Plan Cancelled"),
+                            ("PLAN_UPDATED", "Plan Updated"),
+                            ("PLAN_REMINDER", "Plan Reminder"),
+                            ("PLAN_CREATED", "Plan Created"),
+                            ("PLAN_LEFT", "Plan Left"),
+                            ("PLAN_DELETED", "Plan Deleted"),
+                            ("NEW_MESSAGE", "New Message"),
+                            ("MENTIONED", "Mentioned"),
+                            ("THREAD_CREATED", "Thread Created"),
+                        ],
+                        default="",
+                        max_length=50,
+                    ),
+                ),
+                ("mode", models.CharField(choices=[("MUTE", "Mute"), ("DIGEST", "Digest")], default="MUTE", max_length=10)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "chat_thread",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="notification_preferences",
+                        to="chat.chat_threads",
+                    ),
+                ),
+                (
+                    "plan",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="notification_preferences",
+                        to="plans.plans",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="notification_preferences",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [models.Index(fields=["user", "notification_type"], name="notificatio_user_id_1eba11_idx")],
+            },
+        ),
+    ]
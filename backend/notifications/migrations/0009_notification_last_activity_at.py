@@ -0,0 +1,27 @@
+# Generated by Django 5.2.5 on 2026-10-19 18:10
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_last_activity(apps, schema_editor):
+    Notification = apps.get_model("notifications", "Notification")
+    # Coalesced rows already had created_at moved forward, so it is their latest activity
+    Notification.objects.update(last_activity_at=F("created_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0008_notificationpreference"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notification",
+            name="last_activity_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(backfill_last_activity, migrations.RunPython.noop),
+    ]
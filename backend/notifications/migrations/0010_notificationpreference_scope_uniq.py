@@ -0,0 +1,42 @@
+# Generated by Django 5.2.5 on 2026-10-19 18:30
+
+import django.db.models.functions.comparison
+from django.conf import settings
+from django.db import migrations, models
+
+
+def drop_duplicate_rules(apps, schema_editor):
+    NotificationPreference = apps.get_model("notifications", "NotificationPreference")
+    seen = set()
+    duplicates = []
+    # Newest rule per scope wins, matching what update_or_create would have kept editing
+    for rule in NotificationPreference.objects.order_by("-created_at", "-id"):
+        scope = (rule.user_id, rule.plan_id, rule.chat_thread_id, rule.notification_type)
+        if scope in seen:
+            duplicates.append(rule.id)
+        seen.add(scope)
+    NotificationPreference.objects.filter(id__in=duplicates).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("chat", "0002_initial"),
+        ("notifications", "0009_notification_last_activity_at"),
+        ("plans", "0003_plans_event_time_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_rules, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="notificationpreference",
+            constraint=models.UniqueConstraint(
+                models.F("user"),
+                django.db.models.functions.comparison.Coalesce("plan", 0),
+                django.db.models.functions.comparison.Coalesce("chat_thread", 0),
+                models.F("notification_type"),
+                name="notification_preference_scope_uniq",
+            ),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.5 on 2026-10-19 19:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("chat", "0002_initial"),
+        ("notifications", "0010_notificationpreference_scope_uniq"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="notification",
+            name="chat_message",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="Chat message ที่เกี่ยวข้อง",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="notifications",
+                to="chat.chat_messages",
+            ),
+        ),
+    ]
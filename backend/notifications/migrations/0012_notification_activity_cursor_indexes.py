@@ -0,0 +1,53 @@
+# Generated by Django 5.2.5 on 2026-10-19 19:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("chat", "0007_chat_fanout_outbox"),
+        ("notifications", "0011_notification_chat_message_set_null"),
+        ("plans", "0003_plans_event_time_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="notification",
+            name="notif_user_live_created_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="notification",
+            name="notif_user_topic_live_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="notification",
+            name="notif_user_unread_created_idx",
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["user", "-last_activity_at", "-id"],
+                name="notif_user_live_activity_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["user", "topic", "-last_activity_at", "-id"],
+                name="notif_user_topic_activity_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False), ("is_read", False)),
+                fields=["user", "-last_activity_at", "-id"],
+                name="notif_user_unread_activity_idx",
+            ),
+        ),
+    ]
@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
 from users.models import Users
@@ -150,9 +151,11 @@ class Notification(models.Model):
         help_text="Chat thread ที่เกี่ยวข้อง"
     )
 
+    # SET_NULL: a coalesced row stands for several messages, so losing one must not drop the row
+    # (ChatDatabase.delete_message repoints it at the previous message first)
     chat_message = models.ForeignKey(
         chat_messages,
-        on_delete=models.CASCADE,
+        on_delete=models.SET_NULL,
         null=True,
         blank=True,
         related_name='notifications',
@@ -179,6 +182,13 @@ class Notification(models.Model):
         help_text="ผู้ใช้ที่ทำ action"
     )
 
+    # Chat notifications are coalesced per (recipient, thread): one unread row whose
+    # group_count is the number of messages it stands for
+    group_count = models.PositiveIntegerField(
+        default=1,
+        help_text="จำนวนข้อความที่รวมอยู่ใน notification นี้"
+    )
+
     # ========== Metadata ==========
     metadata = models.JSONField(
         default=dict,
@@ -186,6 +196,14 @@ class Notification(models.Model):
         help_text="ข้อมูลเพิ่มเติม"
     )
 
+    # Display fields (title, plan title, cover image, actor summary) rendered at creation,
+    # so reads don't join plan / actor / images. Kept fresh by notifications.payloads
+    payload = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="ข้อมูลสำหรับแสดงผลที่เตรียมไว้ตอนสร้าง"
+    )
+
     # ========== Timestamps ==========
     created_at = models.DateTimeField(
         auto_now_add=True,
@@ -196,6 +214,12 @@ class Notification(models.Model):
         auto_now=True
     )
 
+    # Moves forward when a coalesced chat row absorbs another message, so the row returns to the
+    # top of the list; lists and their cursors are ordered by (last_activity_at, id)
+    last_activity_at = models.DateTimeField(
+        default=timezone.now
+    )
+
     # ========== Meta ==========
     class Meta:
         ordering = ['-created_at']
@@ -205,6 +229,28 @@ class Notification(models.Model):
             models.Index(fields=['user', 'topic', 'is_deleted']),
             models.Index(fields=['user', 'created_at']),
             models.Index(fields=['notification_type', 'is_deleted']),
+            # Keyset pagination on (last_activity_at, id); only live rows are ever listed
+            models.Index(
+                fields=['user', '-last_activity_at', '-id'],
+                condition=models.Q(is_deleted=False),
+                name='notif_user_live_activity_idx',
+            ),
+            models.Index(
+                fields=['user', 'topic', '-last_activity_at', '-id'],
+                condition=models.Q(is_deleted=False),
+                name='notif_user_topic_activity_idx',
+            ),
+            models.Index(
+                fields=['user', '-last_activity_at', '-id'],
+                condition=models.Q(is_deleted=False, is_read=False),
+                name='notif_user_unread_activity_idx',
+            ),
+            # Lookup of the open (unread) chat row per recipient + thread when coalescing
+            models.Index(
+                fields=['chat_thread', 'user'],
+                condition=models.Q(notification_type='NEW_MESSAGE', is_read=False, is_deleted=False),
+                name='notif_chat_unread_thread_idx',
+            ),
         ]
 
         constraints = [
@@ -221,16 +267,36 @@ class Notification(models.Model):
     # ========== Methods ==========
 
     def mark_as_read(self):
-        if not self.is_read:
-            self.is_read = True
-            self.read_at = timezone.now()
-            self.save(update_fields=['is_read', 'read_at'])
+        # Conditional UPDATEs: only the call that actually flips the row adjusts the counter, so
+        # concurrent reads (or a read racing a delete) can't decrement it twice
+        from notifications.counters import adjust_unread  # pylint: disable=import-outside-toplevel
+
+        now = timezone.now()
+        unread = Notification.objects.filter(pk=self.pk, is_read=False)
+        if unread.filter(is_deleted=False).update(is_read=True, read_at=now):
+            adjust_unread(self.user_id, self.topic, -1)
+        elif not unread.update(is_read=True, read_at=now):
+            # Already read by someone else
+            self.refresh_from_db(fields=['is_read', 'read_at'])
+            return
+        self.is_read = True
+        self.read_at = now
 
     def soft_delete(self):
-        if not self.is_deleted:
-            self.is_deleted = True
-            self.deleted_at = timezone.now()
-            self.save(update_fields=['is_deleted', 'deleted_at'])
+        from notifications.counters import adjust_counter  # pylint: disable=import-outside-toplevel
+
+        # The unread delta depends on is_read, so lock the row rather than guess it from a stale copy
+        with transaction.atomic():
+            row = Notification.objects.select_for_update().filter(pk=self.pk, is_deleted=False).values('is_read').first()
+            if row is None:
+                self.refresh_from_db(fields=['is_read', 'is_deleted', 'deleted_at'])
+                return
+            now = timezone.now()
+            Notification.objects.filter(pk=self.pk).update(is_deleted=True, deleted_at=now)
+            adjust_counter(self.user_id, self.topic, unread=0 if row['is_read'] else -1, total=-1)
+        self.is_read = row['is_read']
+        self.is_deleted = True
+        self.deleted_at = now
 
     def save(self, *args, **kwargs):
         if not self.title:
@@ -239,7 +305,143 @@ class Notification(models.Model):
                 display = self.get_notification_type_display()
                 title = display or (self.notification_type or "").replace('_', ' ').title()
             self.title = title
+        if self._state.adding and not self.payload:
+            from notifications.payloads import build_payload  # pylint: disable=import-outside-toplevel
+            self.payload = build_payload(self)
         super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.notification_type} - {self.user.username} ({'read' if self.is_read else 'unread'})"
+
+
+class NotificationCounter(models.Model):
+    """
+    Unread / total (non-deleted) notification counts per (user, topic), kept in step with Notification
+    on create / read / delete / clear so endpoints can return badges without aggregating.
+    `reconcile_notification_counters` recomputes the rows from Notification if they drift.
+    """
+
+    user = models.ForeignKey(
+        Users,
+        on_delete=models.CASCADE,
+        related_name='notification_counters',
+    )
+
+    topic = models.CharField(
+        max_length=20,
+        choices=Notification.TOPIC_CATEGORIES,
+    )
+
+    unread_count = models.IntegerField(default=0)
+
+    total_count = models.IntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'topic'], name='notification_counter_user_topic_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} {self.topic}: {self.unread_count}/{self.total_count} unread"
+
+
+class PlanReminderLog(models.Model):
+    """
+    One row per reminder sent, so `send_plan_reminders` never reminds the same user twice
+    for the same plan start time, even across restarts. Rescheduling a plan allows a new reminder.
+    """
+
+    plan = models.ForeignKey(
+        Plans,
+        on_delete=models.CASCADE,
+        related_name='reminder_logs',
+    )
+
+    user = models.ForeignKey(
+        Users,
+        on_delete=models.CASCADE,
+        related_name='plan_reminder_logs',
+    )
+
+    event_time = models.DateTimeField()
+
+    sent_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['plan', 'user', 'event_time'], name='plan_reminder_once'),
+        ]
+
+    def __str__(self):
+        return f"Reminder plan={self.plan_id} user={self.user_id} at {self.event_time}"
+
+
+class NotificationPreference(models.Model):
+    """
+    Per-user mute / digest rule scoped to a plan, a chat thread and/or a notification type
+    (blank scope fields match anything). MUTE drops matching notifications before they are
+    written; DIGEST stores them without a realtime push, so they only show up in the list.
+    """
+
+    MODE_CHOICES = (
+        ('MUTE', 'Mute'),
+        ('DIGEST', 'Digest'),
+    )
+
+    user = models.ForeignKey(
+        Users,
+        on_delete=models.CASCADE,
+        related_name='notification_preferences',
+    )
+
+    plan = models.ForeignKey(
+        Plans,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='notification_preferences',
+    )
+
+    chat_thread = models.ForeignKey(
+        chat_threads,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='notification_preferences',
+    )
+
+    notification_type = models.CharField(
+        max_length=50,
+        choices=Notification.NOTIFICATION_TYPES,
+        blank=True,
+        default="",
+    )
+
+    mode = models.CharField(
+        max_length=10,
+        choices=MODE_CHOICES,
+        default='MUTE',
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'notification_type']),
+        ]
+        constraints = [
+            # One rule per scope; plan / chat_thread are nullable, so coalesce them to make NULLs compare equal
+            models.UniqueConstraint(
+                'user',
+                Coalesce('plan', 0),
+                Coalesce('chat_thread', 0),
+                'notification_type',
+                name='notification_preference_scope_uniq',
+            ),
+        ]
+
+    def __str__(self):
+        scope = self.plan_id or self.chat_thread_id or self.notification_type or "all"
+        return f"{self.user_id} {self.mode} {scope}"
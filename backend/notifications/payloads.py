@@ -0,0 +1,83 @@
+"""
+Display payload stored on each notification.
+
+The title, plan title, cover image and actor summary are rendered once when the notification
+is created, so the list and realtime push paths serialise it without joining plan, actor or
+plan images. The refresh helpers rewrite the payload of affected rows when a plan or actor changes.
+"""
+
+from notifications.models import Notification
+from plans.models import PlanImage
+
+REFRESH_BATCH_SIZE = 500
+
+
+def actor_summary(user):
+    if user is None:
+        return None
+    return {
+        "id": user.id,
+        "username": user.username,
+        "display_name": user.display_name,
+        "profile_picture": user.profile_picture or None,
+    }
+
+
+def plan_summary(plan):
+    if plan is None:
+        return {"plan_title": None, "plan_cover_image": None}
+    cover = PlanImage.objects.filter(plan=plan).order_by("uploaded_at").values_list("image_url", flat=True).first()
+    return {"plan_title": plan.title, "plan_cover_image": cover}
+
+
+def plan_summaries(plans):
+    """plan_summary for many plans with a single cover-image query; returns {plan_id: fields}."""
+    covers = {}
+    images = PlanImage.objects.filter(plan__in=plans).order_by("-uploaded_at").values_list("plan_id", "image_url")
+    for plan_id, image_url in images:
+        covers[plan_id] = image_url  # oldest upload wins
+    return {plan.id: {"plan_title": plan.title, "plan_cover_image": covers.get(plan.id)} for plan in plans}
+
+
+def build_payload(notification, plan_fields=None):
+    """Render the payload for `notification`; pass `plan_fields` to reuse one plan lookup across a fan-out."""
+    if plan_fields is None:
+        plan_fields = plan_summary(notification.plan)
+    return {
+        "title": notification.title,
+        **plan_fields,
+        "actor": actor_summary(notification.actor),
+    }
+
+
+def _rewrite(queryset, update):
+    batch = []
+    for notification in queryset.only("id", "payload").iterator(chunk_size=REFRESH_BATCH_SIZE):
+        notification.payload = {**(notification.payload or {}), **update}
+        batch.append(notification)
+        if len(batch) >= REFRESH_BATCH_SIZE:
+            Notification.objects.bulk_update(batch, ["payload"])
+            batch = []
+    if batch:
+        Notification.objects.bulk_update(batch, ["payload"])
+
+
+def refresh_plan_payloads(plan):
+    """Rewrite plan fields on notifications whose stored plan title / cover no longer match."""
+    fields = plan_summary(plan)
+    stale = Notification.objects.filter(plan=plan, is_deleted=False).exclude(
+        payload__plan_title=fields["plan_title"],
+        payload__plan_cover_image=fields["plan_cover_image"],
+    )
+    _rewrite(stale, fields)
+
+
+def refresh_actor_payloads(user):
+    """Rewrite the actor summary on notifications whose stored copy no longer matches the user."""
+    summary = actor_summary(user)
+    stale = Notification.objects.filter(actor=user, is_deleted=False).exclude(
+        payload__actor__username=summary["username"],
+        payload__actor__display_name=summary["display_name"],
+        payload__actor__profile_picture=summary["profile_picture"],
+    )
+    _rewrite(stale, {"actor": summary})
@@ -0,0 +1,33 @@
+from django.db.models import Q
+
+from notifications.models import NotificationPreference
+
+
+def recipient_modes(user_ids, notification_type, plan_id=None, chat_thread_id=None):
+    """
+    Load the mute / digest rules of all `user_ids` for one notification in a single query.
+    Returns {user_id: "MUTE" | "DIGEST"} for users with a matching rule; MUTE wins over DIGEST.
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return {}
+
+    plan_scope = Q(plan__isnull=True)
+    if plan_id:
+        plan_scope |= Q(plan_id=plan_id)
+    thread_scope = Q(chat_thread__isnull=True)
+    if chat_thread_id:
+        thread_scope |= Q(chat_thread_id=chat_thread_id)
+
+    rules = NotificationPreference.objects.filter(
+        plan_scope,
+        thread_scope,
+        Q(notification_type="") | Q(notification_type=notification_type),
+        user_id__in=user_ids,
+    ).values_list("user_id", "mode")
+
+    modes = {}
+    for user_id, mode in rules:
+        if modes.get(user_id) != "MUTE":
+            modes[user_id] = mode
+    return modes
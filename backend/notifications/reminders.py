@@ -0,0 +1,94 @@
+"""
+PLAN_REMINDER scheduler.
+
+Scans plans whose event_time falls inside the reminder window (indexed range scan), and for
+each chunk of plans loads participants, already-sent reminders and cover images with one query
+each, then bulk-inserts the reminders and their log rows in a single transaction.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from notifications.models import Notification, PlanReminderLog
+from notifications.payloads import plan_summaries
+from notifications.utils import bulk_create_notifications
+from participants.models import Participants
+from plans.models import Plans
+
+
+def _reminder_message(plan):
+    starts = timezone.localtime(plan.event_time).strftime("%d %b %H:%M")
+    return f"Reminder: '{plan.title}' starts at {starts}."
+
+
+def _send_chunk(plans):
+    plan_ids = [plan.id for plan in plans]
+    plans_by_id = {plan.id: plan for plan in plans}
+
+    recipients = {(plan.id, plan.leader_id_id) for plan in plans}
+    recipients.update(Participants.objects.filter(plan_id__in=plan_ids).values_list("plan_id", "user_id"))
+
+    already_sent = {
+        (plan_id, user_id)
+        for plan_id, user_id, event_time in PlanReminderLog.objects.filter(plan_id__in=plan_ids).values_list(
+            "plan_id", "user_id", "event_time"
+        )
+        if event_time == plans_by_id[plan_id].event_time
+    }
+    pending = sorted(recipients - already_sent)
+    if not pending:
+        return 0
+
+    plan_fields = plan_summaries(plans)
+    try:
+        with transaction.atomic():
+            # The unique log row is the idempotency guard: a concurrent run makes this chunk roll back
+            PlanReminderLog.objects.bulk_create(
+                [
+                    PlanReminderLog(plan_id=plan_id, user_id=user_id, event_time=plans_by_id[plan_id].event_time)
+                    for plan_id, user_id in pending
+                ],
+                batch_size=500,
+            )
+            bulk_create_notifications(
+                [
+                    Notification(
+                        user_id=user_id,
+                        plan=plans_by_id[plan_id],
+                        notification_type="PLAN_REMINDER",
+                        topic="PLAN",
+                        message=_reminder_message(plans_by_id[plan_id]),
+                        action_url=f"/plans/{plan_id}",
+                        metadata={"plan_id": plan_id, "event_time": plans_by_id[plan_id].event_time.isoformat()},
+                    )
+                    for plan_id, user_id in pending
+                ],
+                plan_fields_by_id=plan_fields,
+            )
+    except IntegrityError:
+        return 0
+    return len(pending)
+
+
+def send_plan_reminders(lead_minutes=None, chunk_size=200, now=None):
+    """Send reminders for plans starting within the next `lead_minutes`. Returns how many were sent."""
+    lead_minutes = settings.PLAN_REMINDER_LEAD_MINUTES if lead_minutes is None else lead_minutes
+    now = now or timezone.now()
+    upcoming = Plans.objects.filter(
+        event_time__gt=now,
+        event_time__lte=now + timedelta(minutes=lead_minutes),
+    ).order_by("event_time", "id").only("id", "title", "event_time", "leader_id")
+
+    sent = 0
+    chunk = []
+    for plan in upcoming.iterator(chunk_size=chunk_size):
+        chunk.append(plan)
+        if len(chunk) >= chunk_size:
+            sent += _send_chunk(chunk)
+            chunk = []
+    if chunk:
+        sent += _send_chunk(chunk)
+    return sent
@@ -1 +1 @@
-from .noti_serializers import NotificationSerializer
+from .noti_serializers import NotificationPreferenceSerializer, NotificationSerializer
@@ -1,6 +1,6 @@
 from rest_framework import serializers
 
-from notifications.models import Notification
+from notifications.models import Notification, NotificationPreference
 from users.models import Users
 
 
@@ -16,11 +16,16 @@ class NotificationActorSerializer(serializers.ModelSerializer):
 
 
 class NotificationSerializer(serializers.ModelSerializer):
-    plan_title = serializers.CharField(source="plan.title", read_only=True)
-    plan_id = serializers.IntegerField(source="plan.id", read_only=True)
-    chat_thread_id = serializers.IntegerField(source="chat_thread.id", read_only=True)
-    chat_message_id = serializers.IntegerField(source="chat_message.id", read_only=True)
-    actor = NotificationActorSerializer(read_only=True)
+    """
+    Plan title, cover image and actor come from the stored payload, so serialising
+    a notification needs no joins. Rows without a payload fall back to the relations.
+    """
+
+    plan_title = serializers.SerializerMethodField()
+    plan_id = serializers.IntegerField(read_only=True)
+    chat_thread_id = serializers.IntegerField(read_only=True)
+    chat_message_id = serializers.IntegerField(read_only=True)
+    actor = serializers.SerializerMethodField()
     notification_type_display = serializers.CharField(
         source="get_notification_type_display",
         read_only=True,
@@ -52,14 +57,30 @@ class NotificationSerializer(serializers.ModelSerializer):
             "actor",
             "action_url",
             "metadata",
+            "group_count",
             "is_read",
             "read_at",
             "created_at",
             "updated_at",
+            "last_activity_at",
             "is_deleted",
         ]
 
+    def get_plan_title(self, obj):
+        if obj.payload:
+            return obj.payload.get("plan_title")
+        plan = getattr(obj, "plan", None)
+        return plan.title if plan else None
+
+    def get_actor(self, obj):
+        if obj.payload:
+            return obj.payload.get("actor")
+        actor = getattr(obj, "actor", None)
+        return NotificationActorSerializer(actor).data if actor else None
+
     def get_plan_cover_image(self, obj):
+        if obj.payload:
+            return obj.payload.get("plan_cover_image")
         plan = getattr(obj, "plan", None)
         if not plan:
             return None
@@ -74,3 +95,22 @@ class NotificationSerializer(serializers.ModelSerializer):
 
         first_image = images[0]
         return getattr(first_image, "image_url", None)
+
+
+class NotificationPreferenceSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = NotificationPreference
+        fields = [
+            "id",
+            "plan",
+            "chat_thread",
+            "notification_type",
+            "mode",
+            "created_at",
+        ]
+        read_only_fields = ["id", "created_at"]
+
+    def validate(self, attrs):
+        if not (attrs.get("plan") or attrs.get("chat_thread") or attrs.get("notification_type")):
+            raise serializers.ValidationError("Choose a plan, chat thread or notification type to mute.")
+        return attrs
@@ -1,11 +1,55 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
+from plans.models import PlanImage, Plans
+from users.models import Users
+
+from .counters import adjust_counter
 from .models import Notification
+from .payloads import refresh_actor_payloads, refresh_plan_payloads
 from .utils import push_notification_to_user
 
+# Model fields copied into the stored payload; saves that touch none of them skip the refresh
+PLAN_PAYLOAD_FIELDS = {"title"}
+ACTOR_PAYLOAD_FIELDS = {"username", "display_name", "profile_picture"}
+
+
+def _touches_payload(update_fields, payload_fields):
+    # A full save (no update_fields) may have changed anything
+    return update_fields is None or not payload_fields.isdisjoint(update_fields)
+
 
 @receiver(post_save, sender=Notification)
 def send_realtime_notification(sender, instance, created, **kwargs):
     if created:
+        if not instance.is_deleted:
+            adjust_counter(instance.user_id, instance.topic, unread=0 if instance.is_read else 1, total=1)
         push_notification_to_user(instance)
+
+
+@receiver(post_delete, sender=Notification)
+def release_notification_counter(sender, instance, **kwargs):
+    if not instance.is_deleted:
+        adjust_counter(instance.user_id, instance.topic, unread=0 if instance.is_read else -1, total=-1)
+
+
+@receiver(post_save, sender=Plans)
+def refresh_plan_notification_payloads(sender, instance, created, update_fields=None, **kwargs):
+    if not created and _touches_payload(update_fields, PLAN_PAYLOAD_FIELDS):
+        refresh_plan_payloads(instance)
+
+
+@receiver(post_save, sender=PlanImage)
+@receiver(post_delete, sender=PlanImage)
+def refresh_cover_notification_payloads(sender, instance, **kwargs):
+    try:
+        plan = instance.plan
+    except Plans.DoesNotExist:  # pylint: disable=no-member
+        return  # plan itself is being deleted
+    refresh_plan_payloads(plan)
+
+
+@receiver(post_save, sender=Users)
+def refresh_actor_notification_payloads(sender, instance, created, update_fields=None, **kwargs):
+    if not created and _touches_payload(update_fields, ACTOR_PAYLOAD_FIELDS):
+        refresh_actor_payloads(instance)
@@ -0,0 +1,106 @@
+from asgiref.sync import async_to_sync
+from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
+from channels.testing import WebsocketCommunicator
+from django.test import TransactionTestCase, override_settings
+
+from notifications.consumers import NotificationConsumer
+from notifications.metrics import batch_metrics
+from notifications.models import Notification
+from users.models import Users
+
+
+class NotificationConsumerResumeTests(TransactionTestCase):
+    def setUp(self):
+        self.user = Users.objects.create_user(username="user1", password="pass123")
+        self.seen = Notification.objects.create(
+            user=self.user, notification_type="PLAN_CREATED", topic="PLAN", message="seen"
+        )
+        self.missed = Notification.objects.create(
+            user=self.user, notification_type="PLAN_UPDATED", topic="PLAN", message="missed"
+        )
+
+    async def _connect_and_receive(self, path):
+        communicator = WebsocketCommunicator(NotificationConsumer.as_asgi(), path)
+        communicator.scope["user"] = self.user
+        connected, _ = await communicator.connect()
+        assert connected
+        try:
+            return await communicator.receive_json_from()
+        finally:
+            await communicator.disconnect()
+
+    def test_since_replays_missed_notifications_with_counters(self):
+        frame = async_to_sync(self._connect_and_receive)(f"/ws/notifications/?since={self.seen.id}")
+        self.assertEqual(frame["type"], "replay")
+        self.assertEqual([item["id"] for item in frame["notifications"]], [self.missed.id])
+        self.assertFalse(frame["has_more"])
+        self.assertEqual(frame["unread_count"], 2)
+
+    async def _receive_batched(self):
+        communicator = WebsocketCommunicator(NotificationConsumer.as_asgi(), "/ws/notifications/?batch=1")
+        communicator.scope["user"] = self.user
+        connected, _ = await communicator.connect()
+        assert connected
+        try:
+            channel_layer = get_channel_layer()
+            for notification in (self.seen, self.missed, self.seen):
+                await channel_layer.group_send(
+                    f"user_{self.user.id}", {"type": "notification", "notification": {"id": notification.id}}
+                )
+            frame = await communicator.receive_json_from(timeout=2)
+            assert await communicator.receive_nothing(timeout=0.2)
+            return frame
+        finally:
+            await communicator.disconnect()
+
+    @override_settings(NOTIFICATION_PUSH_BATCH_MS=50)
+    def test_batch_window_merges_pushes_into_one_frame(self):
+        batch_metrics.reset()
+        frame = async_to_sync(self._receive_batched)()
+        self.assertEqual(frame["type"], "notifications")
+        self.assertEqual(sorted(item["id"] for item in frame["notifications"]), [self.seen.id, self.missed.id])
+        self.assertEqual(frame["unread_count"], 2)
+        self.assertEqual(batch_metrics.snapshot()["max_batch_size"], 2)
+
+    async def _disconnect_with_pending(self):
+        communicator = WebsocketCommunicator(NotificationConsumer.as_asgi(), "/ws/notifications/?batch=1")
+        communicator.scope["user"] = self.user
+        connected, _ = await communicator.connect()
+        assert connected
+        await get_channel_layer().group_send(
+            f"user_{self.user.id}", {"type": "notification", "notification": {"id": self.missed.id}}
+        )
+        await communicator.receive_nothing(timeout=0.1)
+        await communicator.disconnect()
+
+    @override_settings(NOTIFICATION_PUSH_BATCH_MS=60000)
+    def test_disconnect_flushes_pending_pushes(self):
+        batch_metrics.reset()
+        async_to_sync(self._disconnect_with_pending)()
+        self.assertEqual(batch_metrics.snapshot()["notifications"], 1)
+
+    async def _receive_fan_out(self):
+        from notifications.utils import bulk_create_notifications  # pylint: disable=import-outside-toplevel
+
+        communicator = WebsocketCommunicator(NotificationConsumer.as_asgi(), "/ws/notifications/?batch=1")
+        communicator.scope["user"] = self.user
+        connected, _ = await communicator.connect()
+        assert connected
+        try:
+            await database_sync_to_async(bulk_create_notifications)(
+                [
+                    Notification(user=self.user, notification_type="PLAN_UPDATED", topic="PLAN", message=message)
+                    for message in ("one", "two")
+                ]
+            )
+            return await communicator.receive_json_from(timeout=2)
+        finally:
+            await communicator.disconnect()
+
+    @override_settings(NOTIFICATION_PUSH_BATCH_MS=50)
+    def test_fan_out_is_pushed_as_one_batch_per_user(self):
+        frame = async_to_sync(self._receive_fan_out)()
+        self.assertEqual(frame["type"], "notifications")
+        self.assertEqual(sorted(item["message"] for item in frame["notifications"]), ["one", "two"])
+        self.assertEqual(frame["unread_count"], 4)
@@ -1,4 +1,5 @@
 # tests/test_notifications_api.py
+from django.db import IntegrityError, transaction
 from django.test import TestCase
 from django.urls import reverse
 from rest_framework.test import APIClient
@@ -7,7 +8,7 @@ from django.utils import timezone
 
 from users.models import Users
 from plans.models import Plans, PlanImage
-from notifications.models import Notification
+from notifications.models import Notification, NotificationPreference
 
 class NotificationAPITestCase(TestCase):
     def setUp(self):
@@ -66,7 +67,8 @@ class NotificationAPITestCase(TestCase):
 
     def test_notification_summary(self):
         url = reverse("notifications-summary")
-        response = self.client.get(url)
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["total_count"], 2)
         self.assertEqual(response.data["unread_count"], 2)
@@ -114,3 +116,153 @@ class NotificationAPITestCase(TestCase):
         url = reverse("notifications-clear")
         response = self.client.post(url, {"topic": "INVALID"})
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_unread_counters_follow_read_delete_and_reconcile(self):
+        from notifications.counters import reconcile_counters, unread_counters
+        from notifications.models import NotificationCounter
+
+        self.assertEqual(unread_counters(self.user.id), (2, {"PLAN": 2}))
+
+        self.client.patch(reverse("notifications-mark-read", args=[self.notif1.id]))
+        response = self.client.delete(reverse("notifications-delete", args=[self.notif2.id]))
+        self.assertEqual(response.data["unread_count"], 0)
+        self.assertEqual(response.data["unread_counts_by_topic"], {})
+
+        # Simulate drift, then repair it
+        NotificationCounter.objects.filter(user=self.user).update(unread_count=7)
+        Notification.objects.create(
+            user=self.user, notification_type="PLAN_UPDATED", topic="PLAN", message="Updated", plan=self.plan
+        )
+        reconcile_counters([self.user.id])
+        self.assertEqual(unread_counters(self.user.id), (1, {"PLAN": 1}))
+
+    def test_list_notifications_cursor_pagination(self):
+        url = reverse("notifications-list")
+        first = self.client.get(url, {"page_size": 1})
+        self.assertTrue(first.data["has_next"])
+        self.assertEqual(first.data["count"], 2)
+        self.assertEqual(first.data["notifications"][0]["id"], self.notif2.id)
+
+        second = self.client.get(url, {"page_size": 1, "cursor": first.data["next_cursor"], "include_total": "false"})
+        self.assertFalse(second.data["has_next"])
+        self.assertIsNone(second.data["next_cursor"])
+        self.assertNotIn("count", second.data)
+        self.assertEqual(second.data["notifications"][0]["id"], self.notif1.id)
+
+        self.assertEqual(self.client.get(url, {"cursor": "not-a-cursor"}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_batch_mark_read_by_ids_and_plan(self):
+        url = reverse("notifications-batch-mark-read")
+        response = self.client.post(url, {"ids": [self.notif1.id]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["notification_ids"], [self.notif1.id])
+        self.assertEqual(response.data["unread_count"], 1)
+
+        response = self.client.post(url, {"plan_id": self.plan.id}, format="json")
+        self.assertEqual(response.data["updated_count"], 1)
+        self.assertEqual(response.data["unread_count"], 0)
+        self.notif2.refresh_from_db()
+        self.assertTrue(self.notif2.is_read)
+
+        self.assertEqual(self.client.post(url, {}, format="json").status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.post(url, {"ids": "1"}, format="json").status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_stale_copies_adjust_counters_once(self):
+        from notifications.counters import notification_total
+
+        unread_before = notification_total(self.user.id, unread_only=True)
+        total_before = notification_total(self.user.id)
+        first = Notification.objects.get(pk=self.notif1.pk)
+        second = Notification.objects.get(pk=self.notif1.pk)
+        first.mark_as_read()
+        second.mark_as_read()
+        self.assertEqual(notification_total(self.user.id, unread_only=True), unread_before - 1)
+
+        first.soft_delete()
+        second.soft_delete()
+        self.assertTrue(second.is_deleted)
+        self.assertEqual(notification_total(self.user.id, unread_only=True), unread_before - 1)
+        self.assertEqual(notification_total(self.user.id), total_before - 1)
+
+    def test_purge_expired_removes_old_deleted_and_read_rows(self):
+        from notifications.counters import notification_total
+        from notifications.retention import purge_expired
+
+        old = timezone.now() - timezone.timedelta(days=365)
+        self.notif1.mark_as_read()
+        Notification.objects.filter(pk=self.notif1.pk).update(read_at=old)
+        self.notif2.soft_delete()
+        Notification.objects.filter(pk=self.notif2.pk).update(deleted_at=old)
+        kept = Notification.objects.create(
+            user=self.user, notification_type="PLAN_UPDATED", topic="PLAN", message="Updated", plan=self.plan
+        )
+
+        self.assertEqual(purge_expired(chunk_size=1), 2)
+        self.assertEqual(list(Notification.objects.filter(user=self.user)), [kept])
+        self.assertEqual(notification_total(self.user.id), 1)
+
+    def test_payload_rendered_at_creation_and_refreshed(self):
+        self.assertEqual(self.notif1.payload["plan_title"], "Test Plan")
+        self.assertEqual(self.notif1.payload["actor"]["username"], "user2")
+
+        PlanImage.objects.create(plan=self.plan, image_url="https://example.com/cover.jpg")
+        self.plan.title = "Renamed Plan"
+        self.plan.save()
+        self.other_user.display_name = "Bob"
+        self.other_user.save()
+
+        url = reverse("notifications-list")
+        with self.assertNumQueries(2):  # notification page, counters
+            response = self.client.get(url, {"include_total": "false"})
+        item = response.data["notifications"][0]
+        self.assertEqual(item["plan_title"], "Renamed Plan")
+        self.assertEqual(item["plan_cover_image"], "https://example.com/cover.jpg")
+        self.assertEqual(item["actor"]["display_name"], "Bob")
+
+    def test_batch_metrics_are_admin_only(self):
+        url = reverse("notifications-batch-metrics")
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.user.is_staff = True
+        self.user.save(update_fields=["is_staff"])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("max_delay_ms", response.data)
+
+    def test_payload_refresh_skipped_for_unrelated_field_saves(self):
+        self.other_user.last_login = timezone.now()
+        with self.assertNumQueries(1):  # the UPDATE itself
+            self.other_user.save(update_fields=["last_login"])
+
+        self.plan.title = "Renamed Plan"
+        self.plan.save(update_fields=["title"])
+        self.assertEqual(Notification.objects.get(id=self.notif1.id).payload["plan_title"], "Renamed Plan")
+
+    def test_muted_and_digest_recipients_in_plan_update_fan_out(self):
+        from participants.models import Participants
+        from plans.views.plan_creation import PlansCreate
+
+        member = Users.objects.create_user(username="member", password="pass123")
+        Participants.objects.create(plan=self.plan, user=self.user)
+        Participants.objects.create(plan=self.plan, user=member)
+
+        response = self.client.post(
+            reverse("notifications-preferences"), {"plan": self.plan.id, "mode": "MUTE"}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            self.client.post(reverse("notifications-preferences"), {"mode": "MUTE"}, format="json").status_code,
+            status.HTTP_400_BAD_REQUEST,
+        )
+
+        response = self.client.post(
+            reverse("notifications-preferences"), {"plan": self.plan.id, "mode": "DIGEST"}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            NotificationPreference.objects.create(user=self.user, plan=self.plan)
+        NotificationPreference.objects.filter(user=self.user).update(mode="MUTE")
+
+        PlansCreate()._notify_plan_updated(self.plan)
+        updated = Notification.objects.filter(notification_type="PLAN_UPDATED")
+        self.assertEqual(set(updated.values_list("user_id", flat=True)), {self.other_user.id, member.id})
@@ -0,0 +1,61 @@
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.utils import timezone
+
+from notifications.counters import unread_counters
+from notifications.models import Notification, PlanReminderLog
+from notifications.reminders import send_plan_reminders
+from participants.models import Participants
+from plans.models import Plans
+from users.models import Users
+
+
+class PlanReminderTests(TestCase):
+    def setUp(self):
+        self.leader = Users.objects.create_user(username="leader", password="pass123")
+        self.member = Users.objects.create_user(username="member", password="pass123")
+        self.soon = Plans.objects.create(
+            title="Soon",
+            description="desc",
+            location="here",
+            leader_id=self.leader,
+            event_time=timezone.now() + timezone.timedelta(minutes=30),
+            max_people=5,
+        )
+        Participants.objects.create(plan=self.soon, user=self.member)
+        Plans.objects.create(
+            title="Later",
+            description="desc",
+            location="here",
+            leader_id=self.leader,
+            event_time=timezone.now() + timezone.timedelta(days=2),
+            max_people=5,
+        )
+
+    def test_reminders_are_sent_once_per_participant(self):
+        self.assertEqual(send_plan_reminders(lead_minutes=60), 2)
+        self.assertEqual(send_plan_reminders(lead_minutes=60), 0)
+
+        reminders = Notification.objects.filter(notification_type="PLAN_REMINDER")
+        self.assertEqual(set(reminders.values_list("user_id", flat=True)), {self.leader.id, self.member.id})
+        self.assertEqual(reminders.first().payload["plan_title"], "Soon")
+        self.assertEqual(PlanReminderLog.objects.count(), 2)
+        self.assertEqual(unread_counters(self.member.id), (1, {"PLAN": 1}))
+
+    def test_rescheduled_plan_is_reminded_again(self):
+        send_plan_reminders(lead_minutes=60)
+        self.soon.event_time += timezone.timedelta(minutes=10)
+        self.soon.save()
+        self.assertEqual(send_plan_reminders(lead_minutes=60), 2)
+
+    def test_pushes_wait_for_the_commit(self):
+        with patch("notifications.utils.push_notifications_to_users") as push:
+            with self.captureOnCommitCallbacks() as callbacks:
+                send_plan_reminders(lead_minutes=60)
+            push.assert_not_called()
+
+            for callback in callbacks:
+                callback()
+        pushed = push.call_args.args[0]
+        self.assertEqual({n.user_id for n in pushed}, {self.leader.id, self.member.id})
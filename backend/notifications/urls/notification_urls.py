@@ -3,16 +3,24 @@ from notifications.views import (
     NotificationListView,
     NotificationMarkAllReadView,
     NotificationMarkReadView,
+    NotificationBatchMarkReadView,
     NotificationSummaryView,
     NotificationDeleteView,
     NotificationClearView,
+    NotificationPreferenceListView,
+    NotificationPreferenceDeleteView,
+    NotificationBatchMetricsView,
 )
 
 urlpatterns = [
     path("", NotificationListView.as_view(), name="notifications-list"),
     path("summary/", NotificationSummaryView.as_view(), name="notifications-summary"),
     path("mark-all-read/", NotificationMarkAllReadView.as_view(), name="notifications-mark-all-read"),
+    path("mark-read/", NotificationBatchMarkReadView.as_view(), name="notifications-batch-mark-read"),
     path("clear/", NotificationClearView.as_view(), name="notifications-clear"),
+    path("preferences/", NotificationPreferenceListView.as_view(), name="notifications-preferences"),
+    path("preferences/<int:pk>/", NotificationPreferenceDeleteView.as_view(), name="notifications-preference-delete"),
+    path("batch-metrics/", NotificationBatchMetricsView.as_view(), name="notifications-batch-metrics"),
     path("<int:pk>/read/", NotificationMarkReadView.as_view(), name="notifications-mark-read"),
     path("<int:pk>/", NotificationDeleteView.as_view(), name="notifications-delete"),
 ]
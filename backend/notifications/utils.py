@@ -1,5 +1,6 @@
 from asgiref.sync import async_to_sync
 from channels.layers import get_channel_layer
+from django.db import transaction
 
 from .serializers.noti_serializers import NotificationSerializer
 
@@ -9,8 +10,7 @@ def push_notification_to_user(notification):
     Push a Notification instance to the user's WebSocket group.
     """
     channel_layer = get_channel_layer()
-    user = notification.user
-    group_name = f"user_{user.id}"
+    group_name = f"user_{notification.user_id}"
 
     data = NotificationSerializer(notification).data
 
@@ -21,3 +21,62 @@ def push_notification_to_user(notification):
             "notification": data,
         }
     )
+
+
+def push_notifications_to_users(notifications):
+    """
+    Push many Notification instances with one group_send per recipient instead of one per row.
+    """
+    by_user = {}
+    for notification in notifications:
+        by_user.setdefault(notification.user_id, []).append(notification)
+    if not by_user:
+        return
+
+    channel_layer = get_channel_layer()
+    for user_id, rows in by_user.items():
+        async_to_sync(channel_layer.group_send)(
+            f"user_{user_id}",
+            {
+                "type": "notification.batch",  # calls NotificationConsumer.notification_batch
+                "notifications": NotificationSerializer(rows, many=True).data,
+            }
+        )
+
+
+def bulk_create_notifications(notifications, plan_fields_by_id=None, batch_size=500, quiet_user_ids=()):
+    """
+    Insert many unsaved Notification instances with one INSERT per batch.
+    bulk_create skips save() and post_save, so this fills in the defaults and payload,
+    updates the counters in bulk and pushes the rows itself, one group_send per recipient,
+    once the surrounding transaction commits.
+    `plan_fields_by_id` ({plan_id: plan fields}) avoids a cover-image lookup per row.
+    Rows for `quiet_user_ids` (digest preference) are stored but not pushed.
+    """
+    from notifications.counters import bulk_adjust_counters  # pylint: disable=import-outside-toplevel
+    from notifications.models import Notification  # pylint: disable=import-outside-toplevel
+    from notifications.payloads import build_payload, plan_summaries  # pylint: disable=import-outside-toplevel
+
+    if not notifications:
+        return []
+    if plan_fields_by_id is None:
+        plans = {n.plan_id: n.plan for n in notifications if n.plan_id}
+        plan_fields_by_id = plan_summaries(list(plans.values()))
+
+    deltas = {}
+    for notification in notifications:
+        if not notification.title:
+            notification.title = Notification.DEFAULT_TITLES.get(notification.notification_type, "")
+        if not notification.payload:
+            plan_fields = plan_fields_by_id.get(notification.plan_id, {"plan_title": None, "plan_cover_image": None})
+            notification.payload = build_payload(notification, plan_fields)
+        key = (notification.user_id, notification.topic)
+        unread, total = deltas.get(key, (0, 0))
+        deltas[key] = (unread + (0 if notification.is_read else 1), total + 1)
+
+    created = Notification.objects.bulk_create(notifications, batch_size=batch_size)
+    bulk_adjust_counters(deltas)
+    # A rolled-back fan-out must never reach a socket, and the push must not beat the commit
+    pushed = [n for n in created if n.user_id not in quiet_user_ids]
+    transaction.on_commit(lambda: push_notifications_to_users(pushed))
+    return created
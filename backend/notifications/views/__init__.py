@@ -2,7 +2,11 @@ from .notification_views import (
     NotificationListView,
     NotificationMarkAllReadView,
     NotificationMarkReadView,
+    NotificationBatchMarkReadView,
     NotificationSummaryView,
     NotificationDeleteView,
     NotificationClearView,
+    NotificationPreferenceListView,
+    NotificationPreferenceDeleteView,
+    NotificationBatchMetricsView,
 )
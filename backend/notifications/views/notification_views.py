@@ -1,14 +1,20 @@
-from django.db.models import Count
-from django.db.models import Prefetch
+import base64
+import binascii
+from collections import Counter
+from datetime import datetime
+
+from django.db import transaction
+from django.db.models import OuterRef, Q, Subquery, Sum
 from django.utils import timezone
 from rest_framework import status
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from notifications.models import Notification
-from notifications.serializers import NotificationSerializer
-from plans.models import PlanImage
+from notifications.counters import adjust_unread, notification_total, reset_unread, unread_counters
+from notifications.metrics import batch_metrics
+from notifications.models import Notification, NotificationCounter, NotificationPreference
+from notifications.serializers import NotificationPreferenceSerializer, NotificationSerializer
 
 
 def _valid_topic_or_none(value):
@@ -21,12 +27,6 @@ def _valid_topic_or_none(value):
     return topic_value
 
 
-def _unread_counts_by_topic(user):
-    qs = Notification.objects.filter(user=user, is_deleted=False, is_read=False)
-    counts = qs.values("topic").annotate(total=Count("id"))
-    return {entry["topic"]: entry["total"] for entry in counts}
-
-
 class NotificationListView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -42,14 +42,31 @@ class NotificationListView(APIView):
         except (TypeError, ValueError):
             return default
 
+    @staticmethod
+    def _encode_cursor(notification):
+        raw = f"{notification.last_activity_at.isoformat()}|{notification.id}"
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    @staticmethod
+    def _decode_cursor(value):
+        try:
+            last_activity_at, notification_id = base64.urlsafe_b64decode(value.encode()).decode().rsplit("|", 1)
+            parsed = datetime.fromisoformat(last_activity_at)
+            return parsed, int(notification_id)
+        except (TypeError, ValueError, UnicodeDecodeError, binascii.Error):
+            return None
+
     def get(self, request):
-        """List notifications for the current user with optional filters and pagination."""
+        """
+        List notifications for the current user with optional filters.
+        Paginated by an opaque `cursor` on (last_activity_at, id); pass `next_cursor` back to get the next page.
+        """
 
         params = request.query_params
         unread_only = params.get("unread_only") == "true"
+        include_total = params.get("include_total", "true") != "false"
         topic_filter = params.get("topic")
         page_size = self._positive_int(params.get("page_size") or params.get("limit"), 20, max_value=50)
-        page = self._positive_int(params.get("page"), 1)
 
         qs = Notification.objects.filter(user=request.user, is_deleted=False)
         if unread_only:
@@ -68,44 +85,45 @@ class NotificationListView(APIView):
         if topic_value:
             qs = qs.filter(topic=topic_value)
 
-        total_count = qs.count()
-        offset = (page - 1) * page_size
-        slice_end = offset + page_size
-
-        plan_images_prefetch = Prefetch(
-            "plan__images",
-            queryset=PlanImage.objects.order_by("uploaded_at"),
-        )
+        cursor_param = params.get("cursor")
+        if cursor_param:
+            cursor = self._decode_cursor(cursor_param)
+            if cursor is None:
+                return Response(
+                    {
+                        "message": "Invalid cursor parameter.",
+                        "status_code": status.HTTP_400_BAD_REQUEST,
+                    },
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            last_activity_at, notification_id = cursor
+            qs = qs.filter(
+                Q(last_activity_at__lt=last_activity_at) | Q(last_activity_at=last_activity_at, id__lt=notification_id)
+            )
 
-        notifications = (
-            qs.select_related("plan", "actor", "chat_thread", "chat_message")
-            .prefetch_related(plan_images_prefetch)
-            .order_by("-created_at")[offset:slice_end]
-        )
+        # One extra row tells us whether another page exists without counting;
+        # display fields come from the stored payload, so no joins are needed
+        notifications = list(qs.order_by("-last_activity_at", "-id")[: page_size + 1])
+        has_next = len(notifications) > page_size
+        notifications = notifications[:page_size]
         serializer = NotificationSerializer(notifications, many=True)
 
-        unread_qs = Notification.objects.filter(
-            user=request.user,
-            is_deleted=False,
-            is_read=False,
-        )
-        unread_count = unread_qs.count()
-        unread_counts_by_topic = _unread_counts_by_topic(request.user)
+        unread_count, unread_counts_by_topic = unread_counters(request.user.id)
 
-        return Response(
-            {
-                "message": "Notifications retrieved successfully.",
-                "status_code": status.HTTP_200_OK,
-                "count": total_count,
-                "page": page,
-                "page_size": page_size,
-                "has_next": slice_end < total_count,
-                "unread_count": unread_count,
-                "unread_counts_by_topic": unread_counts_by_topic,
-                "notifications": serializer.data,
-            },
-            status=status.HTTP_200_OK,
-        )
+        data = {
+            "message": "Notifications retrieved successfully.",
+            "status_code": status.HTTP_200_OK,
+            "page_size": page_size,
+            "has_next": has_next,
+            "next_cursor": self._encode_cursor(notifications[-1]) if has_next else None,
+            "unread_count": unread_count,
+            "unread_counts_by_topic": unread_counts_by_topic,
+            "notifications": serializer.data,
+        }
+        if include_total:
+            data["count"] = notification_total(request.user.id, topic_value, unread_only)
+
+        return Response(data, status=status.HTTP_200_OK)
 
 
 class NotificationMarkAllReadView(APIView):
@@ -137,13 +155,9 @@ class NotificationMarkAllReadView(APIView):
             filter_kwargs["topic"] = topic_filter
 
         updated = Notification.objects.filter(**filter_kwargs).update(is_read=True, read_at=now)
+        reset_unread(request.user.id, topic_filter)
 
-        unread_count = Notification.objects.filter(
-            user=request.user,
-            is_deleted=False,
-            is_read=False,
-        ).count()
-        unread_counts_by_topic = _unread_counts_by_topic(request.user)
+        unread_count, unread_counts_by_topic = unread_counters(request.user.id)
 
         return Response(
             {
@@ -178,12 +192,7 @@ class NotificationMarkReadView(APIView):
         notif.mark_as_read()
 
         serializer = NotificationSerializer(notif)
-        unread_count = Notification.objects.filter(
-            user=request.user,
-            is_deleted=False,
-            is_read=False,
-        ).count()
-        unread_counts_by_topic = _unread_counts_by_topic(request.user)
+        unread_count, unread_counts_by_topic = unread_counters(request.user.id)
         return Response(
             {
                 "message": "Notification marked as read.",
@@ -196,30 +205,117 @@ class NotificationMarkReadView(APIView):
         )
 
 
-class NotificationSummaryView(APIView):
+class NotificationBatchMarkReadView(APIView):
     permission_classes = [IsAuthenticated]
 
-    def get(self, request):
-        """Return quick stats about the user's notifications."""
+    MAX_IDS = 200
+
+    def post(self, request):
+        """
+        Mark several notifications as read in one UPDATE.
+        Body: {"ids": [1, 2, ...]} or {"plan_id": <id>} or {"chat_thread_id": <id>}
+        (optionally with "topic"). Returns the new counters once.
+        """
+        ids = request.data.get("ids")
+        plan_id = request.data.get("plan_id")
+        thread_id = request.data.get("chat_thread_id")
+        topic_param = request.data.get("topic")
+        topic_filter = _valid_topic_or_none(topic_param)
+
+        if topic_param and not topic_filter:
+            return Response(
+                {
+                    "message": "Invalid topic parameter.",
+                    "status_code": status.HTTP_400_BAD_REQUEST,
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-        plan_images_prefetch = Prefetch(
-            "plan__images",
-            queryset=PlanImage.objects.order_by("uploaded_at"),
+        filter_kwargs = {
+            "user": request.user,
+            "is_read": False,
+            "is_deleted": False,
+        }
+        try:
+            if ids is not None:
+                if not isinstance(ids, list) or len(ids) > self.MAX_IDS:
+                    raise ValueError
+                filter_kwargs["id__in"] = [int(value) for value in ids]
+            if plan_id is not None:
+                filter_kwargs["plan_id"] = int(plan_id)
+            if thread_id is not None:
+                filter_kwargs["chat_thread_id"] = int(thread_id)
+        except (TypeError, ValueError):
+            return Response(
+                {
+                    "message": f"ids must be a list of at most {self.MAX_IDS} notification ids; plan_id and chat_thread_id must be integers.",
+                    "status_code": status.HTTP_400_BAD_REQUEST,
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if ids is None and plan_id is None and thread_id is None:
+            return Response(
+                {
+                    "message": "Provide ids, plan_id or chat_thread_id.",
+                    "status_code": status.HTTP_400_BAD_REQUEST,
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if topic_filter:
+            filter_kwargs["topic"] = topic_filter
+
+        with transaction.atomic():
+            # Lock the rows so the counters are decremented by exactly what this UPDATE flipped
+            rows = list(
+                Notification.objects.select_for_update().filter(**filter_kwargs).values_list("id", "topic")
+            )
+            updated_ids = [row_id for row_id, _ in rows]
+            if updated_ids:
+                Notification.objects.filter(id__in=updated_ids).update(is_read=True, read_at=timezone.now())
+                for topic, flipped in Counter(topic for _, topic in rows).items():
+                    adjust_unread(request.user.id, topic, -flipped)
+
+        unread_count, unread_counts_by_topic = unread_counters(request.user.id)
+
+        return Response(
+            {
+                "message": "Notifications marked as read.",
+                "status_code": status.HTTP_200_OK,
+                "updated_count": len(updated_ids),
+                "notification_ids": updated_ids,
+                "unread_count": unread_count,
+                "unread_counts_by_topic": unread_counts_by_topic,
+            },
+            status=status.HTTP_200_OK,
         )
 
-        base_qs = Notification.objects.filter(user=request.user, is_deleted=False)
+
+class NotificationSummaryView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """
+        Return quick stats about the user's notifications in one query: the latest row
+        (rendered from its stored payload) annotated with the totals from the counters.
+        """
+        counters = NotificationCounter.objects.filter(user_id=OuterRef("user_id")).values("user_id")
         latest = (
-            base_qs.select_related("plan", "actor", "chat_thread", "chat_message")
-            .prefetch_related(plan_images_prefetch)
-            .order_by("-created_at")
+            Notification.objects.filter(user=request.user, is_deleted=False)
+            .annotate(
+                summary_total=Subquery(counters.annotate(total=Sum("total_count")).values("total")),
+                summary_unread=Subquery(counters.annotate(total=Sum("unread_count")).values("total")),
+            )
+            .order_by("-last_activity_at", "-id")
             .first()
         )
 
         data = {
             "message": "Notification summary retrieved successfully.",
             "status_code": status.HTTP_200_OK,
-            "total_count": base_qs.count(),
-            "unread_count": base_qs.filter(is_read=False).count(),
+            # No live notification means nothing to count
+            "total_count": (latest.summary_total or 0) if latest else 0,
+            "unread_count": (latest.summary_unread or 0) if latest else 0,
             "latest_notification": NotificationSerializer(latest).data if latest else None,
         }
 
@@ -243,12 +339,7 @@ class NotificationDeleteView(APIView):
 
         notif.soft_delete()
 
-        unread_count = Notification.objects.filter(
-            user=request.user,
-            is_deleted=False,
-            is_read=False,
-        ).count()
-        unread_counts_by_topic = _unread_counts_by_topic(request.user)
+        unread_count, unread_counts_by_topic = unread_counters(request.user.id)
 
         return Response(
             {
@@ -287,13 +378,9 @@ class NotificationClearView(APIView):
 
         now = timezone.now()
         updated = Notification.objects.filter(**filter_kwargs).update(is_deleted=True, deleted_at=now)
+        reset_unread(request.user.id, topic_filter, cleared=True)
 
-        unread_count = Notification.objects.filter(
-            user=request.user,
-            is_deleted=False,
-            is_read=False,
-        ).count()
-        unread_counts_by_topic = _unread_counts_by_topic(request.user)
+        unread_count, unread_counts_by_topic = unread_counters(request.user.id)
 
         return Response(
             {
@@ -305,3 +392,93 @@ class NotificationClearView(APIView):
             },
             status=status.HTTP_200_OK,
         )
+
+
+class NotificationPreferenceListView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """List the current user's mute / digest rules."""
+        preferences = NotificationPreference.objects.filter(user=request.user).order_by("-created_at")
+        return Response(
+            {
+                "message": "Notification preferences retrieved successfully.",
+                "status_code": status.HTTP_200_OK,
+                "preferences": NotificationPreferenceSerializer(preferences, many=True).data,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    def post(self, request):
+        """
+        Add a rule, or change the mode of an existing rule with the same scope.
+        Body: {"plan": id?, "chat_thread": id?, "notification_type": "PLAN_UPDATED"?, "mode": "MUTE" | "DIGEST"}
+        """
+        serializer = NotificationPreferenceSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(
+                {
+                    "message": "Invalid notification preference.",
+                    "errors": serializer.errors,
+                    "status_code": status.HTTP_400_BAD_REQUEST,
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        data = serializer.validated_data
+        preference, created = NotificationPreference.objects.update_or_create(
+            user=request.user,
+            plan=data.get("plan"),
+            chat_thread=data.get("chat_thread"),
+            notification_type=data.get("notification_type", ""),
+            defaults={"mode": data.get("mode", "MUTE")},
+        )
+        response_status = status.HTTP_201_CREATED if created else status.HTTP_200_OK
+        return Response(
+            {
+                "message": "Notification preference saved.",
+                "status_code": response_status,
+                "preference": NotificationPreferenceSerializer(preference).data,
+            },
+            status=response_status,
+        )
+
+
+class NotificationPreferenceDeleteView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def delete(self, request, pk: int):
+        deleted, _ = NotificationPreference.objects.filter(pk=pk, user=request.user).delete()
+        if not deleted:
+            return Response(
+                {
+                    "message": "Notification preference not found.",
+                    "status_code": status.HTTP_404_NOT_FOUND,
+                },
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        return Response(
+            {
+                "message": "Notification preference deleted.",
+                "status_code": status.HTTP_200_OK,
+                "preference_id": pk,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class NotificationBatchMetricsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        """
+        Realtime push batching metrics (batch sizes, added latency) of the worker serving this request.
+        """
+        return Response(
+            {
+                "message": "Notification batch metrics retrieved successfully.",
+                "status_code": status.HTTP_200_OK,
+                **batch_metrics.snapshot(),
+            },
+            status=status.HTTP_200_OK,
+        )
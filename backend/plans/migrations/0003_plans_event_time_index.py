@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-19 16:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("plans", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="plans",
+            name="event_time",
+            field=models.DateTimeField(db_index=True),
+        ),
+    ]
@@ -14,7 +14,7 @@ class Plans(models.Model):
     lat = models.DecimalField(decimal_places=8, max_digits=11, default=None, null=True, blank=True)
     lng = models.DecimalField(decimal_places=8, max_digits=11, default=None, null=True, blank=True)
     leader_id = models.ForeignKey(Users, related_name="leader", on_delete=models.CASCADE)
-    event_time = models.DateTimeField()
+    event_time = models.DateTimeField(db_index=True)
     max_people = models.IntegerField(default=1)
     tags = models.ManyToManyField(Tags, related_name='plans', default=" ", null=True)
     people_joined = models.IntegerField(default=0)
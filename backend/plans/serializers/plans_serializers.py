@@ -1,9 +1,9 @@
-from django.db import models
+from django.db import models, transaction
 from rest_framework import serializers
 
 from participants.models import Participants
 from plans.models import Plans, PlanImage
-from tags.models import Tags
+from tags.utils import get_or_create_tag, refresh_active_plan_counts
 
 
 class PlanImageSerializer(serializers.ModelSerializer):
@@ -175,7 +175,14 @@ class PlansSerializer(serializers.ModelSerializer):
             validated_data["leader_id"] = request.user
 
         validated_data["people_joined"] = 1
-        plan = Plans.objects.create(**validated_data)
+        tag_names = [tag.strip() for tag in tags_data if tag and tag.strip()]
+        # The plan, its tags and their active-plan counts commit together
+        with transaction.atomic():
+            plan = Plans.objects.create(**validated_data)
+            for name in tag_names:
+                plan.tags.add(get_or_create_tag(name))
+            if tag_names:
+                refresh_active_plan_counts(plan.tags.values_list("id", flat=True))
 
         if request and hasattr(request, "FILES"):
             images = request.FILES.getlist("images")
@@ -206,23 +213,21 @@ class PlansSerializer(serializers.ModelSerializer):
                         "created_by": plan.leader_id,
                     },
                 )
-                chat_member.objects.get_or_create(thread=thread, user=plan.leader_id)
+                chat_member.objects.get_or_create(
+                    thread=thread, user=plan.leader_id, defaults={"last_read_message_id": thread.last_message_id}
+                )
             except Exception as chat_error:  # pragma: no cover - guard against chat failures
                 print(f"[PlansSerializer] Failed to initialize chat for plan {plan.id}: {chat_error}")
 
-        if tags_data:
-            tag_names = [tag.strip() for tag in tags_data if tag and tag.strip()]
-            for name in tag_names:
-                tag_obj, _ = Tags.objects.get_or_create(name=name)
-                plan.tags.add(tag_obj)
-
         return plan
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         validated_data.pop("leader_id", None)
         validated_data.pop("people_joined", None)
 
         tags_data = validated_data.pop("tags", None)
+        previous_tag_ids = set(instance.tags.values_list("id", flat=True))
 
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
@@ -232,9 +237,12 @@ class PlansSerializer(serializers.ModelSerializer):
             instance.tags.clear()
             tag_names = [tag.strip() for tag in tags_data if tag and tag.strip()]
             for name in tag_names:
-                tag_obj, _ = Tags.objects.get_or_create(name=name)
+                tag_obj = get_or_create_tag(name)
                 instance.tags.add(tag_obj)
 
+        # event_time and/or tags may have changed: recount old and new tags
+        refresh_active_plan_counts(previous_tag_ids | set(instance.tags.values_list("id", flat=True)))
+
         return instance
 
 
@@ -1,8 +1,9 @@
 from django.urls import path
-from plans.views.homepage import PlansView
+from plans.views.homepage import PlanCategoryFacetsView, PlansView
 
 urlpatterns = [
     path('list/', PlansView.as_view(), name="plans-list"),             # GET /plans/list/?filter=hot|new|expiring (default=today)
     path('<int:plan_id>/', PlansView.as_view(), name="plan-detail"),  # GET /plans/1/ (single plan, or ?field=title)
-    path('create/', PlansView.as_view(), name="plans-create")
+    path('create/', PlansView.as_view(), name="plans-create"),
+    path('facets/', PlanCategoryFacetsView.as_view(), name="plans-facets"),  # GET /homepage/facets/?filter=&search= (active plans per tag)
 ]
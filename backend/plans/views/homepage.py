@@ -1,14 +1,64 @@
+import hashlib
 from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
 from django.utils import timezone
-from django.db.models import F, FloatField, ExpressionWrapper, Q
+from django.db.models import Count, Exists, F, FloatField, ExpressionWrapper, OuterRef, Q
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from plans.models import Plans
 from plans.serializers.plans_serializers import PlansSerializer
+from tags.models import Tags
+from tags.utils import resolve_tag_ids
 from rest_framework.permissions import AllowAny
 
 
+def active_plans_queryset(filter_type=None, search=None):
+    """
+    Active (future event_time) plans narrowed by the homepage `filter` and `search` params.
+    Shared by the plan list and the category facet counts so both agree on what is shown.
+    """
+    now = timezone.now()
+    start_of_day = now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    # Start with base queryset (only active plans)
+    plans_qs = Plans.objects.filter(event_time__gt=now)  # pylint: disable=no-member
+
+    # Apply filter type
+    if filter_type == "hot":
+        # Plans with >= 60% capacity filled
+        plans_qs = plans_qs.annotate(
+            join_ratio=ExpressionWrapper(
+                F("people_joined") * 1.0 / F("max_people"),
+                output_field=FloatField()
+            )
+        ).filter(join_ratio__gte=0.6).order_by("-join_ratio")
+
+    elif filter_type == "new":
+        # return new plan
+        last_48h = now - timedelta(hours=48)
+        plans_qs = plans_qs.filter(create_at__gte=last_48h).order_by("-create_at")
+
+    elif filter_type == "expiring":
+        # return expiring plan (within next 3 days, but still active)
+        end_of_day = start_of_day + timedelta(days=3)
+        plans_qs = plans_qs.filter(event_time__gte=now, event_time__lte=end_of_day).order_by("event_time")
+
+    else:
+        # "all" / default = active plans (not expired)
+        plans_qs = plans_qs.order_by("-create_at")
+
+    # Apply search filter if provided
+    if search and search.strip():
+        # Search in title and description (case-insensitive)
+        plans_qs = plans_qs.filter(
+            Q(title__icontains=search.strip()) | Q(description__icontains=search.strip())
+        ).distinct()
+
+    return plans_qs
+
+
 class PlansView(APIView):
     permission_classes = [AllowAny]
     def get(self, request, plan_id=None):
@@ -35,63 +85,72 @@ class PlansView(APIView):
         filter_type = request.query_params.get("filter", None)
         category = request.query_params.get("category", None)  # Get category/tag filter
         search = request.query_params.get("search", None)  # Get search term
-        now = timezone.now()
-        start_of_day = now.replace(hour=0, minute=0, second=0, microsecond=0)
-
-        # Start with base queryset (only active plans)
-        plans_qs = Plans.objects.filter(event_time__gt=now)  # pylint: disable=no-member
-
-        # Apply filter type
-        if filter_type == "hot":
-            # Plans with >= 60% capacity filled
-            plans_qs = plans_qs.annotate(
-                join_ratio=ExpressionWrapper(
-                    F("people_joined") * 1.0 / F("max_people"),
-                    output_field=FloatField()
-                )
-            ).filter(join_ratio__gte=0.6).order_by("-join_ratio")
-
-        elif filter_type == "new":
-            # return new plan
-            last_48h = now - timedelta(hours=48)
-            plans_qs = plans_qs.filter(create_at__gte=last_48h).order_by("-create_at")
-
-        elif filter_type == "expiring":
-            # return expiring plan (within next 3 days, but still active)
-            end_of_day = start_of_day + timedelta(days=3)
-            plans_qs = plans_qs.filter(event_time__gte=now, event_time__lte=end_of_day).order_by("event_time")
-        
-        elif filter_type == "all":
-            # return all active plans (not expired)
-            plans_qs = plans_qs.order_by("-create_at")
-
-        else:
-            # Default = active plans (not expired)
-            plans_qs = plans_qs.order_by("-create_at")
+
+        plans_qs = active_plans_queryset(filter_type, search)
 
         # Apply category/tag filter if provided
         if category and category != "all":
-            # Map frontend category IDs to tag names
-            category_map = {
-                'sports': 'Sports',
-                'food': 'Food',
-                'travel': 'Travel',
-                'art': 'Art',
-                'music': 'Music',
-                'movie': 'Movies',
-                'game': 'Games',
-                'other': 'Other'
-            }
-            tag_name = category_map.get(category.lower(), category)
-            # Filter by tag name (case-insensitive)
-            plans_qs = plans_qs.filter(tags__name__iexact=tag_name).distinct()
-
-        # Apply search filter if provided
-        if search and search.strip():
-            # Search in title and description (case-insensitive)
-            plans_qs = plans_qs.filter(
-                Q(title__icontains=search.strip()) | Q(description__icontains=search.strip())
-            ).distinct()
+            # Category IDs / tag names resolve to tag ids (every case variant) through the in-process
+            # catalogue map, so the filter is an EXISTS on the (plans_id, tags_id) index instead of a join + DISTINCT
+            tag_ids = resolve_tag_ids(category)
+            if not tag_ids:
+                plans_qs = plans_qs.none()
+            else:
+                plans_qs = plans_qs.filter(
+                    Exists(Plans.tags.through.objects.filter(plans_id=OuterRef("pk"), tags_id__in=tag_ids))
+                )
 
         serializer = PlansSerializer(plans_qs, many=True, context={"request": request})
         return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class PlanCategoryFacetsView(APIView):
+    """
+    GET /homepage/facets/?filter=hot|new|expiring&search=<term>
+    Number of active plans per tag, for the category chips.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        filter_type = request.query_params.get("filter", None)
+        search = (request.query_params.get("search") or "").strip()
+        if filter_type not in ("hot", "new", "expiring"):
+            filter_type = None
+
+        facets = category_facets(filter_type, search)
+        return Response(facets, status=status.HTTP_200_OK)
+
+
+def category_facets(filter_type=None, search=""):
+    """
+    Facet counts, cached for HOMEPAGE_FACET_CACHE_TTL seconds so repeated reads are nearly free.
+    Without filter/search the counts come straight from the tag catalogue's active_plan_count.
+    """
+    search_key = hashlib.md5(search.lower().encode()).hexdigest() if search else ""
+    cache_key = f"homepage_facets:{filter_type or 'all'}:{search_key}"
+    facets = cache.get(cache_key)
+    if facets is not None:
+        return facets
+
+    if not filter_type and not search:
+        tags = Tags.objects.filter(active_plan_count__gt=0).order_by("-active_plan_count", "name")
+        counts = [{"id": tag.id, "name": tag.name, "count": tag.active_plan_count} for tag in tags]
+        total = Plans.objects.filter(event_time__gt=timezone.now()).count()  # pylint: disable=no-member
+    else:
+        plans_qs = active_plans_queryset(filter_type, search).order_by()
+        rows = (
+            Plans.tags.through.objects.filter(plans_id__in=plans_qs.values("pk"))
+            .values("tags_id", "tags__name")
+            .annotate(count=Count("plans_id"))
+            .order_by("-count", "tags__name")
+        )
+        counts = [{"id": row["tags_id"], "name": row["tags__name"], "count": row["count"]} for row in rows]
+        total = plans_qs.count()
+
+    facets = {
+        "total": total,
+        "categories": counts,
+        "generated_at": timezone.now(),
+    }
+    cache.set(cache_key, facets, settings.HOMEPAGE_FACET_CACHE_TTL)
+    return facets
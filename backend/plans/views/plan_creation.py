@@ -1,12 +1,16 @@
+from django.db import transaction
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from notifications.models import Notification
+from notifications.preferences import recipient_modes
+from notifications.utils import bulk_create_notifications
 from participants.models import Participants
 from plans.models import Plans
 from plans.serializers.plans_serializers import PlansSerializer, PlansWithImagesSerializer
+from tags.utils import refresh_active_plan_counts
 
 
 class PlansCreate(APIView):
@@ -31,30 +35,46 @@ class PlansCreate(APIView):
                     formatted.append(f"{readable}: {error}")
         return formatted
 
+    @staticmethod
+    def _fan_out(notification_type, messages_by_user, plan=None):
+        """
+        Write one notification per recipient ({user_id: message}) in bulk, after dropping
+        recipients who muted this plan / type. Digest recipients get the row without a push.
+        """
+        modes = recipient_modes(messages_by_user, notification_type, plan_id=plan.id if plan else None)
+        quiet = {user_id for user_id, mode in modes.items() if mode == "DIGEST"}
+        bulk_create_notifications(
+            [
+                Notification(
+                    user_id=user_id,
+                    message=message,
+                    notification_type=notification_type,
+                    topic="PLAN",
+                    plan=plan,
+                )
+                for user_id, message in messages_by_user.items()
+                if modes.get(user_id) != "MUTE"
+            ],
+            quiet_user_ids=quiet,
+        )
+
     def _notify_plan_updated(self, plan):
         """Notify the leader and members that the plan has been updated."""
         leader = plan.leader_id
+        messages = {}
 
         if leader:
-            Notification.objects.create(
-                user=leader,
-                message=f"You updated your plan '{plan.title}'.",
-                notification_type="PLAN_UPDATED",
-                plan=plan,
-            )
+            messages[leader.id] = f"You updated your plan '{plan.title}'."
 
-        members = Participants.objects.filter(plan=plan).select_related("user")
-        if leader:
-            members = members.exclude(user=leader)
-
-        for participant in members:
-            Notification.objects.create(
-                user=participant.user,
-                message=f"{leader.username if leader else 'Leader'} updated the plan '{plan.title}'.",
-                notification_type="PLAN_UPDATED",
-                plan=plan,
+        member_ids = Participants.objects.filter(plan=plan).values_list("user_id", flat=True)
+        for user_id in member_ids:
+            messages.setdefault(
+                user_id,
+                f"{leader.username if leader else 'Leader'} updated the plan '{plan.title}'.",
             )
 
+        self._fan_out("PLAN_UPDATED", messages, plan=plan)
+
     def post(self, request):
         """Create a new plan with clear success and error responses."""
         if not request.user.is_authenticated:
@@ -294,16 +314,23 @@ class PlansCreate(APIView):
                 status=status.HTTP_403_FORBIDDEN,
             )
 
+        plan_id = plan.id
         plan_title = plan.title
         leader = plan.leader_id
         leader_name = leader.username if leader else "The leader"
 
-        participants = list(
-            Participants.objects.filter(plan=plan).select_related("user")
-        )
+        from chat import membership, unread  # pylint: disable=import-outside-toplevel
+        from chat.models import chat_member  # pylint: disable=import-outside-toplevel
+
+        participant_ids = list(Participants.objects.filter(plan=plan).values_list("user_id", flat=True))
+        tag_ids = list(plan.tags.values_list("id", flat=True))
+        # Collected before the cascade removes them
+        chat_member_ids = list(chat_member.objects.filter(thread__plan=plan).values_list("user_id", flat=True))
 
         try:
-            plan.delete()
+            with transaction.atomic():
+                plan.delete()
+                refresh_active_plan_counts(tag_ids)
         except Exception as exc:  # pragma: no cover
             return Response(
                 {
@@ -315,24 +342,17 @@ class PlansCreate(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
-        if leader:
-            Notification.objects.create(
-                user=leader,
-                message=f"You deleted your plan '{plan_title}'.",
-                notification_type="PLAN_DELETED",
-                plan=None,
-            )
+        # Cached unread counts would keep counting the deleted thread, and cached chat access
+        # would hand out the deleted thread id, until their TTLs
+        transaction.on_commit(lambda: unread.invalidate(chat_member_ids))
+        transaction.on_commit(lambda: membership.invalidate_plan(plan_id, chat_member_ids))
 
-        for participant in participants:
-            if leader and participant.user_id == leader.id:
-                continue
-
-            Notification.objects.create(
-                user=participant.user,
-                message=f"{leader_name} deleted the plan '{plan_title}'.",
-                notification_type="PLAN_DELETED",
-                plan=None,
-            )
+        messages = {}
+        if leader:
+            messages[leader.id] = f"You deleted your plan '{plan_title}'."
+        for user_id in participant_ids:
+            messages.setdefault(user_id, f"{leader_name} deleted the plan '{plan_title}'.")
+        self._fan_out("PLAN_DELETED", messages)
 
         return Response(
             {
@@ -109,6 +109,7 @@ class PlanJoinView(APIView):
 
         # Ensure chat membership for joining user (leaders and members)
         try:
+            from chat import membership  # pylint: disable=import-outside-toplevel
             from chat.models import chat_threads, chat_member  # pylint: disable=import-outside-toplevel
 
             thread, _ = chat_threads.objects.get_or_create(
@@ -118,7 +119,11 @@ class PlanJoinView(APIView):
                     "created_by": plan.leader_id,
                 },
             )
-            chat_member.objects.get_or_create(thread=thread, user=request.user)
+            # The joiner starts caught up; only messages after they join count as unread
+            chat_member.objects.get_or_create(
+                thread=thread, user=request.user, defaults={"last_read_message_id": thread.last_message_id}
+            )
+            transaction.on_commit(lambda: membership.invalidate(plan.id, request.user.id))
         except Exception as chat_error:  # pragma: no cover - prevent chat failure from blocking join
             print(f"[PlanJoinView] Failed to ensure chat membership for plan {plan_id}: {chat_error}")
 
@@ -203,8 +208,12 @@ class PlanJoinView(APIView):
 
             # Remove user from chat thread for this plan
             try:
+                from chat import membership, unread  # pylint: disable=import-outside-toplevel
                 from chat.models import chat_member  # pylint: disable=import-outside-toplevel
                 chat_member.objects.filter(thread__plan=plan, user=request.user).delete()
+                # Cut off cached chat access and drop the thread from cached unread counts now, not after the TTL
+                transaction.on_commit(lambda: membership.invalidate(plan.id, request.user.id))
+                transaction.on_commit(lambda: unread.invalidate([request.user.id]))
             except Exception as chat_error:  # pragma: no cover - graceful degradation
                 print(f"[PlanJoinView] Failed to remove chat membership for plan {plan_id}: {chat_error}")
 
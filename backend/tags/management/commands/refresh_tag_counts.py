@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from tags.utils import refresh_active_plan_counts
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute active-plan counts for every tag. Plan writes keep counts exact, but plans "
+        "also expire as time passes, so run this from cron (e.g. every few minutes) or with --loop as a worker."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true", help="Keep running, refreshing every --interval seconds")
+        parser.add_argument("--interval", type=int, default=300, help="Seconds between refreshes with --loop")
+
+    def handle(self, *args, **options):
+        while True:
+            updated = refresh_active_plan_counts()
+            self.stdout.write(self.style.SUCCESS(f"Refreshed active plan counts for {updated} tags."))
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
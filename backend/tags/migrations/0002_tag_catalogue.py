@@ -0,0 +1,52 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:48
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.utils import timezone
+
+
+def populate_catalogue(apps, schema_editor):
+    Tags = apps.get_model("tags", "Tags")
+    Plans = apps.get_model("plans", "Plans")
+
+    active_counts = dict(
+        Plans.tags.through.objects.filter(plans__event_time__gt=timezone.now())
+        .values("tags_id")
+        .annotate(total=Count("plans_id"))
+        .values_list("tags_id", "total")
+    )
+    tags = list(Tags.objects.all())
+    for tag in tags:
+        tag.normalized_name = (tag.name or "").strip().lower()
+        tag.active_plan_count = active_counts.get(tag.id, 0)
+    Tags.objects.bulk_update(tags, ["normalized_name", "active_plan_count"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tags", "0001_initial"),
+        ("plans", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="tags",
+            name="active_plan_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="tags",
+            name="normalized_name",
+            field=models.CharField(default="", editable=False, max_length=50),
+        ),
+        migrations.AddIndex(
+            model_name="tags",
+            index=models.Index(
+                fields=["normalized_name"],
+                name="tags_normalized_prefix_idx",
+                opclasses=["varchar_pattern_ops"],
+            ),
+        ),
+        migrations.RunPython(populate_catalogue, migrations.RunPython.noop),
+    ]
@@ -1,13 +1,29 @@
 from django.db import models
 from django.conf import settings
 
+
+def normalize_tag_name(name):
+    """Canonical form used to match tag names regardless of case/whitespace."""
+    return (name or "").strip().lower()
+
+
 # Model for tags
 class Tags(models.Model):
     name = models.CharField(max_length=50, unique=True)
-    
+    normalized_name = models.CharField(max_length=50, default="", editable=False)  # lower-cased name for lookups/autocomplete
+    active_plan_count = models.PositiveIntegerField(default=0)  # plans with event_time in the future (see tags.utils)
+
+    def save(self, *args, **kwargs):
+        self.normalized_name = normalize_tag_name(self.name)
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return self.name
     
     class Meta:
         verbose_name = "Tag"
-        verbose_name_plural = "Tags"
\ No newline at end of file
+        verbose_name_plural = "Tags"
+        indexes = [
+            # varchar_pattern_ops lets Postgres use the index for prefix (LIKE 'abc%') autocomplete
+            models.Index(fields=["normalized_name"], name="tags_normalized_prefix_idx", opclasses=["varchar_pattern_ops"]),
+        ]
@@ -4,4 +4,9 @@ from tags.models import Tags
 class TagsSerializer(serializers.ModelSerializer):
     class Meta:
         model = Tags
-        fields = ['id', 'name']
\ No newline at end of file
+        fields = ['id', 'name']
+
+class TagCatalogueSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Tags
+        fields = ['id', 'name', 'active_plan_count']
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Tags
+from .utils import reset_tag_id_cache
+
+
+@receiver(post_save, sender=Tags)
+@receiver(post_delete, sender=Tags)
+def forget_tag_ids(sender, instance, **kwargs):
+    reset_tag_id_cache()
@@ -0,0 +1,116 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient, APITestCase
+
+from plans.models import Plans
+from tags.models import Tags
+
+
+class PlanFactoryMixin:
+    def setUp(self):
+        from users.models import Users
+
+        self.user = Users.objects.create_user(username="leader", password="pass1234")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _create_plan(self, tags, days=1):
+        response = self.client.post(
+            reverse("create-plan"),
+            {
+                "title": "Plan",
+                "description": "desc",
+                "location": "here",
+                "event_time": (timezone.now() + timezone.timedelta(days=days)).isoformat(),
+                "max_people": 5,
+                "tags": tags,
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        return response.data["plan"]["id"]
+
+
+class TagCatalogueTests(PlanFactoryMixin, APITestCase):
+    def test_counts_follow_plan_create_edit_delete(self):
+        plan_id = self._create_plan(["Sports", "Food"])
+        self.assertEqual(Tags.objects.get(name="Sports").active_plan_count, 1)
+
+        self.client.patch(reverse("plan-detail", kwargs={"pk": plan_id}), {"tags": ["Food"]}, format="json")
+        self.assertEqual(Tags.objects.get(name="Sports").active_plan_count, 0)
+        self.assertEqual(Tags.objects.get(name="Food").active_plan_count, 1)
+
+        self.client.delete(reverse("plan-detail", kwargs={"pk": plan_id}))
+        self.assertEqual(Tags.objects.get(name="Food").active_plan_count, 0)
+
+    def test_refresh_command_drops_expired_plans(self):
+        plan_id = self._create_plan(["Sports"])
+        Plans.objects.filter(pk=plan_id).update(event_time=timezone.now() - timezone.timedelta(hours=1))
+        self.assertEqual(Tags.objects.get(name="Sports").active_plan_count, 1)
+
+        call_command("refresh_tag_counts", stdout=StringIO())
+        self.assertEqual(Tags.objects.get(name="Sports").active_plan_count, 0)
+
+    def test_autocomplete_prefix_orders_by_popularity(self):
+        self._create_plan(["Sports"])
+        self._create_plan(["Sports"])
+        Tags.objects.create(name="Spooky")
+
+        response = self.client.get(reverse("tags-autocomplete"), {"q": "SP"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([t["name"] for t in response.data], ["Sports", "Spooky"])
+        self.assertEqual(response.data[0]["active_plan_count"], 2)
+
+        self.assertEqual(self.client.get(reverse("tags-autocomplete")).status_code, 400)
+
+    def test_homepage_category_filter_uses_catalogue(self):
+        movie_plan = self._create_plan(["Movies"])
+        self._create_plan(["Food"])
+
+        response = self.client.get(reverse("plans-list"), {"category": "movie"})
+        self.assertEqual([p["id"] for p in response.data], [movie_plan])
+
+        response = self.client.get(reverse("plans-list"), {"category": "unknown"})
+        self.assertEqual(response.data, [])
+
+
+class CategoryFacetTests(PlanFactoryMixin, APITestCase):
+    def setUp(self):
+        from django.core.cache import cache
+
+        super().setUp()
+        cache.clear()
+
+    def test_facets_unfiltered_and_with_search(self):
+        self._create_plan(["Sports", "Food"])
+        self._create_plan(["Food"])
+
+        response = self.client.get(reverse("plans-facets"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["total"], 2)
+        self.assertEqual(
+            [(c["name"], c["count"]) for c in response.data["categories"]],
+            [("Food", 2), ("Sports", 1)],
+        )
+
+        Plans.objects.filter(tags__name="Sports").update(title="Football")
+        response = self.client.get(reverse("plans-facets"), {"search": "foot"})
+        self.assertEqual(response.data["total"], 1)
+        self.assertEqual(
+            [(c["name"], c["count"]) for c in response.data["categories"]],
+            [("Food", 1), ("Sports", 1)],
+        )
+
+    def test_case_variants_share_one_tag_and_legacy_duplicates_still_match(self):
+        first = self._create_plan(["Hiking"])
+        second = self._create_plan(["hiking "])
+        self.assertEqual(Tags.objects.filter(normalized_name="hiking").count(), 1)
+
+        # A case-variant row left over from before creation matched names case-insensitively
+        legacy = Tags.objects.create(name="HIKING")
+        Plans.objects.get(pk=second).tags.set([legacy])
+        response = self.client.get(reverse("plans-list"), {"category": "hiking"})
+        self.assertEqual(sorted(p["id"] for p in response.data), sorted([first, second]))
@@ -0,0 +1,7 @@
+from django.urls import path
+from tags.views.tag_views import TagAutocompleteView, TagCatalogueView
+
+urlpatterns = [
+    path('', TagCatalogueView.as_view(), name='tags-catalogue'),                  # GET tags by popularity
+    path('autocomplete/', TagAutocompleteView.as_view(), name='tags-autocomplete'),  # GET ?q=<prefix>
+]
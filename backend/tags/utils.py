@@ -0,0 +1,99 @@
+"""Utility functions for tags app (catalogue lookups and popularity counts)."""
+
+import threading
+import time
+
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from plans.models import Plans
+from tags.models import Tags, normalize_tag_name
+
+# Frontend category IDs whose tag name differs from the ID itself
+CATEGORY_ALIASES = {
+    'movie': 'movies',
+    'game': 'games',
+}
+
+# In-process normalized name -> tag ids map; tags change rarely, so a short TTL is enough
+# to pick up tags created by other workers. Older rows may differ only by case ("Hiking" /
+# "hiking"), so one normalized name can stand for several tags.
+TAG_ID_CACHE_TTL = 300
+_tag_id_cache = {"ids": None, "loaded_at": 0.0}
+_tag_id_lock = threading.Lock()
+
+
+def _tag_id_map():
+    with _tag_id_lock:
+        ids = _tag_id_cache["ids"]
+        if ids is None or time.monotonic() - _tag_id_cache["loaded_at"] > TAG_ID_CACHE_TTL:
+            ids = {}
+            for normalized_name, tag_id in Tags.objects.order_by("id").values_list("normalized_name", "id"):
+                ids.setdefault(normalized_name, []).append(tag_id)
+            _tag_id_cache["ids"] = ids
+            _tag_id_cache["loaded_at"] = time.monotonic()
+        return ids
+
+
+def reset_tag_id_cache():
+    """Forget the in-process name -> ids map (called when tags are added/removed)."""
+    with _tag_id_lock:
+        _tag_id_cache["ids"] = None
+
+
+def resolve_tag_ids(name):
+    """
+    Resolve a tag name or frontend category ID to the ids of every tag with that normalized name.
+
+    Returns:
+        list[int]: the tag ids, empty when no such tag exists
+    """
+    key = normalize_tag_name(name)
+    key = CATEGORY_ALIASES.get(key, key)
+    ids = _tag_id_map()
+    if key in ids:
+        return ids[key]
+
+    # Tag may have been created by another worker since the map was loaded
+    tag_ids = list(Tags.objects.filter(normalized_name=key).order_by("id").values_list("id", flat=True))
+    if tag_ids:
+        with _tag_id_lock:
+            ids[key] = tag_ids
+    return tag_ids
+
+
+def get_or_create_tag(name):
+    """
+    The existing tag whose name matches `name` ignoring case and surrounding whitespace,
+    or a new one, so "Hiking" and "hiking" don't become separate tags.
+    """
+    tag = Tags.objects.filter(normalized_name=normalize_tag_name(name)).order_by("id").first()
+    if tag is None:
+        tag, _ = Tags.objects.get_or_create(name=name)
+    return tag
+
+
+def refresh_active_plan_counts(tag_ids=None):
+    """
+    Recompute active_plan_count (plans whose event_time is still ahead) in a single UPDATE.
+
+    Args:
+        tag_ids: tags to refresh; None refreshes the whole catalogue
+
+    Returns:
+        int: number of tags updated
+    """
+    active_counts = (
+        Plans.tags.through.objects.filter(tags_id=OuterRef("pk"), plans__event_time__gt=timezone.now())
+        .values("tags_id")
+        .annotate(total=Count("plans_id"))
+        .values("total")
+    )
+    tags_qs = Tags.objects.all()
+    if tag_ids is not None:
+        tag_ids = list(tag_ids)
+        if not tag_ids:
+            return 0
+        tags_qs = tags_qs.filter(id__in=tag_ids)
+    return tags_qs.update(active_plan_count=Coalesce(Subquery(active_counts), 0))
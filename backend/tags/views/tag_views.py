@@ -0,0 +1,50 @@
+from rest_framework import status
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from tags.models import Tags, normalize_tag_name
+from tags.serializers.tag_serializers import TagCatalogueSerializer
+
+
+def _limit_param(value, default, max_value):
+    try:
+        parsed = int(value)
+    except (TypeError, ValueError):
+        return default
+    if parsed < 1:
+        return default
+    return min(parsed, max_value)
+
+
+class TagCatalogueView(APIView):
+    """
+    GET /tags/?limit=50
+    Tag catalogue ordered by popularity (number of active plans).
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        limit = _limit_param(request.query_params.get("limit"), 50, 200)
+        tags = Tags.objects.order_by("-active_plan_count", "name")[:limit]
+        return Response(TagCatalogueSerializer(tags, many=True).data, status=status.HTTP_200_OK)
+
+
+class TagAutocompleteView(APIView):
+    """
+    GET /tags/autocomplete/?q=spo&limit=10
+    Prefix match on the tag name (case-insensitive), most popular first.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        prefix = normalize_tag_name(request.query_params.get("q"))
+        if not prefix:
+            return Response({"error": "q parameter is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        limit = _limit_param(request.query_params.get("limit"), 10, 50)
+        tags = (
+            Tags.objects.filter(normalized_name__startswith=prefix)
+            .order_by("-active_plan_count", "name")[:limit]
+        )
+        return Response(TagCatalogueSerializer(tags, many=True).data, status=status.HTTP_200_OK)
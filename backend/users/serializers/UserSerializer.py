@@ -141,3 +141,21 @@ class UserSerializer(serializers.ModelSerializer):
 
         instance.save()
         return instance
+
+
+class UserPublicProfileSerializer(serializers.ModelSerializer):
+    """
+    Compact public profile used for plan cards and leader badges.
+    """
+
+    class Meta:
+        model = Users
+        fields = [
+            'id',
+            'username',
+            'display_name',
+            'profile_picture',
+            'avg_rating',
+            'review_count',
+        ]
+        read_only_fields = fields
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Users
+from .utils import invalidate_public_profile
+
+
+@receiver(post_save, sender=Users)
+@receiver(post_delete, sender=Users)
+def clear_cached_public_profile(sender, instance, **kwargs):
+    invalidate_public_profile(instance)
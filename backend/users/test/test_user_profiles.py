@@ -155,3 +155,37 @@ class UserProfilesTests(APITestCase):
         contributions_types = [c["type"] for c in response.data]
         self.assertIn("created", contributions_types)
         self.assertIn("joined", contributions_types)
+
+    # ------------------------
+    # Public Profiles (batch)
+    # ------------------------
+    def test_profiles_batch_by_ids_and_usernames(self):
+        url = reverse("user-profiles-batch")
+        response = self.client.get(url, {"ids": f"{self.user1.id},999999", "usernames": "user2"})
+        self.assertEqual(response.status_code, 200)
+        usernames = [p["username"] for p in response.data["profiles"]]
+        self.assertEqual(usernames, ["user1", "user2"])
+        self.assertIn("avg_rating", response.data["profiles"][0])
+        self.assertEqual(response.data["not_found"]["ids"], [999999])
+
+    def test_profiles_batch_served_from_cache(self):
+        url = reverse("user-profiles-batch")
+        self.client.get(url, {"ids": self.user1.id})
+        with self.assertNumQueries(0):
+            response = self.client.get(url, {"ids": self.user1.id, "usernames": "user1"})
+        self.assertEqual(len(response.data["profiles"]), 1)
+
+    def test_profiles_batch_cache_invalidated_on_update(self):
+        url = reverse("user-profiles-batch")
+        self.client.get(url, {"ids": self.user1.id})
+        self.user1.display_name = "Fresh Name"
+        self.user1.save()
+        response = self.client.get(url, {"ids": self.user1.id})
+        self.assertEqual(response.data["profiles"][0]["display_name"], "Fresh Name")
+
+    def test_profiles_batch_invalid_params(self):
+        url = reverse("user-profiles-batch")
+        self.assertEqual(self.client.get(url).status_code, 400)
+        self.assertEqual(self.client.get(url, {"ids": "abc"}).status_code, 400)
+        too_many = ",".join(str(i) for i in range(1, 60))
+        self.assertEqual(self.client.get(url, {"ids": too_many}).status_code, 400)
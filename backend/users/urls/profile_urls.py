@@ -4,6 +4,7 @@ from users.views.user_profiles import (
     UsersCreateView, 
     UserDetailView,
     UserProfileByUsernameView,
+    UserProfilesBatchView,
     UserPlansView,
     UserContributionsView
 )
@@ -13,6 +14,7 @@ urlpatterns = [
     path('create/', UsersCreateView.as_view(), name='users-create'), # POST new user
     path('<int:pk>/', UserDetailView.as_view(), name='user-detail'), # GET, PUT, PATCH, DELETE single user
     path('profile/<str:username>/', UserProfileByUsernameView.as_view(), name='user-profile-by-username'), # GET user by username
+    path('profiles/', UserProfilesBatchView.as_view(), name='user-profiles-batch'), # GET many public profiles (?ids=&usernames=)
     path('<str:username>/plans/', UserPlansView.as_view(), name='user-plans'), # GET user plans
     path('<str:username>/contributions/', UserContributionsView.as_view(), name='user-contributions'), # GET user contributions
 ]
@@ -3,6 +3,11 @@
 import cloudinary
 import cloudinary.uploader
 from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+from users.models import Users
+from users.serializers.UserSerializer import UserPublicProfileSerializer
 
 
 class CloudinaryNotConfiguredError(Exception):
@@ -51,3 +56,71 @@ def upload_profile_picture_to_cloudinary(image_file):
     except Exception as e:
         raise CloudinaryUploadError(f"Failed to upload profile picture to Cloudinary: {str(e)}") from e
 
+
+
+PUBLIC_PROFILE_FIELDS = ("id", "username", "display_name", "profile_picture", "avg_rating", "review_count")
+
+
+def _profile_cache_key(user_id):
+    return f"user_public_profile:{user_id}"
+
+
+def _username_cache_key(username):
+    return f"user_public_profile_id:{username}"
+
+
+def get_public_profiles(user_ids=(), usernames=()):
+    """
+    Return compact public profiles for the given user IDs and usernames.
+
+    Profiles already in the cache are served from it; the rest are loaded
+    with a single query and cached per user.
+
+    Args:
+        user_ids: iterable of user IDs
+        usernames: iterable of usernames
+
+    Returns:
+        list[dict]: profiles in request order (IDs first, then usernames), without duplicates
+    """
+    user_ids = list(dict.fromkeys(user_ids))
+    usernames = list(dict.fromkeys(usernames))
+
+    # usernames -> ids via cached aliases, then every known id -> cached profile
+    aliases = cache.get_many([_username_cache_key(name) for name in usernames])
+    alias_ids = [aliases[_username_cache_key(name)] for name in usernames if _username_cache_key(name) in aliases]
+    cached = cache.get_many([_profile_cache_key(uid) for uid in user_ids + alias_ids])
+    profiles_by_id = {profile["id"]: profile for profile in cached.values()}
+    profiles_by_username = {profile["username"]: profile for profile in profiles_by_id.values()}
+
+    missing_ids = [uid for uid in user_ids if uid not in profiles_by_id]
+    missing_usernames = [name for name in usernames if name not in profiles_by_username]
+
+    if missing_ids or missing_usernames:
+        users = Users.objects.filter(
+            Q(id__in=missing_ids) | Q(username__in=missing_usernames)
+        ).only(*PUBLIC_PROFILE_FIELDS)
+
+        to_cache = {}
+        for profile in UserPublicProfileSerializer(users, many=True).data:
+            profile = dict(profile)
+            profiles_by_id[profile["id"]] = profile
+            profiles_by_username[profile["username"]] = profile
+            to_cache[_profile_cache_key(profile["id"])] = profile
+            to_cache[_username_cache_key(profile["username"])] = profile["id"]
+        if to_cache:
+            cache.set_many(to_cache, settings.USER_PROFILE_CACHE_TTL)
+
+    results = []
+    seen = set()
+    requested = [profiles_by_id.get(uid) for uid in user_ids] + [profiles_by_username.get(name) for name in usernames]
+    for profile in requested:
+        if profile and profile["id"] not in seen:
+            seen.add(profile["id"])
+            results.append(profile)
+    return results
+
+
+def invalidate_public_profile(user):
+    """Drop the cached public profile of a user (call after profile/rating changes)."""
+    cache.delete_many([_profile_cache_key(user.id), _username_cache_key(user.username)])
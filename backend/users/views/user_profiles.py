@@ -8,6 +8,7 @@ from datetime import datetime
 from collections import defaultdict
 from users.models import Users
 from users.serializers.UserSerializer import UserSerializer
+from users.utils import get_public_profiles
 from plans.models import Plans, PinnedPlan
 from plans.serializers.plans_serializers import PlansSerializer
 from participants.models import Participants
@@ -118,6 +119,53 @@ class UserProfileByUsernameView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+# Get many public profiles at once
+class UserProfilesBatchView(APIView):
+    """
+    GET compact public profiles for many users in one round trip
+    ?ids=1,2,3&usernames=alice,bob (at most MAX_BATCH_SIZE entries in total)
+    """
+    permission_classes = [AllowAny]
+    MAX_BATCH_SIZE = 50
+
+    @staticmethod
+    def _split_param(request, name):
+        values = []
+        for raw in request.query_params.getlist(name):
+            values.extend(part.strip() for part in raw.split(",") if part.strip())
+        return values
+
+    def get(self, request):
+        raw_ids = self._split_param(request, "ids")
+        usernames = self._split_param(request, "usernames")
+
+        try:
+            user_ids = [int(value) for value in raw_ids]
+        except ValueError:
+            return Response({"error": "ids must be a comma-separated list of integers"}, status=status.HTTP_400_BAD_REQUEST)
+
+        if not user_ids and not usernames:
+            return Response({"error": "Provide ids and/or usernames"}, status=status.HTTP_400_BAD_REQUEST)
+
+        if len(user_ids) + len(usernames) > self.MAX_BATCH_SIZE:
+            return Response(
+                {"error": f"You can request at most {self.MAX_BATCH_SIZE} profiles at once"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        profiles = get_public_profiles(user_ids=user_ids, usernames=usernames)
+        found_ids = {profile["id"] for profile in profiles}
+        found_usernames = {profile["username"] for profile in profiles}
+
+        return Response({
+            "profiles": profiles,
+            "not_found": {
+                "ids": [uid for uid in dict.fromkeys(user_ids) if uid not in found_ids],
+                "usernames": [name for name in dict.fromkeys(usernames) if name not in found_usernames],
+            },
+        }, status=status.HTTP_200_OK)
+
+
 # Get user plans (created and joined)
 class UserPlansView(APIView):
     """
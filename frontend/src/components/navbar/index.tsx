@@ -149,7 +149,7 @@ export default function Navbar() {
       id: notification.id,
       title: notification.title || notification.notification_type_display || 'Chat notification',
       message: notification.message,
-      created_at: notification.created_at,
+      created_at: notification.last_activity_at ?? notification.created_at,
       is_read: notification.is_read,
       topic: notification.topic,
       notification_type_display: notification.notification_type_display,
@@ -1,5 +1,5 @@
 import { createContext, useCallback, useContext, useEffect, useMemo, useRef, useState } from "react"
-import chatService from "@/services/chatService"
+import chatService, { type ChatThreadSummary } from "@/services/chatService"
 import { useWebSocket } from "@/hooks/useWebSocket"
 import { useAuth } from "@/context/AuthContext"
 import { useChatUnreadCounts } from "@/hooks/useChatUnreadCounts"
@@ -37,11 +37,18 @@ export interface ChatRoom {
 
 type MessagesByRoomId = Record<string, ChatMessage[]>
 
+interface HistoryState {
+  hasMoreBefore: boolean
+  hasMoreAfter: boolean
+}
+
 interface ChatContextValue {
   chatRooms: ChatRoom[]
   messagesByRoomId: MessagesByRoomId
+  historyByRoomId: Record<string, HistoryState>
   selectedRoomId: string | null
   isLoadingRooms: boolean
+  hasMoreRooms: boolean
   isConnected: boolean
   connectionStatus: "connecting" | "connected" | "disconnected" | "error"
   connectionError: string | null
@@ -51,12 +58,17 @@ interface ChatContextValue {
   addIncomingMessage: (roomId: string, message: ChatMessage) => void
   markRoomAsRead: (roomId: string) => void
   markMessagesRead: (messageIds: Array<string | number>) => void
+  loadOlderMessages: () => boolean
+  jumpToMessage: (messageId: string | number) => boolean
   refreshRooms: () => Promise<void>
+  loadMoreRooms: () => Promise<void>
 }
 
 const ChatContext = createContext<ChatContextValue | undefined>(undefined)
 
 const CHAT_ROOMS_CACHE_KEY = "ku-hangout-chat-threads"
+// Rooms are fetched a page at a time, newest activity first, as the room list is scrolled
+const CHAT_ROOMS_PAGE_SIZE = 20
 const PLAN_STORAGE_KEYS = new Set([
   CHAT_ROOMS_CACHE_KEY,
   "ku-hangout-plans",
@@ -152,8 +164,11 @@ export function ChatProvider({ children }: { children: React.ReactNode }) {
   const { chatUnreadByPlanId, getUnreadCount, acknowledgePlan } = useChatUnreadCounts()
   const [chatRooms, setChatRooms] = useState<ChatRoom[]>([])
   const [messagesByRoomId, setMessagesByRoomId] = useState<MessagesByRoomId>({})
+  const [historyByRoomId, setHistoryByRoomId] = useState<Record<string, HistoryState>>({})
   const [selectedRoomId, setSelectedRoomId] = useState<string | null>(null)
   const [isLoadingRooms, setIsLoadingRooms] = useState(false)
+  const [roomsCursor, setRoomsCursor] = useState<string | null>(null)
+  const loadingMoreRooms = useRef(false)
   const [connectionError, setConnectionError] = useState<string | null>(null)
   const lastErrorTimeout = useRef<ReturnType<typeof setTimeout> | null>(null)
 
@@ -172,9 +187,28 @@ export function ChatProvider({ children }: { children: React.ReactNode }) {
     )
   }, [chatUnreadByPlanId])
 
+  const threadToRoom = useCallback(
+    (thread: ChatThreadSummary): ChatRoom => {
+      const planId = normalizeRoomId(thread.plan_id)
+      return {
+        planId,
+        threadId: thread.thread_id,
+        title: thread.plan_title || `Plan ${thread.plan_id}`,
+        coverImage: thread.plan_cover_image ?? null,
+        lastMessage: thread.last_message ?? undefined,
+        lastMessageSender: thread.last_message_sender ?? undefined,
+        lastMessageTime: parseServerTimestamp(thread.last_message_timestamp),
+        unreadCount: thread.unread_count ?? getUnreadCount(planId),
+        isOwner: thread.is_owner,
+      }
+    },
+    [getUnreadCount]
+  )
+
   const refreshRooms = useCallback(async () => {
     if (!user) {
       setChatRooms([])
+      setRoomsCursor(null)
       setSelectedRoomId(null)
       setMessagesByRoomId({})
       return
@@ -182,28 +216,10 @@ export function ChatProvider({ children }: { children: React.ReactNode }) {
 
     setIsLoadingRooms(true)
     try {
-      const threads = await chatService.getThreads()
-      const rooms: ChatRoom[] = threads.map((thread) => {
-        const planId = normalizeRoomId(thread.plan_id)
-        return {
-          planId,
-          threadId: thread.thread_id,
-          title: thread.plan_title || `Plan ${thread.plan_id}`,
-          coverImage: thread.plan_cover_image ?? null,
-          lastMessage: thread.last_message ?? undefined,
-          lastMessageSender: thread.last_message_sender ?? undefined,
-          lastMessageTime: parseServerTimestamp(thread.last_message_timestamp),
-          unreadCount: getUnreadCount(planId),
-          isOwner: thread.is_owner,
-        }
-      })
-
-      rooms.sort((a, b) => {
-        const timeA = a.lastMessageTime ? a.lastMessageTime.getTime() : 0
-        const timeB = b.lastMessageTime ? b.lastMessageTime.getTime() : 0
-        return timeB - timeA
-      })
-
+      const page = await chatService.getThreadsPage(null, CHAT_ROOMS_PAGE_SIZE)
+      // Already ordered by latest activity on the server
+      const rooms = (page?.threads ?? []).map(threadToRoom)
+      setRoomsCursor(page?.has_next ? page.next_cursor : null)
       setChatRooms(rooms)
 
       try {
@@ -244,7 +260,25 @@ export function ChatProvider({ children }: { children: React.ReactNode }) {
     } finally {
       setIsLoadingRooms(false)
     }
-  }, [user, getUnreadCount])
+  }, [user, getUnreadCount, threadToRoom])
+
+  const loadMoreRooms = useCallback(async () => {
+    if (!user || !roomsCursor || loadingMoreRooms.current) return
+    loadingMoreRooms.current = true
+    try {
+      const page = await chatService.getThreadsPage(roomsCursor, CHAT_ROOMS_PAGE_SIZE)
+      const older = (page?.threads ?? []).map(threadToRoom)
+      setChatRooms((prev) => {
+        const known = new Set(prev.map((room) => room.planId))
+        return [...prev, ...older.filter((room) => !known.has(room.planId))]
+      })
+      setRoomsCursor(page?.has_next ? page.next_cursor : null)
+    } catch (error) {
+      console.error("Error loading more chat threads:", error)
+    } finally {
+      loadingMoreRooms.current = false
+    }
+  }, [user, roomsCursor, threadToRoom])
 
   useEffect(() => {
     refreshRooms()
@@ -363,6 +397,34 @@ export function ChatProvider({ children }: { children: React.ReactNode }) {
       if (data.type === "chat_history" && Array.isArray(data.messages)) {
         const history = data.messages.map((msg: any) => normalizeMessage(selectedRoomId, msg))
         setIncomingHistory(selectedRoomId, history)
+        setHistoryByRoomId((prev) => ({
+          ...prev,
+          [selectedRoomId]: { hasMoreBefore: Boolean(data.has_more), hasMoreAfter: false },
+        }))
+        return
+      }
+
+      if (data.type === "chat_history_page" && Array.isArray(data.messages)) {
+        const page: ChatMessage[] = data.messages.map((msg: any) => normalizeMessage(selectedRoomId, msg))
+        setMessagesByRoomId((prev) => {
+          const existing = prev[selectedRoomId] ?? []
+          const known = new Set(existing.map((msg) => String(msg.id)))
+          const fresh = page.filter((msg) => !known.has(String(msg.id)))
+          let merged = page
+          if (data.direction === "before") merged = [...fresh, ...existing]
+          else if (data.direction === "after") merged = [...existing, ...fresh]
+          return { ...prev, [selectedRoomId]: merged }
+        })
+        setHistoryByRoomId((prev) => {
+          const current = prev[selectedRoomId] ?? { hasMoreBefore: false, hasMoreAfter: false }
+          return {
+            ...prev,
+            [selectedRoomId]: {
+              hasMoreBefore: data.direction === "after" ? current.hasMoreBefore : Boolean(data.has_more_before),
+              hasMoreAfter: data.direction === "before" ? current.hasMoreAfter : Boolean(data.has_more_after),
+            },
+          }
+        })
         return
       }
 
@@ -372,31 +434,29 @@ export function ChatProvider({ children }: { children: React.ReactNode }) {
         return
       }
 
-      if (data.type === "read_receipt") {
-        const targetMessageId = data.message_id ?? data.messageId
-        if (!targetMessageId) return
+      if (data.type === "read_receipts" && data.reader?.username) {
+        const reader: ChatReadReceipt = {
+          username: data.reader.username,
+          displayName: data.reader.display_name ?? data.reader.displayName,
+          avatar: data.reader.profile_picture ?? data.reader.avatar ?? null,
+          readAt: data.reader.read_at ?? data.reader.readAt ?? "",
+        }
+        const namedIds = new Set((data.message_ids ?? []).map(String))
+        const after = Number(data.after_message_id ?? 0)
+        const upTo = Number(data.last_read_message_id ?? 0)
+
+        // The reader has read every message in (after, upTo] except their own
+        const isCovered = (msg: ChatMessage) => {
+          if (namedIds.has(String(msg.id))) return true
+          const id = Number(msg.id)
+          return Number.isFinite(id) && id > after && id <= upTo && msg.senderUsername !== reader.username
+        }
 
         setMessagesByRoomId((prev) => {
           const existingMessages = prev[selectedRoomId] ?? []
-          const updated = existingMessages.map((msg) => {
-            if (String(msg.id) !== String(targetMessageId)) {
-              return msg
-            }
-
-            const incomingReceipts: ChatReadReceipt[] = Array.isArray(data.receipts)
-              ? data.receipts
-                  .map((entry: any) => ({
-                    username: entry.username,
-                    displayName: entry.display_name ?? entry.displayName,
-                    avatar: entry.profile_picture ?? entry.avatar ?? null,
-                    readAt: entry.read_at ?? entry.readAt ?? "",
-                  }))
-                  .filter((entry: ChatReadReceipt) => Boolean(entry.username))
-              : []
-
-            const merged = mergeReadReceipts(msg.readReceipts ?? [], incomingReceipts)
-            return { ...msg, readReceipts: merged }
-          })
+          const updated = existingMessages.map((msg) =>
+            isCovered(msg) ? { ...msg, readReceipts: mergeReadReceipts(msg.readReceipts ?? [], [reader]) } : msg
+          )
 
           return {
             ...prev,
@@ -481,12 +541,29 @@ export function ChatProvider({ children }: { children: React.ReactNode }) {
     [selectedRoomId, sendAction, user]
   )
 
+  const loadOlderMessages = useCallback(() => {
+    if (!selectedRoomId) return false
+    const oldest = (messagesByRoomId[selectedRoomId] ?? [])[0]
+    if (!oldest || !historyByRoomId[selectedRoomId]?.hasMoreBefore) return false
+    return sendAction({ action: "load_history", before: oldest.id })
+  }, [historyByRoomId, messagesByRoomId, selectedRoomId, sendAction])
+
+  const jumpToMessage = useCallback(
+    (messageId: string | number) => {
+      if (!selectedRoomId) return false
+      return sendAction({ action: "load_history", around: messageId })
+    },
+    [selectedRoomId, sendAction]
+  )
+
   const value = useMemo(
     () => ({
       chatRooms,
       messagesByRoomId,
+      historyByRoomId,
       selectedRoomId,
       isLoadingRooms,
+      hasMoreRooms: roomsCursor !== null,
       isConnected,
       connectionStatus,
       connectionError,
@@ -496,13 +573,18 @@ export function ChatProvider({ children }: { children: React.ReactNode }) {
       addIncomingMessage,
       markRoomAsRead,
       markMessagesRead,
+      loadOlderMessages,
+      jumpToMessage,
       refreshRooms,
+      loadMoreRooms,
     }),
     [
       chatRooms,
       messagesByRoomId,
+      historyByRoomId,
       selectedRoomId,
       isLoadingRooms,
+      roomsCursor,
       isConnected,
       connectionStatus,
       connectionError,
@@ -512,7 +594,10 @@ export function ChatProvider({ children }: { children: React.ReactNode }) {
       addIncomingMessage,
       markRoomAsRead,
       markMessagesRead,
+      loadOlderMessages,
+      jumpToMessage,
       refreshRooms,
+      loadMoreRooms,
     ]
   )
 
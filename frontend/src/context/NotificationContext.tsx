@@ -9,7 +9,13 @@ import {
   type ReactNode,
 } from 'react'
 
-import { useNotificationSocket, type NotificationSocketStatus } from '@/hooks/useNotificationSocket'
+import {
+  useNotificationSocket,
+  type NotificationBatch,
+  type NotificationReplay,
+  type NotificationSocketStatus,
+} from '@/hooks/useNotificationSocket'
+import chatService, { type ChatUnreadThread } from '@/services/chatService'
 import notificationsService, { type NotificationItem, type UnreadCountsByTopic } from '@/services/notificationsService'
 
 import { useAuth } from './AuthContext'
@@ -30,6 +36,7 @@ interface NotificationContextValue {
   markAllLoading: boolean
   refresh: () => Promise<void>
   markNotificationAsRead: (notificationId: number) => Promise<void>
+  markPlanChatAsRead: (planId: string) => Promise<void>
   markAllAsRead: (topic?: NotificationTopic) => Promise<void>
   deleteNotification: (notificationId: number) => Promise<void>
   clearNotifications: (topic?: NotificationTopic) => Promise<void>
@@ -69,20 +76,27 @@ export const getChatNotificationPlanKey = (notification: NotificationItem): stri
   return null
 }
 
-const buildChatUnreadMap = (items: NotificationItem[]) => {
-  return items.reduce<Record<string, number>>((acc, item) => {
-    if (item.topic !== 'CHAT' || item.is_read) {
-      return acc
-    }
-    const planKey = getChatNotificationPlanKey(item)
-    if (!planKey) {
+// Exact per-thread counts come from the server (read watermarks), keyed here by plan
+const buildChatUnreadMap = (threads: ChatUnreadThread[]) => {
+  return threads.reduce<Record<string, number>>((acc, thread) => {
+    if (thread.plan_id == null || thread.unread_count <= 0) {
       return acc
     }
-    acc[planKey] = (acc[planKey] ?? 0) + 1
+    acc[String(thread.plan_id)] = thread.unread_count
     return acc
   }, {})
 }
 
+// Changes whenever a chat notification arrives, grows or is read, to know when to re-fetch counts
+const chatActivityKey = (items: NotificationItem[]) =>
+  items
+    .filter((item) => item.topic === 'CHAT')
+    .map((item) => `${item.id}:${item.group_count ?? 1}:${item.is_read ? 1 : 0}`)
+    .join(',')
+
+// Coalesced chat rows keep their created_at and move last_activity_at forward
+const activityTime = (item: NotificationItem) => new Date(item.last_activity_at ?? item.created_at).getTime()
+
 const MAX_NOTIFICATIONS = 25
 
 export function NotificationProvider({ children }: { children: ReactNode }) {
@@ -100,7 +114,6 @@ export function NotificationProvider({ children }: { children: ReactNode }) {
     setNotifications((prev) => {
       const next = typeof value === 'function' ? (value as (items: NotificationItem[]) => NotificationItem[])(prev) : value
       notificationsRef.current = next
-      setChatUnreadByPlanId(buildChatUnreadMap(next))
       return next
     })
   }, [])
@@ -134,6 +147,25 @@ export function NotificationProvider({ children }: { children: ReactNode }) {
     })
   }, [])
 
+  const refreshChatUnread = useCallback(async () => {
+    if (!user) {
+      setChatUnreadByPlanId({})
+      return
+    }
+    try {
+      const response = await chatService.getUnreadCounts()
+      setChatUnreadByPlanId(buildChatUnreadMap(response?.threads ?? []))
+    } catch (err) {
+      console.error('Unable to load chat unread counts.', err)
+    }
+  }, [user])
+
+  const chatActivity = useMemo(() => chatActivityKey(notifications), [notifications])
+
+  useEffect(() => {
+    refreshChatUnread()
+  }, [chatActivity, refreshChatUnread])
+
   const refresh = useCallback(async () => {
     if (!user) {
       setLoading(false)
@@ -146,10 +178,10 @@ export function NotificationProvider({ children }: { children: ReactNode }) {
 
     setLoading(true)
     try {
-      const response = await notificationsService.list({ page: 1, pageSize: MAX_NOTIFICATIONS })
+      const response = await notificationsService.list({ pageSize: MAX_NOTIFICATIONS })
       const sorted = (response.notifications ?? [])
         .map((notification) => ({ ...notification, metadata: notification.metadata ?? {} }))
-        .sort((a, b) => new Date(b.created_at).getTime() - new Date(a.created_at).getTime())
+        .sort((a, b) => activityTime(b) - activityTime(a))
 
       setNotificationsWithRef(sorted)
       applyServerUnreadCounts(response.unread_count, response.unread_counts_by_topic)
@@ -219,6 +251,32 @@ export function NotificationProvider({ children }: { children: ReactNode }) {
     [user, setNotificationsWithRef, applyServerUnreadCounts]
   )
 
+  const markPlanChatAsRead = useCallback(
+    async (planId: string) => {
+      if (!user || !planId) {
+        return
+      }
+
+      try {
+        // One request marks every unread chat notification of the plan and returns the counters once
+        const response = await notificationsService.markManyRead({ planId, topic: 'CHAT' })
+        const updatedIds = new Set<number>(Array.isArray(response?.notification_ids) ? response.notification_ids : [])
+        setNotificationsWithRef((prev) =>
+          prev.map((item) =>
+            updatedIds.has(item.id) ? { ...item, is_read: true, read_at: new Date().toISOString() } : item
+          )
+        )
+        applyServerUnreadCounts(response?.unread_count, response?.unread_counts_by_topic)
+        setError(null)
+      } catch (err) {
+        const message = err instanceof Error ? err.message : 'Unable to update notifications.'
+        setError(message)
+        throw err
+      }
+    },
+    [user, setNotificationsWithRef, applyServerUnreadCounts]
+  )
+
   const markAllAsRead = useCallback(async (topic?: NotificationTopic) => {
     if (!user) {
       return
@@ -336,7 +394,7 @@ export function NotificationProvider({ children }: { children: ReactNode }) {
       setNotificationsWithRef((prev) => {
         const filtered = prev.filter((item) => item.id !== normalized.id)
         const merged = [normalized, ...filtered]
-        merged.sort((a, b) => new Date(b.created_at).getTime() - new Date(a.created_at).getTime())
+        merged.sort((a, b) => activityTime(b) - activityTime(a))
         return merged.slice(0, MAX_NOTIFICATIONS)
       })
 
@@ -363,6 +421,43 @@ export function NotificationProvider({ children }: { children: ReactNode }) {
     [setNotificationsWithRef]
   )
 
+  const handleReplay = useCallback(
+    (replay: NotificationReplay) => {
+      if (replay.has_more) {
+        // Missed more than the server replays; reload the list instead
+        refresh().catch(() => null)
+        return
+      }
+
+      if (replay.notifications.length > 0) {
+        setNotificationsWithRef((prev) => {
+          const replayed = replay.notifications.map((item) => ({ ...item, metadata: item.metadata ?? {} }))
+          const replayedIds = new Set(replayed.map((item) => item.id))
+          const merged = [...replayed, ...prev.filter((item) => !replayedIds.has(item.id))]
+          merged.sort((a, b) => activityTime(b) - activityTime(a))
+          return merged.slice(0, MAX_NOTIFICATIONS)
+        })
+      }
+      applyServerUnreadCounts(replay.unread_count, replay.unread_counts_by_topic)
+    },
+    [refresh, setNotificationsWithRef, applyServerUnreadCounts]
+  )
+
+  const handleBatch = useCallback(
+    (batch: NotificationBatch) => {
+      setNotificationsWithRef((prev) => {
+        const incoming = batch.notifications.map((item) => ({ ...item, metadata: item.metadata ?? {} }))
+        const incomingIds = new Set(incoming.map((item) => item.id))
+        const merged = [...incoming, ...prev.filter((item) => !incomingIds.has(item.id))]
+        merged.sort((a, b) => activityTime(b) - activityTime(a))
+        return merged.slice(0, MAX_NOTIFICATIONS)
+      })
+      // Counters arrive merged with the batch, so no per-item arithmetic is needed
+      applyServerUnreadCounts(batch.unread_count, batch.unread_counts_by_topic)
+    },
+    [setNotificationsWithRef, applyServerUnreadCounts]
+  )
+
   const handleSocketError = useCallback((message?: string) => {
     if (message) {
       console.error(message)
@@ -370,9 +465,17 @@ export function NotificationProvider({ children }: { children: ReactNode }) {
     }
   }, [])
 
+  const lastSeenId = useMemo(
+    () => notifications.reduce<number | null>((max, item) => (max === null || item.id > max ? item.id : max), null),
+    [notifications]
+  )
+
   const socketStatus = useNotificationSocket({
     enabled: Boolean(user),
+    lastSeenId,
     onNotification: handleRealtimeNotification,
+    onReplay: handleReplay,
+    onBatch: handleBatch,
     onError: handleSocketError,
   })
 
@@ -402,6 +505,7 @@ export function NotificationProvider({ children }: { children: ReactNode }) {
       markAllLoading,
       refresh,
       markNotificationAsRead,
+      markPlanChatAsRead,
       markAllAsRead,
       deleteNotification,
       clearNotifications,
@@ -422,6 +526,7 @@ export function NotificationProvider({ children }: { children: ReactNode }) {
       markAllLoading,
       refresh,
       markNotificationAsRead,
+      markPlanChatAsRead,
       markAllAsRead,
       deleteNotification,
       clearNotifications,
@@ -6,7 +6,7 @@ export function useChatUnreadCounts() {
   const {
     chatNotifications,
     chatUnreadByPlanId,
-    markNotificationAsRead,
+    markPlanChatAsRead,
     incrementChatUnread,
     clearChatUnread,
   } = useNotifications()
@@ -31,19 +31,15 @@ export function useChatUnreadCounts() {
         return
       }
 
-      await Promise.all(
-        pending.map(async (notification) => {
-          try {
-            await markNotificationAsRead(notification.id)
-          } catch (error) {
-            console.error("Failed to acknowledge notification", error)
-          }
-        })
-      )
+      try {
+        await markPlanChatAsRead(planId)
+      } catch (error) {
+        console.error("Failed to acknowledge notifications", error)
+      }
 
       clearChatUnread(planId)
     },
-    [chatNotifications, markNotificationAsRead, clearChatUnread]
+    [chatNotifications, markPlanChatAsRead, clearChatUnread]
   )
 
   const ingestNotification = useCallback(
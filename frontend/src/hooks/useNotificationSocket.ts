@@ -1,12 +1,28 @@
 import { useEffect, useRef, useState } from 'react'
 
-import type { NotificationItem } from '@/services/notificationsService'
+import type { NotificationItem, UnreadCountsByTopic } from '@/services/notificationsService'
 
 export type NotificationSocketStatus = 'idle' | 'connecting' | 'open' | 'closed' | 'error'
 
+export interface NotificationReplay {
+  notifications: NotificationItem[]
+  has_more: boolean
+  unread_count: number
+  unread_counts_by_topic: UnreadCountsByTopic
+}
+
+export interface NotificationBatch {
+  notifications: NotificationItem[]
+  unread_count: number
+  unread_counts_by_topic: UnreadCountsByTopic
+}
+
 interface UseNotificationSocketOptions {
   enabled: boolean
+  lastSeenId?: number | null
   onNotification?: (notification: NotificationItem) => void
+  onReplay?: (replay: NotificationReplay) => void
+  onBatch?: (batch: NotificationBatch) => void
   onError?: (message: string) => void
 }
 
@@ -14,22 +30,35 @@ const DEFAULT_WS_BASE = 'ws://localhost:8000'
 
 export function useNotificationSocket({
   enabled,
+  lastSeenId,
   onNotification,
+  onReplay,
+  onBatch,
   onError,
 }: UseNotificationSocketOptions): NotificationSocketStatus {
   const [status, setStatus] = useState<NotificationSocketStatus>('idle')
   const wsRef = useRef<WebSocket | null>(null)
   const reconnectTimeoutRef = useRef<ReturnType<typeof setTimeout> | null>(null)
   const attemptsRef = useRef(0)
+  // Highest notification id received; sent as ?since= on reconnect so the server replays only what was missed
+  const lastSeenIdRef = useRef<number | null>(null)
+
+  useEffect(() => {
+    if (typeof lastSeenId === 'number' && (lastSeenIdRef.current === null || lastSeenId > lastSeenIdRef.current)) {
+      lastSeenIdRef.current = lastSeenId
+    }
+  }, [lastSeenId])
   const wsBase = import.meta.env.VITE_WS_BASE || DEFAULT_WS_BASE
   const callbacksRef = useRef<{
     onNotification?: (notification: NotificationItem) => void
+    onReplay?: (replay: NotificationReplay) => void
+    onBatch?: (batch: NotificationBatch) => void
     onError?: (message: string) => void
-  }>({ onNotification, onError })
+  }>({ onNotification, onReplay, onBatch, onError })
 
   useEffect(() => {
-    callbacksRef.current = { onNotification, onError }
-  }, [onNotification, onError])
+    callbacksRef.current = { onNotification, onReplay, onBatch, onError }
+  }, [onNotification, onReplay, onBatch, onError])
 
   useEffect(() => {
     let isActive = true
@@ -77,7 +106,9 @@ export function useNotificationSocket({
       setStatus('connecting')
 
       try {
-        const ws = new WebSocket(`${wsBase}/ws/notifications/?token=${encodeURIComponent(token)}`)
+        const since = lastSeenIdRef.current !== null ? `&since=${lastSeenIdRef.current}` : ''
+        // batch=1: the server groups pushes arriving close together into one `notifications` frame
+        const ws = new WebSocket(`${wsBase}/ws/notifications/?token=${encodeURIComponent(token)}&batch=1${since}`)
         wsRef.current = ws
 
         ws.onopen = () => {
@@ -95,8 +126,20 @@ export function useNotificationSocket({
 
           try {
             const payload = JSON.parse(event.data)
+            const trackSeen = (item: NotificationItem) => {
+              if (typeof item?.id === 'number' && (lastSeenIdRef.current === null || item.id > lastSeenIdRef.current)) {
+                lastSeenIdRef.current = item.id
+              }
+            }
             if (payload?.type === 'notification' && payload.notification) {
+              trackSeen(payload.notification as NotificationItem)
               callbacksRef.current.onNotification?.(payload.notification as NotificationItem)
+            } else if (payload?.type === 'replay' && Array.isArray(payload.notifications)) {
+              ;(payload.notifications as NotificationItem[]).forEach(trackSeen)
+              callbacksRef.current.onReplay?.(payload as NotificationReplay)
+            } else if (payload?.type === 'notifications' && Array.isArray(payload.notifications)) {
+              ;(payload.notifications as NotificationItem[]).forEach(trackSeen)
+              callbacksRef.current.onBatch?.(payload as NotificationBatch)
             }
           } catch (error) {
             console.error('Failed to parse notification payload:', error)
@@ -18,6 +18,8 @@ interface WebSocketMessage {
   timestamp?: string
 }
 
+const HEARTBEAT_INTERVAL_MS = 20000
+
 interface UseWebSocketOptions {
   planId: string | number | null
   onMessage?: (message: WebSocketMessage) => void
@@ -287,6 +289,28 @@ export function useWebSocket({
     }
   }, [])
 
+  // Presence heartbeat: keeps the server from sending chat notifications while this chat is on screen
+  useEffect(() => {
+    if (!isConnected) {
+      return
+    }
+
+    const sendHeartbeat = () => {
+      if (wsRef.current && wsRef.current.readyState === WebSocket.OPEN) {
+        wsRef.current.send(
+          JSON.stringify({ action: 'heartbeat', active: document.visibilityState === 'visible' })
+        )
+      }
+    }
+
+    const interval = setInterval(sendHeartbeat, HEARTBEAT_INTERVAL_MS)
+    document.addEventListener('visibilitychange', sendHeartbeat)
+    return () => {
+      clearInterval(interval)
+      document.removeEventListener('visibilitychange', sendHeartbeat)
+    }
+  }, [isConnected])
+
   // Connect when planId changes
   useEffect(() => {
     if (!planId) {
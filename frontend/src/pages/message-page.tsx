@@ -1,6 +1,6 @@
 "use client"
 
-import { useState, useEffect } from "react"
+import { useState, useEffect, type UIEvent } from "react"
 import { useSearchParams, useNavigate } from "react-router-dom"
 import { SidebarLayout } from "@/components/home/side-bar"
 import Navbar from "@/components/navbar"
@@ -29,6 +29,8 @@ export default function MessagePage() {
     connectionStatus,
     connectionError,
     markMessagesRead,
+    hasMoreRooms,
+    loadMoreRooms,
   } = useChatContext()
   const { getUnreadCount, acknowledgePlan } = useChatUnreadCounts()
 
@@ -44,6 +46,9 @@ export default function MessagePage() {
         if (selectedRoomId !== planId) {
           selectRoom(planId)
         }
+      } else if (hasMoreRooms) {
+        // The room may be on a page that hasn't been loaded yet
+        void loadMoreRooms()
       } else if (chatRooms.length > 0) {
         const fallbackRoomId = chatRooms[0].planId
         selectRoom(fallbackRoomId)
@@ -63,7 +68,14 @@ export default function MessagePage() {
         navigate(`/messages?planId=${fallbackRoomId}`, { replace: true })
       }
     }
-  }, [planId, chatRooms, selectedRoomId, selectRoom, navigate])
+  }, [planId, chatRooms, selectedRoomId, selectRoom, navigate, hasMoreRooms, loadMoreRooms])
+
+  const handleRoomListScroll = (event: UIEvent<HTMLDivElement>) => {
+    const target = event.currentTarget
+    if (hasMoreRooms && target.scrollHeight - target.scrollTop - target.clientHeight < 200) {
+      void loadMoreRooms()
+    }
+  }
 
   const handleSelectRoom = (roomPlanId: string | number) => {
     const normalizedRoomId = roomPlanId.toString()
@@ -99,7 +111,7 @@ export default function MessagePage() {
             </div>
 
             {/* Chat Rooms List */}
-            <div className="flex-1 overflow-y-auto min-h-0">
+            <div className="flex-1 overflow-y-auto min-h-0" onScroll={handleRoomListScroll}>
               {chatRooms.length === 0 ? (
                 <div className="flex items-center justify-center h-full">
                   <div className="text-center space-y-2 p-4">
@@ -7,14 +7,42 @@ export interface ChatThreadSummary {
   plan_event_time: string | null
   plan_cover_image?: string | null
   is_owner: boolean
-  last_message?: string | null
+  last_message_id?: number | null
+  last_message?: string | null // preview, at most 140 characters
   last_message_timestamp?: string | null
   last_message_sender?: string | null
+  message_count?: number
+  unread_count?: number
+}
+
+export interface ChatThreadPage {
+  page_size: number
+  has_next: boolean
+  next_cursor: string | null
+  threads: ChatThreadSummary[]
+}
+
+export interface ChatUnreadThread {
+  thread_id: number
+  plan_id: number | null
+  unread_count: number
+}
+
+export interface ChatUnreadCounts {
+  unread_count: number
+  threads: ChatUnreadThread[]
 }
 
 const chatService = {
-  async getThreads(): Promise<ChatThreadSummary[]> {
-    return api.get('/chat/threads/')
+  async getUnreadCounts(): Promise<ChatUnreadCounts> {
+    return api.get('/chat/unread/')
+  },
+
+  // One page of threads, newest activity first; pass next_cursor back for the following page
+  async getThreadsPage(cursor?: string | null, pageSize = 20): Promise<ChatThreadPage> {
+    const params: Record<string, string | number> = { page_size: pageSize }
+    if (cursor) params.cursor = cursor
+    return api.get('/chat/threads/', { params })
   },
 }
 
@@ -26,10 +26,12 @@ export interface NotificationItem {
   actor?: NotificationActor | null
   action_url?: string | null
   metadata: Record<string, unknown>
+  group_count?: number
   is_read: boolean
   read_at?: string | null
   created_at: string
   updated_at: string
+  last_activity_at?: string
   is_deleted: boolean
 }
 
@@ -40,29 +42,30 @@ export interface UnreadCountsByTopic {
 export interface NotificationListResponse {
   message: string
   status_code: number
-  count: number
-  page: number
+  count?: number
   page_size: number
   has_next: boolean
+  next_cursor: string | null
   unread_count: number
   unread_counts_by_topic?: UnreadCountsByTopic
   notifications: NotificationItem[]
 }
 
 export interface NotificationListParams {
-  page?: number
+  cursor?: string | null
   pageSize?: number
   limit?: number
   unreadOnly?: boolean
   topic?: string
+  includeTotal?: boolean
 }
 
 const notificationsService = {
   async list(params: NotificationListParams = {}): Promise<NotificationListResponse> {
     const query: Record<string, string | number> = {}
 
-    if (typeof params.page === 'number') {
-      query.page = params.page
+    if (params.cursor) {
+      query.cursor = params.cursor
     }
 
     if (typeof params.pageSize === 'number') {
@@ -79,6 +82,10 @@ const notificationsService = {
       query.topic = params.topic
     }
 
+    if (params.includeTotal === false) {
+      query.include_total = 'false'
+    }
+
     const data = await api.get('/notifications/', { params: query })
     return data as NotificationListResponse
   },
@@ -87,6 +94,23 @@ const notificationsService = {
     return api.patch(`/notifications/${notificationId}/read/`, {})
   },
 
+  async markManyRead(params: { ids?: number[]; planId?: number | string; chatThreadId?: number | string; topic?: string }) {
+    const payload: Record<string, unknown> = {}
+    if (params.ids) {
+      payload.ids = params.ids
+    }
+    if (params.planId !== undefined) {
+      payload.plan_id = params.planId
+    }
+    if (params.chatThreadId !== undefined) {
+      payload.chat_thread_id = params.chatThreadId
+    }
+    if (params.topic) {
+      payload.topic = params.topic
+    }
+    return api.post('/notifications/mark-read/', payload)
+  },
+
   async markAllRead(params: { topic?: string } = {}) {
     const payload: Record<string, string> = {}
     if (params.topic) {